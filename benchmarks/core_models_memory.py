@@ -0,0 +1,66 @@
+"""
+Memory and construction-speed benchmark for the core Task model.
+
+Reports bytes per task (measured with tracemalloc) and constructions per second,
+both for the regular constructor and for the bulk Task.from_rows factory.
+
+Usage:
+    poetry run python -m benchmarks.core_models_memory
+    poetry run python -m benchmarks.core_models_memory --sizes 100000 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from core.models import Task, Status
+
+
+def make_rows(count: int) -> list:
+    """Build (uuid, project_id, title, description, status, deadline, created_at, updated_at, version) rows."""
+    now = datetime.now()
+    return [
+        (uuid.uuid4(), i % 100, f"task {i}", "", Status.TODO, now + timedelta(days=i % 30), now, now, 1)
+        for i in range(count)
+    ]
+
+
+def measure(label: str, build, count: int):
+    """Run build() once under tracemalloc and once timed, then print the results."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tasks
+    gc.collect()
+
+    start = time.perf_counter()
+    tasks = build()
+    elapsed = time.perf_counter() - start
+    del tasks
+
+    print(f"{label:<12} {count:>10,} tasks  {(after - before) / count:>8.1f} bytes/task  "
+          f"{count / elapsed:>12,.0f} constructions/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Core model memory benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000],
+                        help='Number of tasks to build (default: 100000 1000000)')
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        rows = make_rows(count)
+        # Row values are shared by both builders, so only the Task objects themselves are measured
+        measure("constructor", lambda: [Task(r[2], r[3], r[4], r[5], r[0], r[1], r[6], r[7], str(r[0]), r[8]) for r in rows],
+                count)
+        measure("from_rows", lambda: Task.from_rows(rows), count)
+        del rows
+
+
+if __name__ == "__main__":
+    main()
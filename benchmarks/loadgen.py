@@ -0,0 +1,310 @@
+"""
+Scenario-driven load generator for the REST API.
+
+Seeds N projects x M tasks with bulk INSERTs straight into the database of DATABASE_URL, then
+drives a mix of endpoints from many asyncio clients for a fixed duration, either over HTTP
+against a running server (--base-url) or in-process through the ASGI app (the default).
+Optionally the autoclose job runs concurrently. Reports throughput, latency percentiles, a
+latency histogram and the error rate per endpoint.
+
+Scenarios:
+    list-heavy    mostly task and project listings, few writes
+    write-heavy   task creation and updates
+    patch-storm   every client patches the same few hot tasks
+    mixed         a bit of everything
+
+Usage:
+    poetry run python -m benchmarks.loadgen --scenario list-heavy --projects 100 --tasks 1000 --clients 50
+    poetry run python -m benchmarks.loadgen --scenario patch-storm --autoclose-interval 1 --duration 60
+    poetry run python -m benchmarks.loadgen --base-url http://localhost:8000 --scenario mixed --json results.json
+
+With --base-url the server must use the same DATABASE_URL as the load generator, which seeds it.
+"""
+import argparse
+import bisect
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    "list-heavy": {"list_tasks": 55, "list_projects": 15, "get_task": 20, "batch_get": 5, "patch_task": 5},
+    "write-heavy": {"create_task": 45, "patch_task": 40, "list_tasks": 10, "get_task": 5},
+    "patch-storm": {"patch_task_hot": 90, "get_task_hot": 10},
+    "mixed": {"list_tasks": 25, "list_projects": 10, "get_task": 20, "create_task": 15, "patch_task": 15,
+              "due_tasks": 10, "batch_get": 5},
+}
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+SEED_CHUNK = 5000
+
+
+async def seed(projects: int, tasks_per_project: int, prefix: str) -> List[Tuple[str, List[str]]]:
+    """
+    Insert the dataset with multi-row INSERTs, bypassing the API.
+
+    A fifth of the tasks get a deadline in the past, so the autoclose job has work to do. Missing
+    tables are created.
+
+    :return: (project name, task uuids) pairs
+    """
+    from sqlalchemy import insert, select
+    from data.database import engine, Base
+    from data.models import ProjectModel, TaskModel
+
+    now = datetime.now()
+    names = [f"{prefix}-{i}" for i in range(projects)]
+    dataset = []
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(ProjectModel), [{"name": name, "description": "load test"} for name in names])
+        result = await conn.execute(select(ProjectModel.id, ProjectModel.name).where(ProjectModel.name.in_(names)))
+        ids = dict((name, project_id) for project_id, name in result.all())
+
+    rows = []
+    for name in names:
+        uuids = []
+        for i in range(tasks_per_project):
+            task_uuid = uuid.uuid4()
+            uuids.append(str(task_uuid))
+            roll = random.random()
+            rows.append({
+                "uuid": task_uuid, "project_id": ids[name], "title": f"task {i}", "description": "",
+                "status": "done" if roll < 0.3 else "todo",
+                "deadline": now + timedelta(days=random.randint(-5 if roll > 0.8 else 1, 30)),
+            })
+        dataset.append((name, uuids))
+
+    for start in range(0, len(rows), SEED_CHUNK):
+        async with engine.begin() as conn:
+            await conn.execute(insert(TaskModel), rows[start:start + SEED_CHUNK])
+    return dataset
+
+
+async def cleanup(prefix: str) -> None:
+    from sqlalchemy import delete
+    from data.database import engine
+    from data.models import ProjectModel
+
+    async with engine.begin() as conn:
+        await conn.execute(delete(ProjectModel).where(ProjectModel.name.like(f"{prefix}-%")))
+
+
+class Stats:
+    """Latencies and status codes per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, endpoint: str, latency_ms: float, status: str) -> None:
+        self.latencies[endpoint].append(latency_ms)
+        self.statuses[endpoint][status] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            statuses = self.statuses[endpoint]
+            errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+            counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+            for sample in ordered:
+                counts[bisect.bisect_left(HISTOGRAM_BUCKETS, sample)] += 1
+            labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]}ms"]
+            histogram = {label: count for label, count in zip(labels, counts) if count}
+            endpoints[endpoint] = {
+                "requests": len(ordered),
+                "throughput": len(ordered) / elapsed,
+                "error_rate": errors / len(ordered),
+                "statuses": dict(statuses),
+                "p50_ms": ordered[int(0.50 * (len(ordered) - 1))],
+                "p95_ms": ordered[int(0.95 * (len(ordered) - 1))],
+                "p99_ms": ordered[int(0.99 * (len(ordered) - 1))],
+                "max_ms": ordered[-1],
+                "histogram": histogram,
+            }
+        total = sum(len(samples) for samples in self.latencies.values())
+        return {"elapsed_seconds": elapsed, "requests": total, "throughput": total / elapsed, "endpoints": endpoints}
+
+
+class Client:
+    """One simulated user issuing requests from the scenario mix until the deadline."""
+
+    def __init__(self, http, stats: Stats, dataset, hot_tasks, mix: Dict[str, int], rng: random.Random):
+        self.http = http
+        self.stats = stats
+        self.dataset = dataset
+        self.hot_tasks = hot_tasks
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.rng = rng
+
+    def _task(self):
+        name, uuids = self.rng.choice(self.dataset)
+        return name, self.rng.choice(uuids)
+
+    async def _request(self, endpoint: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.http.request(method, url, **kwargs)
+            status = str(response.status_code)
+        except Exception as e:
+            response, status = None, type(e).__name__
+        self.stats.record(endpoint, (time.perf_counter() - start) * 1000, status)
+        return response
+
+    async def run(self, deadline: float) -> None:
+        while time.monotonic() < deadline:
+            operation = self.rng.choices(self.operations, self.weights)[0]
+            await getattr(self, operation)()
+
+    async def list_tasks(self):
+        name, _ = self.rng.choice(self.dataset)
+        await self._request("GET /projects/{name}/tasks/", "GET", f"/projects/{name}/tasks/")
+
+    async def list_projects(self):
+        await self._request("GET /projects/", "GET", "/projects/", params={"limit": 50})
+
+    async def get_task(self):
+        name, task_uuid = self._task()
+        await self._request("GET /projects/{name}/tasks/{uuid}", "GET", f"/projects/{name}/tasks/{task_uuid}")
+
+    async def get_task_hot(self):
+        name, task_uuid = self.rng.choice(self.hot_tasks)
+        await self._request("GET /projects/{name}/tasks/{uuid}", "GET", f"/projects/{name}/tasks/{task_uuid}")
+
+    async def batch_get(self):
+        name, uuids = self.rng.choice(self.dataset)
+        sample = self.rng.sample(uuids, min(20, len(uuids)))
+        await self._request("POST /projects/{name}/tasks/batch-get", "POST", f"/projects/{name}/tasks/batch-get",
+                            json={"uuids": sample})
+
+    async def create_task(self):
+        name, uuids = self.rng.choice(self.dataset)
+        response = await self._request("POST /projects/{name}/tasks/", "POST", f"/projects/{name}/tasks/",
+                                       json={"title": "load test task"})
+        if response is not None and response.status_code == 201:
+            uuids.append(response.json()["uuid"])
+
+    async def _patch(self, name: str, task_uuid: str):
+        status = self.rng.choice(("todo", "doing", "done"))
+        await self._request("PATCH /projects/{name}/tasks/{uuid}", "PATCH", f"/projects/{name}/tasks/{task_uuid}",
+                            json={"status": status})
+
+    async def patch_task(self):
+        await self._patch(*self._task())
+
+    async def patch_task_hot(self):
+        await self._patch(*self.rng.choice(self.hot_tasks))
+
+    async def due_tasks(self):
+        end = (datetime.now() + timedelta(days=7)).isoformat()
+        await self._request("GET /tasks/due", "GET", "/tasks/due", params={"end": end, "limit": 100})
+
+
+async def run_autoclose(interval: float, deadline: float, stats: Stats) -> None:
+    """Run the autoclose job every interval seconds, recorded like an endpoint."""
+    from data.database import AsyncSessionLocal
+    from core.jobs import autoclose_overdue_tasks
+
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                await autoclose_overdue_tasks(db)
+            status = "200"
+        except Exception as e:
+            status = type(e).__name__
+        stats.record("job autoclose_overdue_tasks", (time.perf_counter() - start) * 1000, status)
+        await asyncio.sleep(interval)
+
+
+def print_summary(scenario: str, summary: dict) -> None:
+    print(f"\nScenario {scenario}: {summary['requests']:,} requests in {summary['elapsed_seconds']:.1f}s "
+          f"({summary['throughput']:,.0f} requests/sec)\n")
+    print(f"{'endpoint':<42} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}")
+    for endpoint, stats in summary["endpoints"].items():
+        print(f"{endpoint:<42} {stats['requests']:>9,} {stats['throughput']:>8,.0f} {stats['error_rate']:>7.2%} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+    print("\nLatency histogram")
+    for endpoint, stats in summary["endpoints"].items():
+        buckets = "  ".join(f"{bucket}:{count}" for bucket, count in stats["histogram"].items())
+        print(f"  {endpoint:<40} {buckets}")
+        errors = {status: count for status, count in stats["statuses"].items() if not status.startswith("2")}
+        if errors:
+            print(f"  {'':<40} errors: {errors}")
+
+
+async def main_async(args) -> dict:
+    import httpx
+
+    prefix = f"load-{uuid.uuid4().hex[:8]}"
+    started = time.perf_counter()
+    dataset = await seed(args.projects, args.tasks, prefix)
+    seed_seconds = time.perf_counter() - started
+    print(f"Seeded {args.projects:,} projects x {args.tasks:,} tasks in {seed_seconds:.1f}s "
+          f"({args.projects * args.tasks / seed_seconds:,.0f} tasks/sec)")
+
+    if args.base_url:
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.clients))
+        base_url = args.base_url.rstrip("/") + "/api/v1"
+    else:
+        from main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadgen/api/v1"
+
+    stats = Stats()
+    rng = random.Random(args.seed)
+    hot_tasks = [(name, uuids[0]) for name, uuids in rng.sample(dataset, min(args.hot_tasks, len(dataset)))]
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as http:
+            deadline = time.monotonic() + args.duration
+            clients = [Client(http, stats, dataset, hot_tasks, SCENARIOS[args.scenario], random.Random(rng.random()))
+                       for _ in range(args.clients)]
+            workers = [client.run(deadline) for client in clients]
+            if args.autoclose_interval:
+                workers.append(run_autoclose(args.autoclose_interval, deadline, stats))
+            started = time.perf_counter()
+            await asyncio.gather(*workers)
+            elapsed = time.perf_counter() - started
+    finally:
+        if args.cleanup:
+            await cleanup(prefix)
+
+    summary = stats.summary(elapsed)
+    summary.update(scenario=args.scenario, clients=args.clients, projects=args.projects,
+                   tasks_per_project=args.tasks, seed_seconds=seed_seconds)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load generator for the todolist API')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='mixed', help='Request mix (default: mixed)')
+    parser.add_argument('--projects', type=int, default=50, help='Projects to seed (default: 50)')
+    parser.add_argument('--tasks', type=int, default=200, help='Tasks to seed per project (default: 200)')
+    parser.add_argument('--clients', type=int, default=20, help='Concurrent clients (default: 20)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run (default: 30)')
+    parser.add_argument('--hot-tasks', type=int, default=5, help='Tasks hit by patch-storm (default: 5)')
+    parser.add_argument('--autoclose-interval', type=float, default=0,
+                        help='Also run the autoclose job every N seconds (default: off)')
+    parser.add_argument('--base-url', help='Server to load, e.g. http://localhost:8000 (default: in-process ASGI)')
+    parser.add_argument('--timeout', type=float, default=30, help='Request timeout in seconds (default: 30)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed of the request mix (default: 1)')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--keep-data', dest='cleanup', action='store_false', help='Keep the seeded projects')
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    print_summary(args.scenario, summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
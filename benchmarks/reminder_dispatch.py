@@ -0,0 +1,237 @@
+"""
+Deadline-reminder delivery against a local stub webhook server.
+
+The stub is a minimal HTTP/1.1 server with keep-alive on 127.0.0.1. Every path is a separate
+webhook endpoint; the stub can add latency and answer a share of the requests with 503 (plus
+Retry-After), and counts connections, requests, received reminders and the peak number of
+concurrent requests per endpoint.
+
+1. Naive baseline: one POST per reminder on a new connection, sequentially.
+2. ReminderDispatcher: per-endpoint batches, a worker pool over one connection pool, retries.
+   Checks that every reminder was received, that connections were reused and that the
+   per-endpoint concurrency limit held.
+3. With --with-db: the full send_deadline_reminders job against DATABASE_URL (tables are created
+   if missing): seeds projects with webhooks pointing at the stub and tasks due within the lead
+   time, runs the job twice and checks that every reminder is sent once.
+
+Usage:
+    poetry run python -m benchmarks.reminder_dispatch
+    poetry run python -m benchmarks.reminder_dispatch --reminders 50000 --endpoints 20 --latency-ms 20 --failure-rate 0.1
+    DATABASE_URL=sqlite+aiosqlite:///bench.db poetry run python -m benchmarks.reminder_dispatch --with-db
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+
+from core.jobs.reminder_dispatch import Reminder, ReminderDispatcher
+
+
+class StubWebhookServer:
+    """Keep-alive HTTP/1.1 server that accepts reminder batches on any path."""
+
+    def __init__(self, latency_ms: float = 0.0, failure_rate: float = 0.0, seed: int = 42):
+        self.latency = latency_ms / 1000
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+        self.failures = 0
+        self.received: Counter = Counter()
+        self.in_flight: Counter = Counter()
+        self.peak_in_flight: Counter = Counter()
+        self.server = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024)
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    def reset(self) -> None:
+        self.connections = self.requests = self.failures = 0
+        self.received.clear()
+        self.peak_in_flight.clear()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                path = lines[0].split(" ")[1]
+                headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+                self.in_flight[path] += 1
+                self.peak_in_flight[path] = max(self.peak_in_flight[path], self.in_flight[path])
+                try:
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    if self.rng.random() < self.failure_rate:
+                        self.failures += 1
+                        status, extra = "503 Service Unavailable", "Retry-After: 0\r\n"
+                    else:
+                        for reminder in json.loads(body)["reminders"]:
+                            self.received[(reminder["task_uuid"], reminder["deadline"])] += 1
+                        status, extra = "204 No Content", ""
+                finally:
+                    self.in_flight[path] -= 1
+                close = headers.get("connection", "").lower() == "close"
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\n{extra}"
+                             f"{'Connection: close' if close else 'Connection: keep-alive'}\r\n\r\n".encode())
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+def make_reminders(count: int, urls: list) -> list:
+    deadline = datetime.now().replace(microsecond=0) + timedelta(minutes=30)
+    return [
+        Reminder(uuid.uuid4(), deadline, i % len(urls), f"project-{i % len(urls)}", f"task {i}", urls[i % len(urls)],
+                 30, 0)
+        for i in range(count)
+    ]
+
+
+async def naive(stub: StubWebhookServer, reminders: list) -> float:
+    """One request per reminder on a fresh connection, as a per-task call from the scheduler loop would do."""
+    import httpx
+
+    start = time.perf_counter()
+    for reminder in reminders:
+        async with httpx.AsyncClient() as client:
+            await client.post(reminder.url, content=ReminderDispatcher.payload([reminder]),
+                              headers={"Content-Type": "application/json", "Connection": "close"})
+    return time.perf_counter() - start
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"  {label:<56} {'ok' if ok else 'FAILED'}")
+    return ok
+
+
+async def run_job(stub: StubWebhookServer, projects: int, tasks_per_project: int, dispatcher: ReminderDispatcher) -> list:
+    from sqlalchemy import delete, insert, select
+    from data.database import engine, Base, AsyncSessionLocal
+    from data.models import ProjectModel, TaskModel, ReminderWebhookModel
+    from core.jobs.send_reminders import send_deadline_reminders
+
+    prefix = f"reminder-bench-{uuid.uuid4().hex[:8]}"
+    now = datetime.now()
+    names = [f"{prefix}-{i}" for i in range(projects)]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(ProjectModel), [{"name": name, "description": "reminder bench"} for name in names])
+        ids = [project_id for project_id, in (await conn.execute(
+            select(ProjectModel.id).where(ProjectModel.name.in_(names)))).all()]
+        await conn.execute(insert(ReminderWebhookModel), [
+            {"project_id": project_id, "url": f"{stub.base_url}/hooks/{project_id}", "minutes_before": 60}
+            for project_id in ids
+        ])
+        # Half of the tasks are due for a reminder (deadline within 60 minutes), half are not yet
+        await conn.execute(insert(TaskModel), [
+            {"uuid": uuid.uuid4(), "project_id": project_id, "title": f"task {i}", "description": "",
+             "status": "todo", "deadline": now + timedelta(minutes=5 + (i % 2) * 120, seconds=i)}
+            for project_id in ids for i in range(tasks_per_project)
+        ])
+    expected = projects * ((tasks_per_project + 1) // 2)
+    results = []
+    try:
+        stub.reset()
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            first = await send_deadline_reminders(db, dispatcher)
+        elapsed = time.perf_counter() - start
+        async with AsyncSessionLocal() as db:
+            second = await send_deadline_reminders(db, dispatcher)
+        print(f"  first run: {first['claimed_count']:,} claimed, {first['sent_count']:,} sent "
+              f"in {first['batches']:,} batches, {elapsed:.2f}s")
+        results.append(check("every due reminder sent", first['sent_count'] == expected
+                             and len(stub.received) == expected))
+        results.append(check("second run claims nothing", second['claimed_count'] == 0))
+        results.append(check("no reminder delivered twice", max(stub.received.values(), default=1) == 1))
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(delete(ProjectModel).where(ProjectModel.name.like(f"{prefix}-%")))
+    return results
+
+
+async def main_async(args) -> bool:
+    stub = StubWebhookServer(args.latency_ms, args.failure_rate)
+    await stub.start()
+    urls = [f"{stub.base_url}/hooks/{i}" for i in range(args.endpoints)]
+    dispatcher = ReminderDispatcher(workers=args.workers, batch_size=args.batch_size,
+                                    endpoint_concurrency=args.endpoint_concurrency, backoff_seconds=0.01)
+    results = []
+    try:
+        sample = make_reminders(min(args.reminders, args.naive_sample), urls)
+        print(f"Naive: one request per reminder ({len(sample):,} reminders)")
+        stub.failure_rate = 0.0
+        elapsed = await naive(stub, sample)
+        print(f"  {len(sample) / elapsed:,.0f} reminders/sec")
+        stub.failure_rate = args.failure_rate
+
+        reminders = make_reminders(args.reminders, urls)
+        print(f"Dispatcher: {len(reminders):,} reminders to {args.endpoints} endpoints "
+              f"({args.workers} workers, batches of {args.batch_size}, {args.endpoint_concurrency} per endpoint)")
+        stub.reset()
+        start = time.perf_counter()
+        batches = await dispatcher.dispatch(reminders)
+        elapsed = time.perf_counter() - start
+        delivered = sum(len(batch.reminders) for batch in batches if batch.delivered)
+        retries = sum(batch.attempts - 1 for batch in batches)
+        print(f"  {delivered / elapsed:,.0f} reminders/sec, {len(batches):,} batches, {stub.requests:,} requests "
+              f"({retries:,} retries), {stub.connections} connections")
+        results.append(check("every reminder received exactly once", delivered == len(reminders)
+                             and len(stub.received) == len(reminders) and max(stub.received.values()) == 1))
+        results.append(check("connections reused", stub.connections <= args.workers))
+        results.append(check("per-endpoint concurrency limit held",
+                             max(stub.peak_in_flight.values()) <= args.endpoint_concurrency))
+
+        if args.with_db:
+            print(f"Job: send_deadline_reminders ({args.db_projects} projects x {args.db_tasks} tasks)")
+            stub.failure_rate = 0.0
+            results.extend(await run_job(stub, args.db_projects, args.db_tasks, dispatcher))
+    finally:
+        await stub.stop()
+    return all(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deadline reminder delivery benchmark')
+    parser.add_argument('--reminders', type=int, default=20000, help='Number of reminders (default: 20000)')
+    parser.add_argument('--endpoints', type=int, default=10, help='Number of webhook endpoints (default: 10)')
+    parser.add_argument('--workers', type=int, default=16, help='Dispatcher workers (default: 16)')
+    parser.add_argument('--batch-size', type=int, default=100, help='Reminders per request (default: 100)')
+    parser.add_argument('--endpoint-concurrency', type=int, default=4,
+                        help='Requests in flight per endpoint (default: 4)')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Stub response latency (default: 5)')
+    parser.add_argument('--failure-rate', type=float, default=0.05,
+                        help='Share of stub responses that are 503 (default: 0.05)')
+    parser.add_argument('--naive-sample', type=int, default=500,
+                        help='Reminders sent one by one for the baseline (default: 500)')
+    parser.add_argument('--with-db', action='store_true', help='Also run the job against DATABASE_URL')
+    parser.add_argument('--db-projects', type=int, default=20, help='Projects seeded for the job (default: 20)')
+    parser.add_argument('--db-tasks', type=int, default=500, help='Tasks per seeded project (default: 500)')
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main_async(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -50,4 +50,56 @@ class ProjectNotFoundError(Exception):
 
 class TaskNotFoundError(Exception):
     """Custom exception for when a task is not found in the database."""
-    pass
\ No newline at end of file
+    pass
+
+
+class TaskVersionConflictError(Exception):
+    """Custom exception for an update based on an outdated task version."""
+
+    def __init__(self, message: str, current_version: int):
+        super().__init__(message)
+        self.current_version = current_version
+
+class InvalidTaskFieldsError(Exception):
+    """Custom exception for unknown fields requested in a task fieldset."""
+    pass
+
+
+class InvalidRecurrenceRuleError(Exception):
+    """Custom exception for a recurrence rule with an invalid schedule."""
+    pass
+
+
+class RecurrenceRuleNotFoundError(Exception):
+    """Custom exception for when a recurrence rule is not found in the database."""
+    pass
+
+
+class ReminderWebhookNotFoundError(Exception):
+    """Custom exception for when a project has no reminder webhook."""
+    pass
+
+
+class QueuedJobNotFoundError(Exception):
+    """Custom exception for when a queued job is not found in the database."""
+    pass
+
+
+class QueuedJobOutputNotReadyError(Exception):
+    """Custom exception for when the output of a queued job is requested before the job succeeded."""
+    pass
+
+
+class ProjectMovingError(Exception):
+    """Custom exception for a request to a project that is being moved to another shard."""
+    pass
+
+
+class QueuedJobLostError(Exception):
+    """Custom exception for a queued job that was taken away from its worker (requeued as stale) while it ran."""
+    pass
+
+
+class InvalidCursorError(Exception):
+    """Custom exception for a pagination cursor that is malformed or does not match the request."""
+    pass
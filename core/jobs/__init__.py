@@ -2,5 +2,14 @@
 Background jobs for the todolist application.
 """
 from core.jobs.autoclose_overdue import autoclose_overdue_tasks
+from core.jobs.purge_idempotency_keys import purge_expired_idempotency_keys
+from core.jobs.archive_done import archive_done_tasks
+from core.jobs.materialize_recurring import materialize_recurring_tasks
+from core.jobs.send_reminders import send_deadline_reminders
+from core.jobs.job_queue import run_queue_workers
+from core.jobs.job_runs import run_recorded_job
+from core.jobs.job_logging import get_job_logger
 
-__all__ = ['autoclose_overdue_tasks']
+__all__ = ['autoclose_overdue_tasks', 'purge_expired_idempotency_keys', 'archive_done_tasks',
+           'materialize_recurring_tasks', 'send_deadline_reminders', 'run_queue_workers', 'run_recorded_job',
+           'get_job_logger']
@@ -0,0 +1,37 @@
+"""Job to move old done tasks out of the active tasks table."""
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from data.repositories.task_repository import TaskRepository
+from data.env_loader import ARCHIVE_DONE_AFTER_DAYS, ARCHIVE_CHUNK_SIZE
+from core.jobs.job_logging import get_job_logger
+
+
+async def archive_done_tasks(db: AsyncSession) -> dict:
+    """
+    Archive done tasks that have not been updated for ARCHIVE_DONE_AFTER_DAYS days.
+
+    The tasks are copied to tasks_archive and deleted from tasks in chunks of ARCHIVE_CHUNK_SIZE,
+    each in its own transaction, so locks are short and the job can be interrupted at any point.
+
+    :param db: Async database session
+    :return: Dictionary with the number of archived tasks
+    """
+    logger = get_job_logger()
+    cutoff = datetime.now() - timedelta(days=ARCHIVE_DONE_AFTER_DAYS)
+    task_repo = TaskRepository(db)
+
+    archived = 0
+    chunks = 0
+    while True:
+        moved = await task_repo.archive_done_tasks(cutoff, ARCHIVE_CHUNK_SIZE)
+        await db.commit()
+        if moved == 0:
+            break
+        archived += moved
+        chunks += 1
+        if moved < ARCHIVE_CHUNK_SIZE:
+            break
+
+    logger.info("Archived done tasks", extra={'fields': {'job': 'archive_done_tasks', 'archived_count': archived,
+                                                          'chunks': chunks, 'cutoff': cutoff.isoformat()}})
+    return {'archived_count': archived, 'rows_affected': archived, 'cutoff': cutoff}
@@ -1,9 +1,12 @@
 """Job to automatically close overdue tasks (async version)."""
+import logging
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import update
 from data.models import TaskModel
+from data.repositories.project_repository import ProjectRepository
 from core.models import Status
+from core.jobs.job_logging import get_job_logger
 
 
 async def autoclose_overdue_tasks(db: AsyncSession) -> dict:
@@ -14,33 +17,36 @@ async def autoclose_overdue_tasks(db: AsyncSession) -> dict:
     - If deadline < now and status != 'done'
     - Then mark the task as 'done' and set updated_at to now
 
+    The tasks are closed with a single UPDATE ... RETURNING instead of loading each row.
+
     :param db: Async database session
     :return: Dictionary with count of closed tasks and their UUIDs
     """
+    logger = get_job_logger()
     now = datetime.now()
 
-    result = await db.execute(select(TaskModel).where(TaskModel.deadline < now, TaskModel.status != Status.DONE))
-    overdue_tasks = result.scalars().all()
-
-    closed_count = 0
-    closed_uuids = []
-
-    for task in overdue_tasks:
-        task.status = Status.DONE
-        task.updated_at = now
-        closed_count += 1
-        closed_uuids.append(str(task.uuid))
+    result = await db.execute(
+        update(TaskModel)
+        .where(TaskModel.deadline < now, TaskModel.status != Status.DONE)
+        .values(status=Status.DONE, updated_at=now, version=TaskModel.version + 1)
+        .returning(TaskModel.uuid, TaskModel.project_id)
+    )
+    closed = result.all()
+    closed_uuids = [str(uuid) for uuid, _ in closed]
+    closed_count = len(closed_uuids)
 
     if closed_count > 0:
+        await ProjectRepository(db).bump_versions([project_id for _, project_id in closed])
         await db.commit()
-        print(f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] Auto-closed {closed_count} overdue task(s)")
-        for uuid in closed_uuids:
-            print(f"  - Task UUID: {uuid}")
-    else:
-        print(f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] No overdue tasks to close")
+    logger.info("Auto-closed overdue tasks", extra={'fields': {'job': 'autoclose_overdue_tasks',
+                                                                 'closed_count': closed_count}})
+    # One record for the whole batch; per-task output is only produced at DEBUG level
+    if closed_uuids and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Closed task UUIDs", extra={'fields': {'closed_uuids': closed_uuids}})
 
     return {
         'closed_count': closed_count,
         'closed_uuids': closed_uuids,
+        'rows_affected': closed_count,
         'timestamp': now
     }
@@ -0,0 +1,53 @@
+"""Non-blocking structured logging for background jobs."""
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from data.env_loader import JOB_LOG_LEVEL
+
+JOB_LOGGER_NAME = 'todolist.jobs'
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line; structured fields are passed as extra={'fields': {...}}."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def get_job_logger() -> logging.Logger:
+    """
+    Get the job logger.
+
+    Records are put on an in-memory queue and written to stdout by a background thread,
+    so logging never blocks the job on terminal or pipe I/O.
+    :return: The configured logger
+    """
+    global _listener
+    logger = logging.getLogger(JOB_LOGGER_NAME)
+    if _listener is None:
+        log_queue = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(JsonFormatter())
+        _listener = QueueListener(log_queue, stream_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+        logger.addHandler(QueueHandler(log_queue))
+        logger.setLevel(JOB_LOG_LEVEL)
+        logger.propagate = False
+    return logger
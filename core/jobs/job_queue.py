@@ -0,0 +1,166 @@
+"""
+Workers of the persistent job queue (the queued_jobs table).
+
+Each worker polls for the oldest runnable job every JOB_QUEUE_POLL_SECONDS, claims it with
+FOR UPDATE SKIP LOCKED (so concurrent workers, in this or other processes, never wait for each
+other or claim the same job) and runs its handler from core/jobs/queue_handlers.py. While the
+handler runs, the worker records a heartbeat every JOB_QUEUE_HEARTBEAT_SECONDS from a separate
+session; if the job was taken away in the meantime, the handler is cancelled.
+
+A reaper requeues running jobs without a heartbeat for JOB_QUEUE_STALE_SECONDS (their worker died)
+and deletes finished jobs after JOB_QUEUE_RETENTION_DAYS. A failed attempt is retried after
+JOB_QUEUE_RETRY_SECONDS, doubled for every further attempt, until the job's max_attempts.
+
+The workers run on the caller's event loop; scheduler.py hosts them next to the periodic jobs.
+"""
+import asyncio
+import json
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.exceptions import ProjectNotFoundError, QueuedJobLostError
+from core.jobs.job_logging import get_job_logger
+from core.jobs.queue_handlers import HANDLERS
+from data.env_loader import (JOB_QUEUE_POLL_SECONDS, JOB_QUEUE_HEARTBEAT_SECONDS, JOB_QUEUE_STALE_SECONDS,
+                             JOB_QUEUE_RETRY_SECONDS, JOB_QUEUE_RETENTION_DAYS)
+from data.models import QueuedJobModel
+from data.repositories.queued_job_repository import QueuedJobRepository
+
+# Failures that a retry cannot fix: the job fails at once
+_PERMANENT_ERRORS = (ProjectNotFoundError, KeyError, ValueError, TypeError)
+
+
+async def _wait(stop: asyncio.Event, seconds: float) -> None:
+    """Sleep for a number of seconds, or until stop is set."""
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _execute(session_factory: Callable[[], AsyncSession], job: QueuedJobModel, worker_id: str) -> str:
+    """Run the handler of a claimed job and record how it ended; return the final status of the attempt."""
+    logger = get_job_logger()
+    fields = {'job': 'job_queue', 'job_id': job.id, 'kind': job.kind, 'worker': worker_id, 'attempt': job.attempts}
+    async with session_factory() as db:
+        jobs = QueuedJobRepository(db)
+        try:
+            handler = HANDLERS.get(job.kind)
+            if handler is None:
+                raise ValueError(f"Unknown job kind '{job.kind}'.")
+            outcome = await handler(db, job, jobs)
+            await jobs.finish(job.id, worker_id, 'succeeded', datetime.now(), json.dumps(outcome.result),
+                              outcome.output)
+            await db.commit()
+            logger.info("Queued job succeeded", extra={'fields': {**fields, **outcome.result}})
+            return 'succeeded'
+        except asyncio.CancelledError:
+            await db.rollback()
+            raise
+        except QueuedJobLostError as e:
+            # The chunk was rolled back; the job belongs to the queue (or another worker) again
+            await db.rollback()
+            logger.warning("Queued job was taken over, stopping it", extra={'fields': {**fields, 'error': str(e)}})
+            return 'lost'
+        except Exception as e:
+            await db.rollback()
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, _PERMANENT_ERRORS) or job.attempts >= job.max_attempts:
+                await jobs.finish(job.id, worker_id, 'failed', datetime.now(), error=error)
+                status = 'failed'
+            else:
+                delay = JOB_QUEUE_RETRY_SECONDS * 2 ** (job.attempts - 1)
+                await jobs.retry_later(job.id, worker_id, datetime.now() + timedelta(seconds=delay), error)
+                status = 'queued'
+            await db.commit()
+            logger.error("Queued job attempt failed", extra={'fields': {**fields, 'status': status, 'error': error}})
+            return status
+
+
+async def _run_claimed(session_factory: Callable[[], AsyncSession], job: QueuedJobModel, worker_id: str) -> None:
+    """Run a claimed job, sending heartbeats until it ends; cancel it if the claim is lost."""
+    running = asyncio.get_running_loop().create_task(_execute(session_factory, job, worker_id))
+    try:
+        while True:
+            done, _ = await asyncio.wait({running}, timeout=JOB_QUEUE_HEARTBEAT_SECONDS)
+            if done:
+                break
+            async with session_factory() as db:
+                held = await QueuedJobRepository(db).heartbeat(job.id, worker_id, datetime.now())
+                await db.commit()
+            if not held:
+                get_job_logger().warning("Queued job was taken over, cancelling it",
+                                         extra={'fields': {'job': 'job_queue', 'job_id': job.id, 'worker': worker_id}})
+                running.cancel()
+                break
+        await asyncio.gather(running, return_exceptions=True)
+    finally:
+        if not running.done():
+            running.cancel()
+            await asyncio.gather(running, return_exceptions=True)
+
+
+async def _worker(session_factory: Callable[[], AsyncSession], worker_id: str, stop: asyncio.Event) -> None:
+    logger = get_job_logger()
+    while not stop.is_set():
+        try:
+            async with session_factory() as db:
+                job = await QueuedJobRepository(db).claim_next(worker_id, datetime.now())
+                await db.commit()
+        except Exception as e:
+            logger.error("Failed to claim a queued job", extra={'fields': {'job': 'job_queue', 'worker': worker_id,
+                                                                          'error': str(e)}})
+            job = None
+        if job is None:
+            await _wait(stop, JOB_QUEUE_POLL_SECONDS)
+            continue
+        try:
+            await _run_claimed(session_factory, job, worker_id)
+        except Exception as e:
+            # The job stays running without heartbeats, so the reaper requeues it
+            logger.error("Queued job worker error", extra={'fields': {'job': 'job_queue', 'job_id': job.id,
+                                                                     'worker': worker_id, 'error': str(e)}})
+
+
+async def _reaper(session_factory: Callable[[], AsyncSession], stop: asyncio.Event) -> None:
+    logger = get_job_logger()
+    while not stop.is_set():
+        try:
+            now = datetime.now()
+            async with session_factory() as db:
+                repo = QueuedJobRepository(db)
+                released = await repo.requeue_stale(now - timedelta(seconds=JOB_QUEUE_STALE_SECONDS), now)
+                purged = await repo.purge_finished(now - timedelta(days=JOB_QUEUE_RETENTION_DAYS))
+                await db.commit()
+            if released or purged:
+                logger.info("Reaped queued jobs", extra={'fields': {'job': 'job_queue', 'released_count': released,
+                                                                   'purged_count': purged}})
+        except Exception as e:
+            logger.error("Failed to reap queued jobs", extra={'fields': {'job': 'job_queue', 'error': str(e)}})
+        await _wait(stop, max(JOB_QUEUE_STALE_SECONDS / 2, JOB_QUEUE_POLL_SECONDS))
+
+
+async def run_queue_workers(session_factory: Callable[[], AsyncSession], concurrency: int,
+                            stop: Optional[asyncio.Event] = None) -> None:
+    """
+    Run queue workers and the reaper until stop is set (or the task is cancelled).
+
+    A worker finishes the job it is running before it stops; a cancelled job is requeued by the
+    reaper of any process once its heartbeat is stale.
+
+    :param session_factory: Factory of async database sessions
+    :param concurrency: Number of jobs run at the same time
+    :param stop: Event that stops the workers (default: run until cancelled)
+    """
+    stop = stop or asyncio.Event()
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    get_job_logger().info("Queue workers started", extra={'fields': {'job': 'job_queue', 'workers': concurrency,
+                                                                     'worker_prefix': prefix}})
+    await asyncio.gather(
+        _reaper(session_factory, stop),
+        *(_worker(session_factory, f"{prefix}:{n}", stop) for n in range(concurrency))
+    )
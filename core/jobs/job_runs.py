@@ -0,0 +1,52 @@
+"""Run background jobs and record each run in the job_runs table."""
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.jobs.job_logging import get_job_logger
+from data.repositories.job_run_repository import JobRunRepository
+
+
+async def run_recorded_job(session_factory: Callable[[], AsyncSession], job_name: str,
+                           job: Callable[[AsyncSession], Awaitable[dict]]) -> Optional[dict]:
+    """
+    Run a job with its own session and record the run (start, end, duration, rows affected, error).
+
+    :param session_factory: Factory of async database sessions
+    :param job_name: Name under which the run is recorded
+    :param job: Job coroutine function; its result may report 'rows_affected'
+    :return: The job result, or None if the job failed
+    """
+    logger = get_job_logger()
+    started_at = datetime.now()
+    started = time.perf_counter()
+    result, error = None, None
+
+    async with session_factory() as db:
+        try:
+            result = await job(db)
+        except Exception as e:
+            await db.rollback()
+            error = f"{type(e).__name__}: {e}"
+
+    duration_ms = round((time.perf_counter() - started) * 1000, 3)
+    rows_affected = (result or {}).get('rows_affected', 0)
+    status = 'failed' if error else 'succeeded'
+
+    try:
+        async with session_factory() as db:
+            await JobRunRepository(db).record_run(
+                job_name, status, started_at, datetime.now(), duration_ms, rows_affected, error
+            )
+            await db.commit()
+    except Exception as e:
+        logger.error("Failed to record job run", extra={'fields': {'job': job_name, 'error': str(e)}})
+
+    fields = {'job': job_name, 'status': status, 'duration_ms': duration_ms, 'rows_affected': rows_affected}
+    if error:
+        logger.error("Job failed", extra={'fields': {**fields, 'error': error}})
+    else:
+        logger.info("Job finished", extra={'fields': fields})
+    return result
@@ -0,0 +1,44 @@
+"""Job to materialize the occurrences of recurrence rules in the rolling window."""
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from data.repositories.recurrence_repository import RecurrenceRuleRepository
+from data.env_loader import RECURRENCE_WINDOW_DAYS, RECURRENCE_CHUNK_SIZE
+from core.services.recurrence_services import materialize_rules
+from core.jobs.job_logging import get_job_logger
+
+
+async def materialize_recurring_tasks(db: AsyncSession) -> dict:
+    """
+    Create the tasks of recurrence rule occurrences up to RECURRENCE_WINDOW_DAYS ahead.
+
+    Rules are processed in id order in chunks of RECURRENCE_CHUNK_SIZE, each in its own transaction:
+    the chunk is locked (skipping rules locked by a concurrent run), the tasks of all its rules are
+    inserted with one INSERT, and materialized_until is advanced in the same commit.
+
+    :param db: Async database session
+    :return: Dictionary with the number of rules processed and tasks created
+    """
+    logger = get_job_logger()
+    now = datetime.now()
+    horizon = now + timedelta(days=RECURRENCE_WINDOW_DAYS)
+    repo = RecurrenceRuleRepository(db)
+
+    rules_count = 0
+    created = 0
+    after_id = 0
+    while True:
+        rules = await repo.get_rules_to_materialize(horizon, now, after_id, RECURRENCE_CHUNK_SIZE)
+        if not rules:
+            await db.commit()
+            break
+        created += await materialize_rules(db, rules, now)
+        await db.commit()
+        rules_count += len(rules)
+        after_id = rules[-1].id
+        if len(rules) < RECURRENCE_CHUNK_SIZE:
+            break
+
+    logger.info("Materialized recurring tasks", extra={'fields': {'job': 'materialize_recurring_tasks',
+                                                                  'rules_count': rules_count,
+                                                                  'created_count': created}})
+    return {'rules_count': rules_count, 'created_count': created, 'rows_affected': created, 'horizon': horizon}
@@ -0,0 +1,15 @@
+"""Job to delete expired idempotency keys."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from data.repositories.idempotency_repository import IdempotencyRepository
+
+
+async def purge_expired_idempotency_keys(db: AsyncSession) -> dict:
+    """
+    Delete idempotency keys whose replay window has passed.
+
+    :param db: Async database session
+    :return: Dictionary with the number of deleted keys
+    """
+    deleted = await IdempotencyRepository(db).delete_expired()
+    await db.commit()
+    return {'rows_affected': deleted}
@@ -0,0 +1,136 @@
+"""
+Handlers of the job kinds run by the persistent job queue (core/jobs/job_queue.py).
+
+A handler gets a session of its own, the claimed job and the queue repository, and returns a
+JobOutcome. Handlers that change many rows work in chunks of JOB_QUEUE_CHUNK_SIZE and commit once
+per chunk, recording the job progress and bumping the project version in the same transaction:
+requests never wait behind one long transaction, list caches are invalidated as rows change, and a
+retried job resumes where the failed attempt stopped. The progress update only matches while the
+worker still holds the job, so a worker whose job was requeued as stale (and possibly claimed by
+another worker) rolls its chunk back and stops with QueuedJobLostError instead of writing it twice.
+
+ProjectNotFoundError and malformed payloads fail a job at once; any other exception is treated as
+transient and the job is retried.
+"""
+import json
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.exceptions import ProjectNotFoundError, QueuedJobLostError
+from core.validators.task_validators import TASK_FIELDS
+from data.env_loader import JOB_QUEUE_CHUNK_SIZE
+from data.models import QueuedJobModel
+from data.repositories.project_repository import ProjectRepository
+from data.repositories.queued_job_repository import QueuedJobRepository
+from data.repositories.task_repository import TaskRepository
+
+
+class JobOutcome(NamedTuple):
+    """Result of a finished job: a JSON-serializable summary and an optional output document."""
+    result: dict
+    output: Optional[str] = None
+
+
+JobHandler = Callable[[AsyncSession, QueuedJobModel, QueuedJobRepository], Awaitable[JobOutcome]]
+
+
+async def _commit_chunk(db: AsyncSession, jobs: QueuedJobRepository, job: QueuedJobModel, progress: int) -> None:
+    await ProjectRepository(db).bump_versions([job.project_id])
+    if not await jobs.set_progress(job.id, job.locked_by, progress):
+        await db.rollback()
+        raise QueuedJobLostError(f"Job {job.id} is no longer held by worker '{job.locked_by}'.")
+    await db.commit()
+
+
+async def delete_project(db: AsyncSession, job: QueuedJobModel, jobs: QueuedJobRepository) -> JobOutcome:
+    """Delete the tasks of a project (active, then archived) chunk by chunk, then the project itself."""
+    deleted = job.progress
+    tasks = TaskRepository(db)
+    while True:
+        count = await tasks.delete_project_tasks_chunk(job.project_id, JOB_QUEUE_CHUNK_SIZE)
+        if not count:
+            break
+        deleted += count
+        await _commit_chunk(db, jobs, job, deleted)
+    # Recurrence rules, reminder webhooks and tasks created meanwhile go with the project (ON DELETE CASCADE)
+    existed = await ProjectRepository(db).delete_project_by_id(job.project_id)
+    await db.commit()
+    return JobOutcome({'deleted_tasks': deleted, 'project_deleted': existed})
+
+
+async def export_project(db: AsyncSession, job: QueuedJobModel, jobs: QueuedJobRepository) -> JobOutcome:
+    """Export a project with its active and archived tasks as one JSON document."""
+    project = await ProjectRepository(db).get_by_id(job.project_id)
+    if project is None:
+        raise ProjectNotFoundError(f"Project '{job.project_name}' no longer exists.")
+    # Column-level rows in TASK_FIELDS order, no ORM objects
+    rows = await TaskRepository(db).get_tasks_by_project(project.id, TASK_FIELDS, include_archived=True)
+    tasks = [
+        {name: (str(value) if isinstance(value, UUID) else value.isoformat() if isinstance(value, datetime) else value)
+         for name, value in zip(TASK_FIELDS, row) if name != 'project_id'}
+        for row in rows
+    ]
+    document = {
+        'project': {'name': project.name, 'description': project.description,
+                    'created_at': project.created_at.isoformat() if project.created_at else None},
+        'exported_at': datetime.now().isoformat(),
+        'tasks': tasks,
+    }
+    await jobs.set_progress(job.id, job.locked_by, len(tasks))
+    return JobOutcome({'exported_tasks': len(tasks)}, json.dumps(document, separators=(',', ':')))
+
+
+async def import_tasks(db: AsyncSession, job: QueuedJobModel, jobs: QueuedJobRepository) -> JobOutcome:
+    """Insert the tasks of the payload (validated when the job was queued) chunk by chunk."""
+    if await ProjectRepository(db).get_by_id(job.project_id) is None:
+        raise ProjectNotFoundError(f"Project '{job.project_name}' no longer exists.")
+    items = json.loads(job.payload)['tasks']
+    resumed_from = job.progress
+    tasks = TaskRepository(db)
+    for start in range(resumed_from, len(items), JOB_QUEUE_CHUNK_SIZE):
+        chunk = items[start:start + JOB_QUEUE_CHUNK_SIZE]
+        await tasks.create_tasks_bulk([
+            {
+                'uuid': uuid4(),
+                'project_id': job.project_id,
+                'title': item['title'],
+                'description': item['description'],
+                'status': item['status'],
+                'deadline': datetime.fromisoformat(item['deadline']) if item['deadline'] else None,
+            }
+            for item in chunk
+        ])
+        await _commit_chunk(db, jobs, job, start + len(chunk))
+    return JobOutcome({'imported_tasks': len(items), 'resumed_from': resumed_from})
+
+
+async def bulk_update_tasks(db: AsyncSession, job: QueuedJobModel, jobs: QueuedJobRepository) -> JobOutcome:
+    """Apply the same status and/or deadline change to every matching task, in uuid order."""
+    payload = json.loads(job.payload)
+    changes = dict(payload['changes'])
+    if 'deadline' in changes and changes['deadline'] is not None:
+        changes['deadline'] = datetime.fromisoformat(changes['deadline'])
+    # A retried job restarts the scan; tasks it already changed just get the same values again
+    updated = 0
+    after_uuid = None
+    tasks = TaskRepository(db)
+    while True:
+        uuids = await tasks.update_project_tasks_chunk(job.project_id, payload['statuses'], changes, after_uuid,
+                                                       JOB_QUEUE_CHUNK_SIZE)
+        if not uuids:
+            break
+        updated += len(uuids)
+        after_uuid = uuids[-1]
+        await _commit_chunk(db, jobs, job, updated)
+    return JobOutcome({'updated_tasks': updated})
+
+
+HANDLERS: Dict[str, JobHandler] = {
+    'delete_project': delete_project,
+    'export_project': export_project,
+    'import_tasks': import_tasks,
+    'bulk_update_tasks': bulk_update_tasks,
+}
@@ -0,0 +1,175 @@
+"""
+Concurrent delivery of deadline reminders to webhooks.
+
+Reminders are grouped by webhook URL and split into batches of REMINDER_BATCH_SIZE; one POST
+carries a whole batch. A fixed pool of REMINDER_WORKERS workers takes the batches from a queue
+(interleaved across endpoints) and sends them through one shared HTTP client, whose connection
+pool keeps connections to each endpoint open between requests. At most REMINDER_ENDPOINT_CONCURRENCY
+requests are in flight per endpoint, so a slow receiver is not flooded and cannot take every worker.
+
+Connection errors, timeouts, 429 and 5xx responses are retried up to REMINDER_MAX_ATTEMPTS times with
+exponential backoff and jitter (a numeric Retry-After header is honoured); other responses fail the
+batch at once. Delivery is at least once: receivers should deduplicate on (task_uuid, deadline).
+
+The dispatcher does not touch the database, so it can be run against any HTTP server, e.g. the
+local stub in benchmarks/reminder_dispatch.py.
+"""
+import asyncio
+import json
+import random
+from collections import defaultdict
+from datetime import datetime
+from itertools import zip_longest
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+import httpx
+
+from data.env_loader import (REMINDER_WORKERS, REMINDER_BATCH_SIZE, REMINDER_ENDPOINT_CONCURRENCY,
+                             REMINDER_MAX_ATTEMPTS, REMINDER_BACKOFF_SECONDS, REMINDER_BACKOFF_MAX_SECONDS,
+                             REMINDER_TIMEOUT_SECONDS)
+
+
+class Reminder(NamedTuple):
+    """A claimed reminder; the fields follow data.repositories.task_reminder_repository.REMINDER_COLUMNS."""
+    task_uuid: UUID
+    deadline: datetime
+    project_id: int
+    project_name: str
+    title: str
+    url: str
+    minutes_before: int
+    attempts: int
+
+
+class BatchResult(NamedTuple):
+    """Outcome of the delivery of one batch."""
+    url: str
+    reminders: List[Reminder]
+    delivered: bool
+    attempts: int
+    error: Optional[str]
+
+
+def _retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After", "")
+    try:
+        return min(float(value), REMINDER_BACKOFF_MAX_SECONDS)
+    except ValueError:
+        return None
+
+
+class ReminderDispatcher:
+    """Delivers reminders in per-endpoint batches through a bounded pool of workers."""
+
+    def __init__(self, workers: int = REMINDER_WORKERS, batch_size: int = REMINDER_BATCH_SIZE,
+                 endpoint_concurrency: int = REMINDER_ENDPOINT_CONCURRENCY,
+                 max_attempts: int = REMINDER_MAX_ATTEMPTS, backoff_seconds: float = REMINDER_BACKOFF_SECONDS,
+                 timeout_seconds: float = REMINDER_TIMEOUT_SECONDS,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        :param workers: Number of concurrent senders, and size of the connection pool
+        :param batch_size: Maximum reminders per request
+        :param endpoint_concurrency: Maximum requests in flight per webhook URL
+        :param max_attempts: Attempts per batch, including the first
+        :param backoff_seconds: Delay before the first retry; doubled for every further retry
+        :param timeout_seconds: Connect, read and write timeout of a request
+        :param transport: HTTP transport to use instead of the network (e.g. httpx.MockTransport)
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+        self.endpoint_concurrency = endpoint_concurrency
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.timeout_seconds = timeout_seconds
+        self.transport = transport
+
+    def batches(self, reminders: Sequence[Reminder]) -> List[Tuple[str, List[Reminder]]]:
+        """Group reminders by URL into batches, interleaving the endpoints so no endpoint is drained first."""
+        by_url: Dict[str, List[Reminder]] = defaultdict(list)
+        for reminder in reminders:
+            by_url[reminder.url].append(reminder)
+        per_url = [
+            [(url, items[i:i + self.batch_size]) for i in range(0, len(items), self.batch_size)]
+            for url, items in by_url.items()
+        ]
+        return [batch for round_ in zip_longest(*per_url) for batch in round_ if batch is not None]
+
+    @staticmethod
+    def payload(reminders: Sequence[Reminder]) -> bytes:
+        """JSON body of a batch request."""
+        return json.dumps({
+            "reminders": [
+                {
+                    "task_uuid": str(reminder.task_uuid),
+                    "project_name": reminder.project_name,
+                    "title": reminder.title,
+                    "deadline": reminder.deadline.isoformat(),
+                    "minutes_before": reminder.minutes_before,
+                }
+                for reminder in reminders
+            ]
+        }).encode()
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_seconds * 2 ** (attempt - 1), REMINDER_BACKOFF_MAX_SECONDS)
+        return random.uniform(delay / 2, delay)
+
+    async def _deliver(self, client: httpx.AsyncClient, slots: asyncio.Semaphore, url: str,
+                       reminders: List[Reminder]) -> BatchResult:
+        body = self.payload(reminders)
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            delay = None
+            # The endpoint slot is released during the backoff, so other batches can use it
+            async with slots:
+                try:
+                    response = await client.post(url, content=body, headers={"Content-Type": "application/json"})
+                except (httpx.UnsupportedProtocol, httpx.InvalidURL) as e:
+                    return BatchResult(url, reminders, False, attempt, f"{type(e).__name__}: {e}")
+                except httpx.TransportError as e:
+                    error = f"{type(e).__name__}: {e}"
+                else:
+                    if response.is_success:
+                        return BatchResult(url, reminders, True, attempt, None)
+                    error = f"HTTP {response.status_code}"
+                    if not _retryable(response.status_code):
+                        return BatchResult(url, reminders, False, attempt, error)
+                    delay = _retry_after(response)
+            if attempt < self.max_attempts:
+                await asyncio.sleep(delay if delay is not None else self._backoff(attempt))
+        return BatchResult(url, reminders, False, self.max_attempts, error)
+
+    async def _worker(self, client: httpx.AsyncClient, queue: asyncio.Queue, slots: Dict[str, asyncio.Semaphore],
+                      results: List[BatchResult]) -> None:
+        while True:
+            try:
+                url, reminders = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results.append(await self._deliver(client, slots[url], url, reminders))
+
+    async def dispatch(self, reminders: Sequence[Reminder]) -> List[BatchResult]:
+        """
+        Deliver reminders and wait until every batch is delivered or has failed.
+
+        :param reminders: Reminders to deliver
+        :return: One result per batch, in completion order
+        """
+        batches = self.batches(reminders)
+        if not batches:
+            return []
+        queue: asyncio.Queue = asyncio.Queue()
+        for batch in batches:
+            queue.put_nowait(batch)
+        slots: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self.endpoint_concurrency))
+        results: List[BatchResult] = []
+        limits = httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers)
+        async with httpx.AsyncClient(timeout=self.timeout_seconds, limits=limits, transport=self.transport) as client:
+            await asyncio.gather(*(self._worker(client, queue, slots, results)
+                                   for _ in range(min(self.workers, len(batches)))))
+        return results
@@ -0,0 +1,65 @@
+"""Job to deliver deadline reminders to project webhooks."""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from data.repositories.task_reminder_repository import TaskReminderRepository
+from data.env_loader import (REMINDER_MAX_MINUTES_BEFORE, REMINDER_CLAIM_CHUNK_SIZE, REMINDER_MAX_PER_RUN,
+                             REMINDER_CLAIM_TIMEOUT_SECONDS, REMINDER_RETENTION_HOURS)
+from core.jobs.reminder_dispatch import Reminder, ReminderDispatcher
+from core.jobs.job_logging import get_job_logger
+
+
+async def send_deadline_reminders(db: AsyncSession, dispatcher: Optional[ReminderDispatcher] = None) -> dict:
+    """
+    Claim the reminders that are due and deliver them.
+
+    Stage 1 claims up to REMINDER_MAX_PER_RUN reminders in chunks, one commit per chunk: claims left
+    by a run that stopped more than REMINDER_CLAIM_TIMEOUT_SECONDS ago, then open tasks whose
+    deadline is within the lead time of their project's webhook. Stage 2 delivers them with the
+    ReminderDispatcher, holding no transaction. Stage 3 records the outcome of every batch and
+    deletes reminders whose deadline passed more than REMINDER_RETENTION_HOURS ago.
+
+    :param db: Async database session
+    :param dispatcher: Dispatcher to deliver with (default: one configured from the environment)
+    :return: Dictionary with the numbers of claimed, sent and failed reminders
+    """
+    logger = get_job_logger()
+    now = datetime.now()
+    repo = TaskReminderRepository(db)
+
+    rows = list(await repo.reclaim_stale_reminders(now, now - timedelta(seconds=REMINDER_CLAIM_TIMEOUT_SECONDS),
+                                                   REMINDER_MAX_PER_RUN))
+    await db.commit()
+    reclaimed = len(rows)
+    while len(rows) < REMINDER_MAX_PER_RUN:
+        claimed = await repo.claim_due_reminders(now, REMINDER_MAX_MINUTES_BEFORE,
+                                                 min(REMINDER_CLAIM_CHUNK_SIZE, REMINDER_MAX_PER_RUN - len(rows)))
+        # Committed per chunk, so concurrent runs see the claims and skip those tasks
+        await db.commit()
+        if not claimed:
+            break
+        rows.extend(claimed)
+
+    results = await (dispatcher or ReminderDispatcher()).dispatch([Reminder(*row) for row in rows])
+
+    finished_at = datetime.now()
+    counts = Counter()
+    for result in results:
+        status = 'sent' if result.delivered else 'failed'
+        counts[status] += len(result.reminders)
+        counts['requests'] += result.attempts
+        await repo.record_results([(r.task_uuid, r.deadline) for r in result.reminders], status, result.attempts,
+                                  finished_at, result.error)
+    purged = await repo.purge_reminders(now - timedelta(hours=REMINDER_RETENTION_HOURS))
+    await db.commit()
+
+    fields = {'job': 'send_deadline_reminders', 'claimed_count': len(rows), 'reclaimed_count': reclaimed,
+              'sent_count': counts['sent'], 'failed_count': counts['failed'], 'batches': len(results),
+              'requests': counts['requests'], 'purged_count': purged}
+    logger.info("Sent deadline reminders", extra={'fields': fields})
+    if counts['failed']:
+        errors = sorted({result.error for result in results if not result.delivered})
+        logger.warning("Reminder batches failed", extra={'fields': {'job': 'send_deadline_reminders',
+                                                                   'errors': errors}})
+    return {**{key: value for key, value in fields.items() if key != 'job'}, 'rows_affected': len(rows)}
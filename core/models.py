@@ -7,7 +7,7 @@ from data.env_loader import MAX_NUMBER_OF_PROJECT, MAX_NUMBER_OF_TASK
 
 from datetime import datetime
 
-from typing import Optional
+from typing import Optional, Iterable, Sequence, List
 
 from utils.id_generator import tiny_id
 
@@ -22,10 +22,15 @@ class Status:
 class Task:
     """Represents a task with title, description, status, and deadline."""
 
+    # Slots keep tasks compact when large lists are held in memory (no per-instance __dict__)
+    __slots__ = ('uuid', 'title', 'description', 'status', 'deadline', 'id', 'project_id',
+                 'created_at', 'updated_at', 'version')
+
     def __init__(self, title: str, description: str = "", status: str = Status.TODO,
                  deadline: Optional[datetime | str] = None, id: Optional[int] = None, 
                  project_id: Optional[int] = None,
-                 created_at: Optional[datetime] = None, updated_at: Optional[datetime] = None):
+                 created_at: Optional[datetime] = None, updated_at: Optional[datetime] = None,
+                 uuid: Optional[str] = None, version: Optional[int] = None):
         """
         Initialize a new Task instance.
 
@@ -37,9 +42,11 @@ class Task:
         :param project_id: Optional project ID
         :param created_at: Optional creation timestamp
         :param updated_at: Optional update timestamp
+        :param uuid: Optional task UUID; generated lazily by get_uuid() when not given
+        :param version: Optional row version, incremented by every update (optimistic concurrency)
         """
         
-        self.uuid = tiny_id()
+        self.uuid = uuid
         self.title = title
         self.description = description
         self.status = status
@@ -49,7 +56,21 @@ class Task:
         self.project_id = project_id
         self.created_at = created_at
         self.updated_at = updated_at
+        self.version = version
+
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> List['Task']:
+        """
+        Build tasks in bulk from row tuples.
 
+        :param rows: Rows of (uuid, project_id, title, description, status, deadline, created_at, updated_at, version)
+        :return: The tasks, in row order
+        """
+        return [
+            cls(title, description or "", status, deadline, uuid, project_id, created_at, updated_at, str(uuid), version)
+            for uuid, project_id, title, description, status, deadline, created_at, updated_at, version in rows
+        ]
 
     def get_uuid(self) -> str:
         """
@@ -57,6 +78,8 @@ class Task:
 
         :return: The task UUID
         """
+        if self.uuid is None:
+            self.uuid = tiny_id()
         return self.uuid
 
     def get_title(self) -> str:
@@ -126,14 +149,19 @@ class Task:
 
 
 class Project:
+    """Represents a project with a unique name and a description."""
+
+    __slots__ = ('name', 'description', 'id', 'created_at', 'updated_at', 'version')
 
     def __init__(self, name: str, description: str = "", id: Optional[int] = None,
-                 created_at: Optional[datetime] = None, updated_at: Optional[datetime] = None):
+                 created_at: Optional[datetime] = None, updated_at: Optional[datetime] = None,
+                 version: Optional[int] = None):
         self.name = name
         self.description = description
         self.id = id
         self.created_at = created_at
         self.updated_at = updated_at
+        self.version = version
 
     def get_name(self) -> str:
         """
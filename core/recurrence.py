@@ -0,0 +1,180 @@
+"""
+Schedules of recurring tasks.
+
+A schedule is daily or weekly (every `interval` days or weeks, at the time of day of its start;
+weekly schedules may name several weekdays) or a cron expression with five fields:
+minute hour day-of-month month day-of-week. Every field is `*`, a number, a range `a-b`, a step
+`*/n` or `a-b/n`, or a comma-separated list of those. Day of week 0 and 7 are Sunday. As in cron,
+when both day fields are restricted a day matches when either of them matches.
+"""
+import hashlib
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+
+from core.exceptions import InvalidRecurrenceRuleError
+
+FREQUENCIES = ('daily', 'weekly', 'cron')
+WEEKDAY_NAMES = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+# (low, high) of the cron fields: minute, hour, day of month, month, day of week
+CRON_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+# A cron expression that never matches (e.g. February 30) stops the search after this many days
+CRON_MAX_SEARCH_DAYS = 366 * 5
+
+
+def _parse_cron_field(text: str, low: int, high: int) -> FrozenSet[int]:
+    values = set()
+    for part in text.split(','):
+        expression, _, step_text = part.partition('/')
+        step = int(step_text) if step_text.isdigit() else (1 if not step_text else 0)
+        if expression == '*':
+            start, end = low, high
+        elif '-' in expression:
+            start_text, _, end_text = expression.partition('-')
+            if not (start_text.isdigit() and end_text.isdigit()):
+                raise InvalidRecurrenceRuleError(f"Invalid cron field '{text}'.")
+            start, end = int(start_text), int(end_text)
+        elif expression.isdigit():
+            start = end = int(expression)
+            if step_text:
+                end = high
+        else:
+            raise InvalidRecurrenceRuleError(f"Invalid cron field '{text}'.")
+        if step < 1 or not (low <= start <= end <= high):
+            raise InvalidRecurrenceRuleError(f"Invalid cron field '{text}' (allowed range {low}-{high}).")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    """A parsed five-field cron expression."""
+
+    __slots__ = ('minutes', 'hours', 'days', 'months', 'weekdays', 'days_restricted', 'weekdays_restricted')
+
+    def __init__(self, expression: str):
+        """
+        :param expression: minute hour day-of-month month day-of-week
+        :raises InvalidRecurrenceRuleError: If the expression cannot be parsed
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise InvalidRecurrenceRuleError("A cron expression has five fields: minute hour day month weekday.")
+        minutes, hours, days, months, weekdays = (
+            _parse_cron_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELD_RANGES)
+        )
+        self.minutes: Tuple[int, ...] = tuple(sorted(minutes))
+        self.hours: Tuple[int, ...] = tuple(sorted(hours))
+        self.days = days
+        self.months = months
+        # Cron counts from Sunday (0 or 7), Python's weekday() from Monday (0)
+        self.weekdays = frozenset((weekday - 1) % 7 for weekday in weekdays)
+        self.days_restricted = fields[2] != '*'
+        self.weekdays_restricted = fields[4] != '*'
+
+    def matches_day(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        day_match = day.day in self.days
+        weekday_match = day.weekday() in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+
+class RecurrenceSchedule:
+    """When the occurrences of a recurrence rule fall."""
+
+    __slots__ = ('frequency', 'start_at', 'interval', 'weekdays', 'cron')
+
+    def __init__(self, frequency: str, start_at: datetime, interval: int = 1,
+                 weekdays: Optional[Sequence[str]] = None, cron: Optional[str] = None):
+        """
+        :param frequency: daily, weekly or cron
+        :param start_at: No occurrence is earlier; daily and weekly occurrences are at its time of day
+        :param interval: Every interval days or weeks (daily and weekly)
+        :param weekdays: Weekday names (mon..sun) of a weekly schedule; default: the weekday of start_at
+        :param cron: Cron expression of a cron schedule
+        :raises InvalidRecurrenceRuleError: If the combination of parameters is invalid
+        """
+        if frequency not in FREQUENCIES:
+            raise InvalidRecurrenceRuleError(f"Frequency must be one of: {', '.join(FREQUENCIES)}.")
+        if interval < 1:
+            raise InvalidRecurrenceRuleError("Interval must be at least 1.")
+        if (frequency == 'cron') != bool(cron):
+            raise InvalidRecurrenceRuleError("A cron expression is required for, and only allowed with, frequency cron.")
+        if weekdays and frequency != 'weekly':
+            raise InvalidRecurrenceRuleError("Weekdays are only allowed with frequency weekly.")
+        unknown = [name for name in weekdays or () if name not in WEEKDAY_NAMES]
+        if unknown:
+            raise InvalidRecurrenceRuleError(f"Weekdays must be among: {', '.join(WEEKDAY_NAMES)}.")
+        self.frequency = frequency
+        self.start_at = start_at.replace(second=0, microsecond=0)
+        self.interval = interval
+        self.weekdays = (tuple(sorted(WEEKDAY_NAMES.index(name) for name in set(weekdays)))
+                         if weekdays else (start_at.weekday(),))
+        self.cron = CronExpression(cron) if cron else None
+
+    def occurrences(self, after: datetime, until: datetime, limit: int) -> List[datetime]:
+        """
+        List the occurrences in (after, until], earliest first.
+
+        :param after: Exclusive lower bound
+        :param until: Inclusive upper bound
+        :param limit: Maximum number of occurrences
+        """
+        after = max(after, self.start_at - timedelta(microseconds=1))
+        if self.frequency == 'daily':
+            candidates = self._daily(after)
+        elif self.frequency == 'weekly':
+            candidates = self._weekly(after)
+        else:
+            candidates = self._cron(after, until)
+        result = []
+        for occurrence in candidates:
+            if occurrence > until or len(result) >= limit:
+                break
+            if occurrence > after:
+                result.append(occurrence)
+        return result
+
+    def _daily(self, after: datetime):
+        step = timedelta(days=self.interval)
+        index = max(0, (after - self.start_at) // step)
+        while True:
+            yield self.start_at + index * step
+            index += 1
+
+    def _weekly(self, after: datetime):
+        # Weeks are counted from the Monday of the start week; every interval-th week is active
+        first_monday = datetime.combine(self.start_at.date() - timedelta(days=self.start_at.weekday()),
+                                        self.start_at.time())
+        week = max(0, (after - first_monday).days // 7)
+        week -= week % self.interval
+        while True:
+            monday = first_monday + timedelta(weeks=week)
+            for weekday in self.weekdays:
+                occurrence = monday + timedelta(days=weekday)
+                if occurrence >= self.start_at:
+                    yield occurrence
+            week += self.interval
+
+    def _cron(self, after: datetime, until: datetime):
+        day = after.date()
+        last_day = min(until.date(), day + timedelta(days=CRON_MAX_SEARCH_DAYS))
+        while day <= last_day:
+            if self.cron.matches_day(day):
+                for hour in self.cron.hours:
+                    for minute in self.cron.minutes:
+                        yield datetime.combine(day, time(hour, minute))
+            day += timedelta(days=1)
+
+
+def occurrence_uuid(rule_id: int, occurrence: datetime) -> uuid.UUID:
+    """
+    Deterministic UUID of an occurrence of a rule.
+
+    A virtual occurrence keeps this UUID when it is materialized into a task.
+    """
+    digest = hashlib.md5(f"{rule_id}:{occurrence.isoformat()}".encode()).digest()
+    return uuid.UUID(bytes=digest, version=4)
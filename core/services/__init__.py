@@ -1,2 +1,8 @@
 from .project_services import *
-from .task_services import *
\ No newline at end of file
+from .task_services import *
+from .job_services import *
+from .analytics_services import *
+from .recurrence_services import *
+from .reminder_services import *
+from .queue_services import *
+from .shard_services import *
\ No newline at end of file
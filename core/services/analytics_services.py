@@ -0,0 +1,230 @@
+"""
+Task throughput, lead-time and overdue analytics.
+
+The columns (project_id, status, deadline, created_at, updated_at) of active and archived tasks are
+streamed into NumPy arrays and reduced with vectorized operations. Everything that does not depend
+on the current time (completion days, lead times, sorted open deadlines) is kept per project in an
+LRU cache keyed by the project version, so only projects that were written to are read again.
+
+Tasks have no completion timestamp: a done task counts as completed at its last update, and its
+lead time is updated_at - created_at.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.exceptions import ProjectNotFoundError
+from core.models import Status
+from core.services.shard_services import run_on_shards
+from data.database import shard_map
+from data.env_loader import ANALYTICS_CACHE_PROJECTS, ANALYTICS_FETCH_SIZE
+from data.repositories.project_repository import ProjectRepository
+from data.repositories.task_repository import TaskRepository
+
+LEAD_TIME_PERCENTILES = (50, 75, 90, 95, 99)
+# Projects per query, which keeps the IN lists below the bind parameter limits
+PROJECT_CHUNK_SIZE = 1000
+# Integer representation of NaT in a datetime64 array
+NAT = np.iinfo(np.int64).min
+
+
+class ProjectTaskStats(NamedTuple):
+    """Time-independent task statistics of one project."""
+    version: int
+    total: int
+    done_days: np.ndarray       # datetime64[D], completion day of every done task
+    lead_hours: np.ndarray      # float64, created -> done hours, aligned with done_days
+    open_count: int
+    open_deadlines: np.ndarray  # datetime64[s], sorted deadlines of the open tasks that have one
+
+
+# Keyed by (shard, project id): project ids are only unique per shard
+_stats_cache: "OrderedDict[Tuple[Optional[str], int], ProjectTaskStats]" = OrderedDict()
+
+
+def _empty_stats(version: int) -> ProjectTaskStats:
+    return ProjectTaskStats(version, 0, np.empty(0, 'datetime64[D]'), np.empty(0, np.float64), 0,
+                            np.empty(0, 'datetime64[s]'))
+
+
+def _partition_arrays(rows: Sequence) -> tuple:
+    """Convert one partition of rows into (project_ids, done, deadlines, created, updated) arrays."""
+    count = len(rows)
+
+    def seconds(index: int) -> np.ndarray:
+        values = (NAT if row[index] is None else row[index] for row in rows)
+        return np.fromiter(values, np.int64, count).view('datetime64[s]')
+
+    return (
+        np.fromiter((row[0] for row in rows), np.int64, count),
+        np.fromiter((row[1] == Status.DONE for row in rows), np.bool_, count),
+        seconds(2),
+        seconds(3),
+        seconds(4),
+    )
+
+
+async def _read_stats(repo: TaskRepository, versions: Dict[int, int]) -> Dict[int, ProjectTaskStats]:
+    """Stream the task columns of some projects and build their statistics."""
+    partitions = []
+    async for rows in repo.stream_analytics_columns(list(versions), ANALYTICS_FETCH_SIZE):
+        partitions.append(_partition_arrays(rows))
+    stats = {project_id: _empty_stats(version) for project_id, version in versions.items()}
+    if not partitions:
+        return stats
+    task_project_ids, done, deadlines, created, updated = (np.concatenate(column) for column in zip(*partitions))
+
+    # Group the rows by project without a Python loop over tasks
+    order = np.argsort(task_project_ids, kind='stable')
+    unique_ids, starts = np.unique(task_project_ids[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+    for project_id, start, end in zip(unique_ids.tolist(), starts, ends):
+        rows = order[start:end]
+        is_done = done[rows]
+        done_updated = updated[rows][is_done]
+        open_deadlines = deadlines[rows][~is_done]
+        stats[project_id] = ProjectTaskStats(
+            version=versions[project_id],
+            total=len(rows),
+            done_days=done_updated.astype('datetime64[D]'),
+            lead_hours=(done_updated - created[rows][is_done]) / np.timedelta64(1, 'h'),
+            open_count=len(open_deadlines),
+            open_deadlines=np.sort(open_deadlines[~np.isnat(open_deadlines)]),
+        )
+    return stats
+
+
+async def _get_project_stats(db: AsyncSession, versions: Dict[int, int],
+                             shard: Optional[str] = None) -> Dict[int, ProjectTaskStats]:
+    """
+    Get the statistics of the projects, reading only those whose version changed.
+
+    :param versions: Project versions by project id, read before any task column, so that a concurrent
+        write can only make a cached entry look stale, never the other way around
+    :param shard: Shard the session is on (None without sharding)
+    """
+    repo = TaskRepository(db)
+    stats = {}
+    stale = {}
+    for project_id, version in versions.items():
+        cached = _stats_cache.get((shard, project_id))
+        if cached is not None and cached.version == version:
+            _stats_cache.move_to_end((shard, project_id))
+            stats[project_id] = cached
+        else:
+            stale[project_id] = version
+    stale_ids = list(stale)
+    for i in range(0, len(stale_ids), PROJECT_CHUNK_SIZE):
+        chunk = {project_id: stale[project_id] for project_id in stale_ids[i:i + PROJECT_CHUNK_SIZE]}
+        for project_id, project_stats in (await _read_stats(repo, chunk)).items():
+            stats[project_id] = project_stats
+            _stats_cache[(shard, project_id)] = project_stats
+            _stats_cache.move_to_end((shard, project_id))
+    while len(_stats_cache) > ANALYTICS_CACHE_PROJECTS:
+        _stats_cache.popitem(last=False)
+    return stats
+
+
+async def _get_stats_by_name(db: AsyncSession, project_names: Optional[Sequence[str]],
+                             shard: Optional[str] = None) -> Dict[str, ProjectTaskStats]:
+    """Get the statistics of the named projects that exist (all projects for None) by project name."""
+    versions_by_name = await ProjectRepository(db).get_versions_by_names(project_names)
+    stats = await _get_project_stats(db, dict(versions_by_name.values()), shard)
+    return {name: stats[project_id] for name, (project_id, _) in versions_by_name.items()}
+
+
+def _check_found(project_names: Optional[Sequence[str]], stats_by_name: Dict[str, ProjectTaskStats]) -> None:
+    if project_names is not None:
+        missing = sorted(set(project_names) - stats_by_name.keys())
+        if missing:
+            raise ProjectNotFoundError(f"Project with name '{missing[0]}' not found.")
+
+
+async def get_task_analytics(db: AsyncSession, project_names: Optional[Sequence[str]], days: int) -> dict:
+    """
+    Compute completions per day, lead-time percentiles and overdue ratios.
+
+    :param db: Async database session
+    :param project_names: Projects to include; None for all projects
+    :param days: Number of days, ending today, of the completion and lead-time window
+    :return: Dictionary in the shape of TaskAnalyticsResponse
+    :raises ProjectNotFoundError: If one of the named projects does not exist
+    """
+    stats_by_name = await _get_stats_by_name(db, project_names)
+    _check_found(project_names, stats_by_name)
+    return _summarize(stats_by_name, days)
+
+
+async def get_task_analytics_across_shards(session_factories: Dict[str, Callable[[], AsyncSession]],
+                                           project_names: Optional[Sequence[str]], days: int) -> dict:
+    """
+    Compute the analytics of get_task_analytics over the projects of all shards.
+
+    Named projects are only read from their shard; the statistics of every shard are read in
+    parallel and reduced together.
+
+    :param session_factories: Session factory by shard name
+    :raises ProjectNotFoundError: If one of the named projects does not exist
+    """
+    names_by_shard: Dict[str, Optional[list]] = {shard: None for shard in session_factories}
+    if project_names is not None:
+        names_by_shard = {}
+        for name in project_names:
+            names_by_shard.setdefault(shard_map.shard_for(name), []).append(name)
+    per_shard = await run_on_shards(
+        {shard: session_factories[shard] for shard in names_by_shard},
+        lambda shard, db: _get_stats_by_name(db, names_by_shard[shard], shard)
+    )
+    # A project being moved exists on two shards; only its placement counts
+    stats_by_name = {name: stats for shard, shard_stats in per_shard.items() for name, stats in shard_stats.items()
+                     if shard_map.placement(name) == shard}
+    _check_found(project_names, stats_by_name)
+    return _summarize(stats_by_name, days)
+
+
+def _summarize(stats_by_name: Dict[str, ProjectTaskStats], days: int) -> dict:
+    """Reduce the statistics of the projects into the shape of TaskAnalyticsResponse."""
+    now = datetime.now()
+    today = np.datetime64(now.date(), 'D')
+    first_day = today - (days - 1)
+    done_days = np.concatenate([s.done_days for s in stats_by_name.values()] or [np.empty(0, 'datetime64[D]')])
+    lead_hours = np.concatenate([s.lead_hours for s in stats_by_name.values()] or [np.empty(0, np.float64)])
+    in_window = (done_days >= first_day) & (done_days <= today)
+    completed = np.bincount((done_days[in_window] - first_day).astype(np.int64), minlength=days)
+    window_lead_hours = lead_hours[in_window]
+
+    lead_time = {"count": int(window_lead_hours.size), "mean": None, "percentiles": {}}
+    if window_lead_hours.size:
+        lead_time["mean"] = float(window_lead_hours.mean())
+        lead_time["percentiles"] = {
+            f"p{p}": float(value)
+            for p, value in zip(LEAD_TIME_PERCENTILES, np.percentile(window_lead_hours, LEAD_TIME_PERCENTILES))
+        }
+
+    now_seconds = np.datetime64(now, 's')
+    projects = []
+    for name in sorted(stats_by_name):
+        project_stats = stats_by_name[name]
+        overdue = int(np.searchsorted(project_stats.open_deadlines, now_seconds))
+        projects.append({
+            "project_name": name,
+            "total_tasks": project_stats.total,
+            "open_tasks": project_stats.open_count,
+            "overdue_tasks": overdue,
+            "overdue_ratio": overdue / project_stats.open_count if project_stats.open_count else 0.0,
+        })
+
+    return {
+        "generated_at": now,
+        "days": days,
+        "completed_total": int(completed.sum()),
+        "completed_per_day": [
+            {"date": day, "completed": count}
+            for day, count in zip((first_day + np.arange(days)).tolist(), completed.tolist())
+        ],
+        "lead_time_hours": lead_time,
+        "projects": projects,
+    }
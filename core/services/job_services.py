@@ -0,0 +1,11 @@
+# Background job related service functions
+
+from typing import Optional, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from data.models import JobRunModel
+from data.repositories.job_run_repository import JobRunRepository
+
+
+async def get_recent_job_runs(db: AsyncSession, limit: int, job_name: Optional[str] = None) -> List[JobRunModel]:
+    repo = JobRunRepository(db)
+    return await repo.get_recent_runs(limit, job_name)
@@ -1,12 +1,45 @@
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple, Sequence, Dict
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from core.models import Project
+from core.models import Project, Task
 from data.repositories.project_repository import ProjectRepository
+from data.repositories.task_repository import TaskRepository
 from core.validators.project_validators import (
     validate_project_name,
     validate_project_description
 )
-from core.exceptions import ProjectNotFoundError
+from core.validators.task_validators import validate_task_status, to_utc_naive, TASK_FIELDS
+from core.exceptions import ProjectNotFoundError, InvalidCursorError
+from utils.cursor import encode_cursor, decode_cursor
+
+PROJECT_SORT_FIELDS = ('name', 'created_at', 'updated_at')
+
+
+def encode_project_cursor(sort: str, descending: bool, *position: Any) -> str:
+    """Encode the position of a project page, with the sort field and order it is valid for."""
+    return encode_cursor(sort, 'desc' if descending else 'asc', *position)
+
+
+def decode_project_cursor(cursor: str, sort: str, descending: bool, size: int) -> Tuple:
+    """
+    Decode a cursor made by encode_project_cursor and check it against the requested sort.
+
+    :param size: Number of position values: the sort value first and the project id last
+    :return: The position values, the sort value typed for its column
+    :raises InvalidCursorError: If the cursor is malformed or was issued for another sort field or order
+    """
+    try:
+        cursor_sort, cursor_order, *position = decode_cursor(cursor, size + 2)
+    except ValueError:
+        raise InvalidCursorError("Invalid pagination cursor.")
+    if (cursor_sort, cursor_order) != (sort, 'desc' if descending else 'asc'):
+        raise InvalidCursorError("The pagination cursor belongs to another sort field or order.")
+    value, project_id = position[0], position[-1]
+    if not isinstance(value, str if sort == 'name' else datetime) or type(project_id) is not int:
+        raise InvalidCursorError("Invalid pagination cursor.")
+    if isinstance(value, datetime):
+        position[0] = to_utc_naive(value)
+    return tuple(position)
 
 
 async def get_project_from_name(db: AsyncSession, name: str) -> Optional[Project]:
@@ -20,7 +53,8 @@ async def get_project_from_name(db: AsyncSession, name: str) -> Optional[Project
         description=project_model.description or "",
         id=project_model.id,
         created_at=project_model.created_at,
-        updated_at=project_model.updated_at
+        updated_at=project_model.updated_at,
+        version=project_model.version
     )
     return project
 
@@ -37,7 +71,8 @@ async def create_project(db: AsyncSession, name: str, desc: str) -> Project:
         description=project_model.description or "",
         id=project_model.id,
         created_at=project_model.created_at,
-        updated_at=project_model.updated_at
+        updated_at=project_model.updated_at,
+        version=project_model.version
     )
 
 
@@ -54,7 +89,8 @@ async def update_project(db: AsyncSession, old_name: str, updated_project: Proje
         description=project_model.description or "",
         id=project_model.id,
         created_at=project_model.created_at,
-        updated_at=project_model.updated_at
+        updated_at=project_model.updated_at,
+        version=project_model.version
     )
 
 
@@ -76,7 +112,88 @@ async def get_project_list(db: AsyncSession) -> List[Project]:
             description=pm.description or "",
             id=pm.id,
             created_at=pm.created_at,
-            updated_at=pm.updated_at
+            updated_at=pm.updated_at,
+            version=pm.version
         )
         projects.append(project)
     return projects
+
+
+async def get_project_version(db: AsyncSession, name: str) -> Tuple[int, int]:
+    """
+    Get the id and version of a project; the version changes with every write to the project or its tasks.
+
+    :raises ProjectNotFoundError: If the project does not exist
+    """
+    version = await ProjectRepository(db).get_version(name)
+    if version is None:
+        raise ProjectNotFoundError(f"Project with name '{name}' not found.")
+    return version
+
+
+async def get_project_list_version(db: AsyncSession) -> int:
+    """Get the list version, which increases whenever a project or task is written, created or deleted."""
+    return await ProjectRepository(db).get_list_version()
+
+
+async def get_project_page(db: AsyncSession, limit: Optional[int], sort: str = 'name', descending: bool = False,
+                           cursor: Optional[str] = None,
+                           name_prefix: Optional[str] = None) -> Tuple[List[Project], Optional[str]]:
+    """
+    Get one keyset-paginated page of projects.
+
+    :param limit: Maximum number of projects in the page; None for all projects (one page)
+    :param sort: Sort field (name, created_at or updated_at)
+    :param descending: Sort in descending order
+    :param cursor: Cursor returned with the previous page
+    :param name_prefix: Only include projects whose name starts with this prefix
+    :return: The projects of the page and the cursor of the next page (None on the last page)
+    :raises InvalidCursorError: If the cursor is malformed or was issued for another sort
+    """
+    if sort not in PROJECT_SORT_FIELDS:
+        raise ValueError(f"Sort field must be one of: {', '.join(PROJECT_SORT_FIELDS)}.")
+    after = decode_project_cursor(cursor, sort, descending, 2) if cursor else None
+    repo = ProjectRepository(db)
+    # Fetch one extra row to know whether another page follows
+    project_models = await repo.get_projects_page(None if limit is None else limit + 1, sort, descending, after,
+                                                  name_prefix)
+    next_cursor = None
+    if limit is not None and len(project_models) > limit:
+        project_models = project_models[:limit]
+        last = project_models[-1]
+        next_cursor = encode_project_cursor(sort, descending, getattr(last, sort), last.id)
+    projects = [
+        Project(
+            name=pm.name,
+            description=pm.description or "",
+            id=pm.id,
+            created_at=pm.created_at,
+            updated_at=pm.updated_at,
+            version=pm.version
+        )
+        for pm in project_models
+    ]
+    return projects, next_cursor
+
+
+async def get_tasks_for_projects(db: AsyncSession, projects: List[Project], per_project_limit: Optional[int] = None,
+                                 statuses: Optional[Sequence[str]] = None) -> Dict[int, List[Task]]:
+    """
+    Load the tasks of several projects with a single query (instead of one query per project).
+
+    :param projects: Projects whose tasks are loaded
+    :param per_project_limit: Maximum number of tasks per project, oldest first (None for all)
+    :param statuses: Only include tasks with these statuses (None for all)
+    :return: Tasks by project id; every project has an entry
+    """
+    if statuses:
+        for task_status in statuses:
+            validate_task_status(task_status)
+    task_repo = TaskRepository(db)
+    rows = await task_repo.get_task_rows_for_projects(
+        [p.id for p in projects], TASK_FIELDS, per_project_limit, statuses
+    )
+    tasks_by_project: Dict[int, List[Task]] = {p.id: [] for p in projects}
+    for task in Task.from_rows(rows):
+        tasks_by_project[task.project_id].append(task)
+    return tasks_by_project
@@ -0,0 +1,117 @@
+# Persistent job queue service functions
+
+import json
+from typing import Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from data.env_loader import JOB_QUEUE_MAX_ATTEMPTS
+from data.models import QueuedJobModel
+from data.repositories.project_repository import ProjectRepository
+from data.repositories.queued_job_repository import QueuedJobRepository
+from core.validators.task_validators import (validate_task_title, validate_task_description, validate_task_status,
+                                             validate_task_deadline)
+from core.exceptions import ProjectNotFoundError, QueuedJobNotFoundError, QueuedJobOutputNotReadyError
+
+
+async def _enqueue(db: AsyncSession, kind: str, project_name: str, payload: dict) -> QueuedJobModel:
+    version = await ProjectRepository(db).get_version(project_name)
+    if version is None:
+        raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
+    job = await QueuedJobRepository(db).enqueue(kind, version[0], project_name, json.dumps(payload),
+                                                JOB_QUEUE_MAX_ATTEMPTS)
+    await db.commit()
+    return job
+
+
+async def enqueue_project_deletion(db: AsyncSession, project_name: str) -> QueuedJobModel:
+    """
+    Queue the deletion of a project with all its tasks, chunk by chunk.
+
+    :raises ProjectNotFoundError: If the project does not exist
+    """
+    return await _enqueue(db, 'delete_project', project_name, {})
+
+
+async def enqueue_project_export(db: AsyncSession, project_name: str) -> QueuedJobModel:
+    """
+    Queue the export of a project with its active and archived tasks as a JSON document.
+
+    :raises ProjectNotFoundError: If the project does not exist
+    """
+    return await _enqueue(db, 'export_project', project_name, {})
+
+
+async def enqueue_task_import(db: AsyncSession, project_name: str, tasks: Sequence[dict]) -> QueuedJobModel:
+    """
+    Queue the creation of many tasks in a project.
+
+    Every task is validated now, so the job itself cannot fail on its input.
+
+    :param tasks: Tasks with title, description, status and deadline
+    :raises ProjectNotFoundError: If the project does not exist
+    """
+    items = []
+    for task in tasks:
+        validate_task_title(task['title'])
+        validate_task_description(task.get('description') or "")
+        validate_task_status(task.get('status') or 'todo')
+        deadline = validate_task_deadline(task.get('deadline'))
+        items.append({'title': task['title'], 'description': task.get('description') or "",
+                      'status': task.get('status') or 'todo',
+                      'deadline': deadline.isoformat() if deadline is not None else None})
+    return await _enqueue(db, 'import_tasks', project_name, {'tasks': items})
+
+
+async def enqueue_task_bulk_update(db: AsyncSession, project_name: str, statuses: Optional[Sequence[str]],
+                                   changes: dict) -> QueuedJobModel:
+    """
+    Queue the same status and/or deadline change for every task of a project with one of the statuses.
+
+    :param statuses: Only change tasks with these statuses (None for all active tasks)
+    :param changes: New status and/or deadline (a None deadline removes it)
+    :raises ProjectNotFoundError: If the project does not exist
+    """
+    unknown = set(changes) - {'status', 'deadline'}
+    if unknown or not changes:
+        raise ValueError("A bulk update changes the status and/or the deadline of tasks.")
+    for status in statuses or ():
+        validate_task_status(status)
+    normalized = {}
+    if 'status' in changes:
+        validate_task_status(changes['status'])
+        normalized['status'] = changes['status']
+    if 'deadline' in changes:
+        deadline = validate_task_deadline(changes['deadline'])
+        normalized['deadline'] = deadline.isoformat() if deadline is not None else None
+    return await _enqueue(db, 'bulk_update_tasks', project_name,
+                          {'statuses': list(statuses) if statuses else None, 'changes': normalized})
+
+
+async def _get_project_job(db: AsyncSession, project_name: str, job_id: int,
+                           with_output: bool = False) -> QueuedJobModel:
+    job = await QueuedJobRepository(db).get_job(job_id, with_output)
+    # Jobs are looked up through the project they were queued for, which also finds the shard they live on
+    if job is None or job.project_name != project_name:
+        raise QueuedJobNotFoundError(f"Job {job_id} of project '{project_name}' not found.")
+    return job
+
+
+async def get_queued_job(db: AsyncSession, project_name: str, job_id: int) -> QueuedJobModel:
+    """
+    Get the status, progress and result of a queued job (without its output document).
+
+    :raises QueuedJobNotFoundError: If the project has no such job (or it was purged)
+    """
+    return await _get_project_job(db, project_name, job_id)
+
+
+async def get_queued_job_output(db: AsyncSession, project_name: str, job_id: int) -> str:
+    """
+    Get the JSON document produced by a succeeded job, such as a project export.
+
+    :raises QueuedJobNotFoundError: If the project has no such job (or it was purged)
+    :raises QueuedJobOutputNotReadyError: If the job has not succeeded or produces no document
+    """
+    job = await _get_project_job(db, project_name, job_id, with_output=True)
+    if job.status != 'succeeded' or job.output is None:
+        raise QueuedJobOutputNotReadyError(f"Job {job_id} is {job.status} and has no output.")
+    return job.output
@@ -0,0 +1,176 @@
+"""
+Recurrence rules create tasks lazily: only the occurrences inside a rolling window of
+RECURRENCE_WINDOW_DAYS are inserted into tasks (when the rule is created, then by the
+materialize_recurring_tasks job), and materialized_until records how far a rule got, so no
+occurrence is inserted twice. Later occurrences can be listed as virtual tasks that are never stored;
+they have version 0 and the UUID the task will get when it is materialized.
+"""
+import datetime as dt_module
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.exceptions import InvalidRecurrenceRuleError, ProjectNotFoundError, RecurrenceRuleNotFoundError
+from core.models import Status, Task
+from core.recurrence import RecurrenceSchedule, occurrence_uuid
+from core.validators.task_validators import validate_task_title, validate_task_description
+from data.env_loader import RECURRENCE_WINDOW_DAYS, RECURRENCE_MAX_OCCURRENCES
+from data.models import RecurrenceRuleModel
+from data.repositories.project_repository import ProjectRepository
+from data.repositories.recurrence_repository import RecurrenceRuleRepository
+from data.repositories.task_repository import TaskRepository
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Store offset-aware times as naive UTC, like task deadlines."""
+    if value is not None and value.tzinfo is not None and value.tzinfo.utcoffset(value) is not None:
+        return value.astimezone(dt_module.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _schedule(rule: RecurrenceRuleModel) -> RecurrenceSchedule:
+    weekdays = rule.weekdays.split(',') if rule.weekdays else None
+    return RecurrenceSchedule(rule.frequency, rule.start_at, rule.interval, weekdays, rule.cron)
+
+
+def _pending_after(rule: RecurrenceRuleModel, now: datetime) -> datetime:
+    """Occurrences after this time are neither materialized nor in the past."""
+    return max(rule.materialized_until or now, now)
+
+
+async def _get_project_id(db: AsyncSession, project_name: str) -> int:
+    version = await ProjectRepository(db).get_version(project_name)
+    if version is None:
+        raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
+    return version[0]
+
+
+async def materialize_rules(db: AsyncSession, rules: Sequence[RecurrenceRuleModel], now: datetime) -> int:
+    """
+    Insert the occurrences of the rules up to now + RECURRENCE_WINDOW_DAYS as tasks (the caller commits).
+
+    All tasks are inserted with one executemany INSERT, and the version of every project that got
+    tasks is incremented. A rule contributes at most RECURRENCE_MAX_OCCURRENCES tasks per call; the
+    rest follows with the next call.
+
+    :param rules: Rules loaded in this session (locked, or created in this transaction)
+    :param now: Current time; occurrences before it are never materialized
+    :return: Number of inserted tasks
+    """
+    horizon = now + timedelta(days=RECURRENCE_WINDOW_DAYS)
+    rows = []
+    project_ids = set()
+    for rule in rules:
+        end = min(horizon, rule.until) if rule.until is not None else horizon
+        occurrences = _schedule(rule).occurrences(_pending_after(rule, now), end, RECURRENCE_MAX_OCCURRENCES)
+        for occurrence in occurrences:
+            rows.append({
+                'uuid': occurrence_uuid(rule.id, occurrence),
+                'project_id': rule.project_id,
+                'title': rule.title,
+                'description': rule.description,
+                'status': Status.TODO,
+                'deadline': occurrence,
+            })
+        if occurrences:
+            project_ids.add(rule.project_id)
+        # A rule that hit the limit continues after its last occurrence; otherwise the window is complete
+        # (a rule that ends before the horizon has no occurrences left there either)
+        rule.materialized_until = occurrences[-1] if len(occurrences) >= RECURRENCE_MAX_OCCURRENCES else horizon
+    await TaskRepository(db).create_tasks_bulk(rows)
+    if project_ids:
+        await ProjectRepository(db).bump_versions(sorted(project_ids))
+    await db.flush()
+    return len(rows)
+
+
+async def create_recurrence_rule(db: AsyncSession, project_name: str, title: str, description: str,
+                                 frequency: str, interval: int = 1, weekdays: Optional[Sequence[str]] = None,
+                                 cron: Optional[str] = None, start_at: Optional[datetime] = None,
+                                 until: Optional[datetime] = None) -> RecurrenceRuleModel:
+    """
+    Create a recurrence rule and materialize its occurrences in the rolling window.
+
+    :param start_at: No occurrence is earlier (default: now); daily and weekly occurrences are at its time of day
+    :param until: No occurrence is later (default: no end)
+    :return: The created rule
+    :raises InvalidRecurrenceRuleError: If the schedule is invalid
+    :raises ProjectNotFoundError: If the project does not exist
+    """
+    validate_task_title(title)
+    validate_task_description(description)
+    now = datetime.now()
+    # Occurrences fall on whole minutes
+    start_at = (_naive_utc(start_at) or now).replace(second=0, microsecond=0)
+    until = _naive_utc(until)
+    if until is not None and until <= start_at:
+        raise InvalidRecurrenceRuleError("Until must be later than start_at.")
+    # Validates frequency, interval, weekdays and the cron expression
+    RecurrenceSchedule(frequency, start_at, interval, weekdays, cron)
+    project_id = await _get_project_id(db, project_name)
+    repo = RecurrenceRuleRepository(db)
+    rule = await repo.create_rule(project_id, title, description, frequency, interval,
+                                  ','.join(dict.fromkeys(weekdays)) if weekdays else None,
+                                  cron, start_at, until)
+    if not await materialize_rules(db, [rule], now):
+        # The project version is part of the task list cache key, which also covers virtual occurrences
+        await ProjectRepository(db).bump_versions([project_id])
+    await db.commit()
+    return rule
+
+
+async def get_recurrence_rules(db: AsyncSession, project_name: str) -> List[RecurrenceRuleModel]:
+    """
+    Get the recurrence rules of a project.
+
+    :raises ProjectNotFoundError: If the project does not exist
+    """
+    project_id = await _get_project_id(db, project_name)
+    return await RecurrenceRuleRepository(db).get_rules_by_project(project_id)
+
+
+async def delete_recurrence_rule(db: AsyncSession, project_name: str, rule_id: int) -> None:
+    """
+    Delete a recurrence rule; tasks it already materialized are kept.
+
+    :raises ProjectNotFoundError: If the project does not exist
+    :raises RecurrenceRuleNotFoundError: If the project has no such rule
+    """
+    project_id = await _get_project_id(db, project_name)
+    if not await RecurrenceRuleRepository(db).delete_rule(project_id, rule_id):
+        raise RecurrenceRuleNotFoundError(f"Recurrence rule {rule_id} not found in project '{project_name}'.")
+    await ProjectRepository(db).bump_versions([project_id])
+    await db.commit()
+
+
+def get_virtual_occurrences(rules: Sequence[RecurrenceRuleModel], now: datetime, days: int) -> List[Task]:
+    """
+    Build the not yet materialized occurrences of rules up to now + days as tasks, by deadline.
+
+    Virtual tasks have version 0 and are never stored; a virtual task keeps its UUID when it is materialized.
+
+    :param rules: Recurrence rules of one project
+    :param now: Current time; earlier occurrences are not listed
+    :param days: Number of days ahead to list
+    """
+    horizon = now + timedelta(days=days)
+    tasks = []
+    for rule in rules:
+        end = min(horizon, rule.until) if rule.until is not None else horizon
+        for occurrence in _schedule(rule).occurrences(_pending_after(rule, now), end, RECURRENCE_MAX_OCCURRENCES):
+            task_uuid = occurrence_uuid(rule.id, occurrence)
+            tasks.append(Task(rule.title, rule.description or "", Status.TODO, occurrence, task_uuid, rule.project_id,
+                              rule.created_at, rule.updated_at, str(task_uuid), 0))
+    tasks.sort(key=lambda task: task.deadline)
+    return tasks
+
+
+async def get_upcoming_occurrences(db: AsyncSession, project_name: str, days: int) -> List[Task]:
+    """
+    Get the virtual occurrences of the recurrence rules of a project up to days ahead.
+
+    :raises ProjectNotFoundError: If the project does not exist
+    """
+    rules = await get_recurrence_rules(db, project_name)
+    return get_virtual_occurrences(rules, datetime.now(), days)
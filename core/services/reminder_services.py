@@ -0,0 +1,57 @@
+# Deadline reminder webhook service functions
+
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from data.models import ReminderWebhookModel
+from data.repositories.project_repository import ProjectRepository
+from data.repositories.reminder_webhook_repository import ReminderWebhookRepository
+from core.exceptions import ProjectNotFoundError, ReminderWebhookNotFoundError
+
+
+async def _get_project_id(db: AsyncSession, project_name: str) -> int:
+    version = await ProjectRepository(db).get_version(project_name)
+    if version is None:
+        raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
+    return version[0]
+
+
+async def set_reminder_webhook(db: AsyncSession, project_name: str, url: str,
+                               minutes_before: int) -> ReminderWebhookModel:
+    """
+    Create or replace the webhook that receives the deadline reminders of a project's open tasks.
+
+    :param url: http(s) URL the reminders are POSTed to, in batches
+    :param minutes_before: Lead time of the reminders
+    :raises ProjectNotFoundError: If the project does not exist
+    """
+    project_id = await _get_project_id(db, project_name)
+    webhook = await ReminderWebhookRepository(db).set_webhook(project_id, url, minutes_before)
+    await db.commit()
+    return webhook
+
+
+async def get_reminder_webhook(db: AsyncSession, project_name: str) -> ReminderWebhookModel:
+    """
+    Get the reminder webhook of a project.
+
+    :raises ProjectNotFoundError: If the project does not exist
+    :raises ReminderWebhookNotFoundError: If the project has no webhook
+    """
+    project_id = await _get_project_id(db, project_name)
+    webhook: Optional[ReminderWebhookModel] = await ReminderWebhookRepository(db).get_by_project(project_id)
+    if webhook is None:
+        raise ReminderWebhookNotFoundError(f"Project '{project_name}' has no reminder webhook.")
+    return webhook
+
+
+async def delete_reminder_webhook(db: AsyncSession, project_name: str) -> None:
+    """
+    Delete the reminder webhook of a project; reminders already claimed are still delivered.
+
+    :raises ProjectNotFoundError: If the project does not exist
+    :raises ReminderWebhookNotFoundError: If the project has no webhook
+    """
+    project_id = await _get_project_id(db, project_name)
+    if not await ReminderWebhookRepository(db).delete_webhook(project_id):
+        raise ReminderWebhookNotFoundError(f"Project '{project_name}' has no reminder webhook.")
+    await db.commit()
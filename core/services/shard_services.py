@@ -0,0 +1,171 @@
+# Service functions that fan out over the shards of the shard map (see data/sharding.py)
+
+import asyncio
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.exceptions import InvalidCursorError
+from core.models import Project, Task
+from core.services.project_services import (PROJECT_SORT_FIELDS, get_tasks_for_projects, encode_project_cursor,
+                                            decode_project_cursor)
+from core.services.task_services import get_tasks_due
+from data.database import shard_map
+from data.models import JobRunModel, ProjectModel
+from data.repositories.project_repository import ProjectRepository
+from data.repositories.job_run_repository import JobRunRepository
+from utils.cursor import encode_cursor
+
+T = TypeVar('T')
+SessionFactory = Callable[[], AsyncSession]
+
+# Larger than any project id: (value, _MAX_ID) sorts after every row with that value
+_MAX_ID = 2 ** 62
+
+
+async def run_on_shards(session_factories: Dict[str, SessionFactory],
+                        fn: Callable[[str, AsyncSession], Awaitable[T]]) -> Dict[str, T]:
+    """
+    Run a query function on every shard in parallel, each with its own session.
+
+    :param session_factories: Session factory by shard name
+    :param fn: Coroutine function called with the shard name and a session
+    :return: The results by shard name
+    """
+    async def run(shard: str, factory: SessionFactory) -> T:
+        async with factory() as db:
+            return await fn(shard, db)
+
+    results = await asyncio.gather(*(run(shard, factory) for shard, factory in session_factories.items()))
+    return dict(zip(session_factories, results))
+
+
+def _owned(shard: str, project_name: str) -> bool:
+    """Whether a shard holds the live copy of a project (a project being moved exists on two shards)."""
+    return shard_map.placement(project_name) == shard
+
+
+async def get_project_list_version_across_shards(session_factories: Dict[str, SessionFactory]) -> Tuple:
+    """Get the list versions of all shards; they change whenever a project or task is written, created or deleted."""
+    versions = await run_on_shards(session_factories, lambda shard, db: ProjectRepository(db).get_list_version())
+    return tuple(sorted(versions.items()))
+
+
+def _to_project(pm: ProjectModel) -> Project:
+    return Project(
+        name=pm.name,
+        description=pm.description or "",
+        id=pm.id,
+        created_at=pm.created_at,
+        updated_at=pm.updated_at,
+        version=pm.version
+    )
+
+
+async def get_project_page_across_shards(session_factories: Dict[str, SessionFactory], limit: Optional[int],
+                                         sort: str = 'name', descending: bool = False,
+                                         cursor: Optional[str] = None,
+                                         name_prefix: Optional[str] = None
+                                         ) -> Tuple[List[Tuple[str, Project]], Optional[str]]:
+    """
+    Get one keyset-paginated page of projects from all shards.
+
+    Every shard returns its next limit + 1 projects in parallel and the pages are merged. Project ids
+    are only unique per shard, so the merged order, and the cursor, is (sort value, shard, id). Without
+    a limit every shard returns all its projects and there is no next page.
+
+    :return: (shard, project) pairs of the page and the cursor of the next page (None on the last page)
+    :raises InvalidCursorError: If the cursor is malformed or was issued for another sort
+    """
+    if sort not in PROJECT_SORT_FIELDS:
+        raise ValueError(f"Sort field must be one of: {', '.join(PROJECT_SORT_FIELDS)}.")
+    position = decode_project_cursor(cursor, sort, descending, 3) if cursor else None
+    if position is not None and not isinstance(position[1], str):
+        raise InvalidCursorError("Invalid pagination cursor.")
+
+    async def page(shard: str, db: AsyncSession) -> List[ProjectModel]:
+        after = None
+        if position is not None:
+            value, cursor_shard, cursor_id = position
+            if shard == cursor_shard:
+                after = (value, cursor_id)
+            else:
+                # Rows with the cursor's value are already listed on shards that come before the
+                # cursor's shard in page order, and still to come on the others
+                listed = shard < cursor_shard if not descending else shard > cursor_shard
+                after = (value, _MAX_ID if listed != descending else 0)
+        return await ProjectRepository(db).get_projects_page(None if limit is None else limit + 1, sort, descending,
+                                                             after, name_prefix)
+
+    pages = await run_on_shards(session_factories, page)
+    merged = sorted(
+        ((getattr(pm, sort), shard, pm.id, pm) for shard, models in pages.items() for pm in models
+         if _owned(shard, pm.name)),
+        key=lambda row: row[:3], reverse=descending
+    )
+    next_cursor = None
+    if limit is not None and (len(merged) > limit or any(len(models) > limit for models in pages.values())):
+        merged = merged[:limit]
+        if merged:
+            value, shard, project_id, _ = merged[-1]
+            next_cursor = encode_project_cursor(sort, descending, value, shard, project_id)
+    return [(shard, _to_project(pm)) for _, shard, _, pm in merged], next_cursor
+
+
+async def get_tasks_for_projects_across_shards(session_factories: Dict[str, SessionFactory],
+                                               projects: Sequence[Tuple[str, Project]],
+                                               per_project_limit: Optional[int] = None,
+                                               statuses: Optional[Sequence[str]] = None) -> List[List[Task]]:
+    """
+    Load the tasks of projects on several shards, with one query per shard.
+
+    :param projects: (shard, project) pairs
+    :return: The tasks of every project, in the order of projects
+    """
+    by_shard: Dict[str, List[Project]] = {}
+    for shard, project in projects:
+        by_shard.setdefault(shard, []).append(project)
+    factories = {shard: session_factories[shard] for shard in by_shard}
+    tasks = await run_on_shards(
+        factories, lambda shard, db: get_tasks_for_projects(db, by_shard[shard], per_project_limit, statuses)
+    )
+    return [tasks[shard][project.id] for shard, project in projects]
+
+
+async def get_tasks_due_across_shards(session_factories: Dict[str, SessionFactory], start, end,
+                                      statuses: Optional[Sequence[str]], limit: int,
+                                      cursor: Optional[str] = None
+                                      ) -> Tuple[List[Tuple[str, Task]], Optional[str]]:
+    """
+    Get one keyset-paginated page of due tasks from all shards.
+
+    Task UUIDs are unique across shards, so every shard continues after the same (deadline, uuid)
+    cursor and the pages are merged.
+
+    :return: (project name, task) pairs ordered by deadline, and the cursor of the next page
+    """
+    pages = await run_on_shards(
+        session_factories, lambda shard, db: get_tasks_due(db, start, end, statuses, limit, cursor)
+    )
+    merged = sorted(
+        ((project_name, task) for shard, (tasks, _) in pages.items() for project_name, task in tasks
+         if _owned(shard, project_name)),
+        key=lambda pair: (pair[1].deadline, uuid.UUID(pair[1].uuid))
+    )
+    next_cursor = None
+    if len(merged) > limit or any(shard_cursor for _, shard_cursor in pages.values()):
+        merged = merged[:limit]
+        if merged:
+            last = merged[-1][1]
+            next_cursor = encode_cursor(last.deadline, last.uuid)
+    return merged, next_cursor
+
+
+async def get_recent_job_runs_across_shards(session_factories: Dict[str, SessionFactory], limit: int,
+                                            job_name: Optional[str] = None) -> List[JobRunModel]:
+    """Get the most recent job runs of all shards (the scheduler runs every job on every shard), newest first."""
+    runs = await run_on_shards(
+        session_factories, lambda shard, db: JobRunRepository(db).get_recent_runs(limit, job_name)
+    )
+    merged = sorted((run for shard_runs in runs.values() for run in shard_runs),
+                    key=lambda run: run.started_at, reverse=True)
+    return merged[:limit]
@@ -1,6 +1,7 @@
 # Task-related service functions
 
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple
+import uuid
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.models import Task, Status, Project
@@ -10,12 +11,35 @@ from core.validators.task_validators import (
     validate_task_title,
     validate_task_description,
     validate_task_status,
-    validate_task_deadline
+    validate_task_deadline,
+    to_utc_naive,
+    TASK_FIELDS
 )
-from core.exceptions import ProjectNotFoundError, TaskNotFoundError
+from core.exceptions import ProjectNotFoundError, TaskNotFoundError, TaskVersionConflictError, InvalidCursorError
+from utils.cursor import encode_cursor, decode_cursor
 
 
-async def get_task_by_uuid_in_project(db: AsyncSession, project_name: str, task_uuid: str) -> Optional[Task]:
+def _task_from_row(row) -> Task:
+    """Convert a column-level task row (sparse fieldset) to a core task; unselected fields stay None."""
+    values = row._mapping
+    task = Task(
+        title=values.get('title'),
+        description=values.get('description'),
+        status=values.get('status'),
+        deadline=values.get('deadline'),
+        id=values['uuid'],
+        project_id=values['project_id'],
+        created_at=values.get('created_at'),
+        updated_at=values.get('updated_at'),
+        version=values.get('version')
+    )
+    task.uuid = str(values['uuid'])
+    return task
+
+
+async def get_task_by_uuid_in_project(db: AsyncSession, project_name: str, task_uuid: str,
+                                      fields: Optional[Sequence[str]] = None,
+                                      include_archived: bool = False) -> Optional[Task]:
     validate_project_name = lambda name: None  # Assume already validated in project_services
     validate_project_name(project_name)
     project_repo = ProjectRepository(db)
@@ -23,9 +47,11 @@ async def get_task_by_uuid_in_project(db: AsyncSession, project_name: str, task_
     if not project_model:
         raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
     task_repo = TaskRepository(db)
-    task_model = await task_repo.get_by_uuid(task_uuid)
+    task_model = await task_repo.get_by_uuid(task_uuid, fields, include_archived)
     if not task_model or task_model.project_id != project_model.id:
         return None
+    if fields:
+        return _task_from_row(task_model)
     task_desc = task_model.description if task_model.description is not None else ""
     task = Task(
         title=task_model.title,
@@ -35,12 +61,33 @@ async def get_task_by_uuid_in_project(db: AsyncSession, project_name: str, task_
         id=task_model.uuid,
         project_id=task_model.project_id,
         created_at=task_model.created_at,
-        updated_at=task_model.updated_at
+        updated_at=task_model.updated_at,
+        version=task_model.version
     )
     task.uuid = str(task_model.uuid)
     return task
 
 
+async def get_tasks_by_uuids_in_project(db: AsyncSession, project_name: str,
+                                        task_uuids: Sequence[uuid.UUID]) -> Tuple[List[Task], List[uuid.UUID]]:
+    """
+    Get several tasks of a project by UUID with a single query.
+
+    :param project_name: Name of the project
+    :param task_uuids: UUIDs of the tasks; duplicates are ignored
+    :return: The found tasks in request order, and the UUIDs that are not in the project
+    """
+    requested = list(dict.fromkeys(task_uuids))
+    task_repo = TaskRepository(db)
+    rows = await task_repo.get_task_rows_by_uuids(project_name, requested, TASK_FIELDS)
+    if not rows and not await ProjectRepository(db).exists_by_name(project_name):
+        raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
+    tasks_by_uuid = {task.id: task for task in Task.from_rows(rows)}
+    tasks = [tasks_by_uuid[task_uuid] for task_uuid in requested if task_uuid in tasks_by_uuid]
+    missing = [task_uuid for task_uuid in requested if task_uuid not in tasks_by_uuid]
+    return tasks, missing
+
+
 async def add_task_to_project(db: AsyncSession, project: Project, title: str, description: str = "", 
                         status: str = Status.TODO, deadline: Optional[datetime] = None) -> Task:
     validate_project_name = lambda name: None  # Assume already validated in project_services
@@ -62,6 +109,7 @@ async def add_task_to_project(db: AsyncSession, project: Project, title: str, de
         status=status,
         deadline=deadline
     )
+    await project_repo.bump_versions([project_model.id])
     await db.commit()
     
     # Convert to core model
@@ -74,68 +122,54 @@ async def add_task_to_project(db: AsyncSession, project: Project, title: str, de
         id=task_model.uuid,
         project_id=task_model.project_id,
         created_at=task_model.created_at,
-        updated_at=task_model.updated_at
+        updated_at=task_model.updated_at,
+        version=task_model.version
     )
     task.uuid = str(task_model.uuid)
     return task
 
 
-async def update_task_status(db: AsyncSession, project: Project, task_uuid: str, new_status: str) -> bool:
-    validate_project_name = lambda name: None
-    validate_project_name(project.get_name())
-    validate_task_status(new_status)
-    project_repo = ProjectRepository(db)
-    project_model = await project_repo.get_by_name(project.get_name())
-    if not project_model:
-        raise ProjectNotFoundError(f"Project with name '{project.get_name()}' not found.")
-    task_repo = TaskRepository(db)
-    task_model = await task_repo.get_by_uuid(task_uuid)
-    if not task_model:
-        raise TaskNotFoundError(f"Task with uuid '{task_uuid}' not found.")
-    if task_model.project_id != project_model.id:
-        raise TaskNotFoundError(f"Task with uuid '{task_uuid}' not found in project '{project.get_name()}'.")
-    task_desc = task_model.description if task_model.description is not None else ""
-    await task_repo.update_task(
-        uuid=task_uuid,
-        title=task_model.title,
-        description=task_desc,
-        status=new_status,
-        deadline=task_model.deadline
-    )
-    await db.commit()
-    return True
-
+async def update_task_fields(db: AsyncSession, project_name: str, task_uuid: str, changes: dict,
+                             expected_version: Optional[int] = None) -> Task:
+    """
+    Partially update a task with a single conditional UPDATE (no prior SELECT).
 
-async def update_task_elements(db: AsyncSession, project: Project, task_uuid: str, new_title: str, 
-                          new_description: str = "", new_status: str = Status.TODO, 
-                          new_deadline: Optional[datetime] = None) -> Task:
-    validate_project_name = lambda name: None
-    validate_project_name(project.get_name())
-    validate_task_title(new_title)
-    validate_task_description(new_description)
-    validate_task_status(new_status)
-    if new_deadline is not None:
-        new_deadline = validate_task_deadline(new_deadline)
-    project_repo = ProjectRepository(db)
-    project_model = await project_repo.get_by_name(project.get_name())
-    if not project_model:
-        raise ProjectNotFoundError(f"Project with name '{project.get_name()}' not found.")
+    :param project_name: Name of the project the task belongs to
+    :param task_uuid: UUID of the task
+    :param changes: New values of the fields to change (title, description, status, deadline)
+    :param expected_version: Version the change is based on; None to update whatever the current version is
+    :return: The updated task
+    :raises TaskVersionConflictError: If the task was changed since expected_version
+    """
+    try:
+        task_uuid = uuid.UUID(str(task_uuid))
+    except ValueError:
+        raise TaskNotFoundError(f"Task with uuid '{task_uuid}' not found in project '{project_name}'.")
+    changes = dict(changes)
+    if 'title' in changes:
+        validate_task_title(changes['title'])
+    if 'description' in changes:
+        validate_task_description(changes['description'])
+    if 'status' in changes:
+        validate_task_status(changes['status'])
+    if changes.get('deadline') is not None:
+        changes['deadline'] = validate_task_deadline(changes['deadline'])
     task_repo = TaskRepository(db)
-    task_model = await task_repo.get_by_uuid(task_uuid)
-    if not task_model:
-        raise TaskNotFoundError(f"Task with uuid '{task_uuid}' not found.")    
-    if task_model.project_id != project_model.id:
-        raise TaskNotFoundError(f"Task with uuid '{task_uuid}' not found in project '{project.get_name()}'.")
-    
-    task_model = await task_repo.update_task(
-        uuid=task_uuid,
-        title=new_title,
-        description=new_description,
-        status=new_status,
-        deadline=new_deadline
-    )
+    task_model = await task_repo.update_task_fields(project_name, task_uuid, changes, expected_version)
+    if task_model is None:
+        # Only the failure path needs to find out why nothing matched
+        current_version = await task_repo.get_task_version(project_name, task_uuid)
+        if current_version is not None:
+            raise TaskVersionConflictError(
+                f"Task with uuid '{task_uuid}' was modified (current version {current_version}, "
+                f"expected {expected_version}).", current_version
+            )
+        if not await ProjectRepository(db).exists_by_name(project_name):
+            raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
+        raise TaskNotFoundError(f"Task with uuid '{task_uuid}' not found in project '{project_name}'.")
+    await ProjectRepository(db).bump_versions([task_model.project_id])
     await db.commit()
-    
+
     task_desc = task_model.description if task_model.description is not None else ""
     task = Task(
         title=task_model.title,
@@ -145,12 +179,29 @@ async def update_task_elements(db: AsyncSession, project: Project, task_uuid: st
         id=task_model.uuid,
         project_id=task_model.project_id,
         created_at=task_model.created_at,
-        updated_at=task_model.updated_at
+        updated_at=task_model.updated_at,
+        version=task_model.version
     )
     task.uuid = str(task_model.uuid)
     return task
 
 
+async def update_task_status(db: AsyncSession, project: Project, task_uuid: str, new_status: str,
+                             expected_version: Optional[int] = None) -> bool:
+    await update_task_fields(db, project.get_name(), task_uuid, {'status': new_status}, expected_version)
+    return True
+
+
+async def update_task_elements(db: AsyncSession, project: Project, task_uuid: str, new_title: str, 
+                          new_description: str = "", new_status: str = Status.TODO, 
+                          new_deadline: Optional[datetime] = None, expected_version: Optional[int] = None) -> Task:
+    return await update_task_fields(
+        db, project.get_name(), task_uuid,
+        {'title': new_title, 'description': new_description, 'status': new_status, 'deadline': new_deadline},
+        expected_version
+    )
+
+
 async def delete_task_from_project(db: AsyncSession, project: Project, task_uuid: str) -> bool:
     validate_project_name = lambda name: None
     validate_project_name(project.get_name())
@@ -165,11 +216,13 @@ async def delete_task_from_project(db: AsyncSession, project: Project, task_uuid
     if task_model.project_id != project_model.id:
         raise TaskNotFoundError(f"Task with uuid '{task_uuid}' not found in project '{project.get_name()}'.")
     await task_repo.delete_task(task_uuid)
+    await project_repo.bump_versions([project_model.id])
     await db.commit()
     return True
 
 
-async def get_project_tasks(db: AsyncSession, project: Project) -> List[Task]:
+async def get_project_tasks(db: AsyncSession, project: Project,
+                            fields: Optional[Sequence[str]] = None, include_archived: bool = False) -> List[Task]:
     validate_project_name = lambda name: None
     validate_project_name(project.get_name())
     project_repo = ProjectRepository(db)
@@ -177,20 +230,66 @@ async def get_project_tasks(db: AsyncSession, project: Project) -> List[Task]:
     if not project_model:
         raise ProjectNotFoundError(f"Project with name '{project.get_name()}' not found.")
     task_repo = TaskRepository(db)
-    task_models = await task_repo.get_tasks_by_project(project_model.id)
+    # Column-level rows skip ORM identity-map bookkeeping; TASK_FIELDS is the Task.from_rows order
+    rows = await task_repo.get_tasks_by_project(project_model.id, fields or TASK_FIELDS, include_archived)
+    if fields:
+        return [_task_from_row(row) for row in rows]
+    return Task.from_rows(rows)
+
+
+async def get_tasks_due(db: AsyncSession, start: Optional[datetime], end: Optional[datetime],
+                        statuses: Optional[Sequence[str]], limit: int,
+                        cursor: Optional[str] = None) -> Tuple[List[Tuple[str, Task]], Optional[str]]:
+    """
+    Get one keyset-paginated page of tasks, across projects, whose deadline falls in [start, end).
+
+    Deadlines are stored as naive UTC values, so offset-aware bounds are converted to UTC.
+
+    :param start: Inclusive lower deadline bound (None for no bound)
+    :param end: Exclusive upper deadline bound (None for no bound)
+    :param statuses: Statuses to include (None for every status except done)
+    :param limit: Maximum number of tasks in the page
+    :param cursor: Cursor returned with the previous page
+    :return: (project name, task) pairs ordered by deadline, and the cursor of the next page
+    :raises InvalidCursorError: If the cursor is malformed
+    """
+    if statuses is not None:
+        for task_status in statuses:
+            validate_task_status(task_status)
+    start = to_utc_naive(start) if start is not None else None
+    end = to_utc_naive(end) if end is not None else None
+    after = None
+    if cursor:
+        try:
+            after_deadline, after_uuid = decode_cursor(cursor, 2)
+            if isinstance(after_deadline, str):
+                after_deadline = datetime.fromisoformat(after_deadline)
+            if not isinstance(after_deadline, datetime):
+                raise TypeError
+            after = (to_utc_naive(after_deadline), uuid.UUID(after_uuid))
+        except (TypeError, ValueError, AttributeError):
+            raise InvalidCursorError("Invalid pagination cursor.")
+    task_repo = TaskRepository(db)
+    # Fetch one extra row to know whether another page follows
+    rows = await task_repo.get_tasks_due(start, end, statuses, limit + 1, after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.deadline, str(last.uuid))
     tasks = []
-    for tm in task_models:
-        task_desc = tm.description if tm.description is not None else ""
+    for tm, project_name in rows:
         task = Task(
             title=tm.title,
-            description=task_desc,
+            description=tm.description if tm.description is not None else "",
             status=tm.status,
             deadline=tm.deadline,
             id=tm.uuid,
             project_id=tm.project_id,
             created_at=tm.created_at,
-            updated_at=tm.updated_at
+            updated_at=tm.updated_at,
+            uuid=str(tm.uuid),
+            version=tm.version
         )
-        task.uuid = str(tm.uuid)
-        tasks.append(task)
-    return tasks
+        tasks.append((project_name, task))
+    return tasks, next_cursor
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List
 from core.exceptions import *
 
 import datetime as dt_module
@@ -68,8 +68,41 @@ def validate_task_deadline(deadline: datetime | str) -> Optional[datetime]:
     if dt_val < now:
         raise InvalidTaskDeadlineError("Task deadline must be a future date.")
     
-    if dt_val.tzinfo is not None and dt_val.tzinfo.utcoffset(dt_val) is not None:
+    return to_utc_naive(dt_val)
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Convert an offset-aware datetime to a naive UTC one, as deadlines are stored; naive values are kept.
+    :param value: The datetime to convert.
+    :return: The naive datetime.
+    """
+    if value.tzinfo is not None and value.tzinfo.utcoffset(value) is not None:
         # Convert to UTC and strip timezone info to make it naive
-        dt_val = dt_val.astimezone(dt_module.timezone.utc).replace(tzinfo=None)
-        
-    return dt_val
+        value = value.astimezone(dt_module.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+TASK_FIELDS = ('uuid', 'project_id', 'title', 'description', 'status', 'deadline', 'created_at', 'updated_at', 'version')
+
+
+def validate_task_fields(fields: str) -> List[str]:
+    """Validate a comma-separated sparse fieldset for task responses.
+    :param fields: The requested fields, e.g. "uuid,title,status".
+    :return: The requested field names in order without duplicates, or raise an exception if invalid.
+    """
+    requested = []
+    for field in fields.split(','):
+        field = field.strip()
+        if field and field not in requested:
+            requested.append(field)
+
+    if not requested:
+        raise InvalidTaskFieldsError("At least one task field must be requested.")
+
+    unknown = [field for field in requested if field not in TASK_FIELDS]
+    if unknown:
+        raise InvalidTaskFieldsError(
+            f"Unknown task field(s): {', '.join(unknown)}. Allowed fields: {', '.join(TASK_FIELDS)}."
+        )
+
+    return requested
@@ -1,31 +1,167 @@
 """
 Database connection and session management using SQLAlchemy.
+
+PostgreSQL (asyncpg) is the default backend; single-node installs can use SQLite through
+aiosqlite by setting DATABASE_URL=sqlite+aiosqlite:///path/to/todolist.db.
+
+With SHARD_MAP_PATH set, projects and everything that belongs to them live on the shards of the
+shard map (data/sharding.py), each with its own engine and connection pool. Stored idempotency
+keys are claimed in the transaction of the request, so they live on the shard of their project.
+All shards must use the backend of DATABASE_URL.
 """
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from data.env_loader import DATABASE_URL
+from data.env_loader import DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, SQLITE_BUSY_TIMEOUT_MS, SHARD_MAP_PATH
+from data.sharding import ShardMap
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# Called with every engine created after them (see for_each_engine)
+_engine_callbacks: List[Callable[[AsyncEngine], None]] = []
+
+# INSERT construct with ON CONFLICT support for the configured backend
+dialect_insert = sqlite.insert if IS_SQLITE else postgresql.insert
+
+
+def create_database_engine(url: str) -> AsyncEngine:
+    """Create an engine with the application's pool and connection settings."""
+    if url.startswith("sqlite") != IS_SQLITE:
+        raise ValueError(f"All databases must use the backend of DATABASE_URL, not {url.split('://')[0]}.")
+    new_engine = create_async_engine(
+        url,
+        echo=False,  # Set to True to see SQL queries
+        pool_pre_ping=True,  # Enable connection health checks
+        # SQLite connections are local files, the dialect picks a suitable pool itself
+        **({} if IS_SQLITE else {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW})
+    )
+    event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    for callback in _engine_callbacks:
+        callback(new_engine)
+    return new_engine
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Configure every new SQLite connection; a no-op on other backends."""
+    if not IS_SQLITE:
+        return
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers run concurrently with the writer; NORMAL sync is durable in WAL mode
+    # except for the last transactions before a power loss
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    # SQLite does not enforce foreign keys (and ON DELETE CASCADE) unless asked to, per connection
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.close()
+
+
+def _sessionmaker(bind: AsyncEngine) -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=bind, expire_on_commit=False, class_=AsyncSession)
+
 
 # Create SQLAlchemy engine
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,  # Set to True to see SQL queries
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_size=5,
-    max_overflow=10
-)
+engine = create_database_engine(DATABASE_URL)
 
 # Create session factory
-AsyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False, class_=AsyncSession)
+AsyncSessionLocal = _sessionmaker(engine)
+
+SHARDING_ENABLED = bool(SHARD_MAP_PATH)
+shard_map = ShardMap.load(SHARD_MAP_PATH) if SHARDING_ENABLED else None
+# One engine (and pool) per shard, created on first use so shards added to the map are picked up
+_shard_engines: Dict[str, AsyncEngine] = {}
+_shard_sessions: Dict[str, sessionmaker] = {}
+
+
+def shard_sessionmaker(shard: str) -> sessionmaker:
+    """Session factory of a shard of the shard map."""
+    factory = _shard_sessions.get(shard)
+    if factory is None:
+        _shard_engines[shard] = create_database_engine(shard_map.shards[shard])
+        factory = _shard_sessions[shard] = _sessionmaker(_shard_engines[shard])
+    return factory
+
+
+def project_sessionmaker(project_name: str) -> sessionmaker:
+    """
+    Session factory of the database that holds a project (AsyncSessionLocal without sharding).
+
+    :raises ProjectMovingError: If the project is being moved to another shard
+    """
+    if not SHARDING_ENABLED:
+        return AsyncSessionLocal
+    return shard_sessionmaker(shard_map.shard_for(project_name))
+
+
+def shard_sessionmakers() -> Dict[str, sessionmaker]:
+    """Session factory of every database that holds projects, by shard name ("default" without sharding)."""
+    if not SHARDING_ENABLED:
+        return {"default": AsyncSessionLocal}
+    return {shard: shard_sessionmaker(shard) for shard in shard_map.shard_names()}
+
+
+def for_each_engine(callback: Callable[[AsyncEngine], None]) -> None:
+    """Call callback with the default engine and every shard engine, including shards created later."""
+    _engine_callbacks.append(callback)
+    callback(engine)
+    for shard_engine in list(_shard_engines.values()):
+        callback(shard_engine)
+
+
+async def dispose_engines() -> None:
+    """Close the connection pools of the default engine and of every shard."""
+    await engine.dispose()
+    for shard_engine in _shard_engines.values():
+        await shard_engine.dispose()
 
 # Create declarative base for models
 Base = declarative_base()
 
+# Set while the operations of a POST /batch request run (interface/api/batch_routers.py): every
+# request session is then this one, so all operations share one transaction
+batch_session: ContextVar[Optional[AsyncSession]] = ContextVar("batch_session", default=None)
+
+
+@asynccontextmanager
+async def project_session(project_name: str) -> AsyncIterator[AsyncSession]:
+    """
+    Open a session on the database that holds a project, or use the session of the running batch.
+
+    :raises ProjectMovingError: If the project is being moved to another shard
+    """
+    session = batch_session.get()
+    if session is not None:
+        yield session
+        return
+    async with project_sessionmaker(project_name)() as session:
+        yield session
+
 
 async def get_db():
     """
     Get a database session.
     Yields a session and ensures it's closed after use.
     """
+    session = batch_session.get()
+    if session is not None:
+        yield session
+        return
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def get_project_db(project_name: str):
+    """
+    Get a database session on the shard of the project named in the request path.
+    Yields a session and ensures it's closed after use.
+    """
+    async with project_session(project_name) as session:
+        yield session
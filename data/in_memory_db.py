@@ -1,15 +1,74 @@
 """
 In-memory database for projects and tasks.
+
+The store is volatile unless open_store() is called: then every mutation is journaled and the
+store is restored from the latest snapshot and the journals on the next open_store().
+Mutations must go through the functions of this module (not the setters of stored objects)
+to be journaled.
 """
 from core.exceptions import ProjectNotFoundError, TaskNotFoundError, DuplicateProjectNameError
 
-from typing import Dict, List, Optional
+import bisect
+import threading
+
+from datetime import datetime
+
+from pathlib import Path
 
-from core.models import Project, Task
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.models import Project, Task, Status
+from core.validators.task_validators import to_utc_naive
+from data.env_loader import IN_MEMORY_DATA_DIR, IN_MEMORY_FSYNC_INTERVAL_MS, IN_MEMORY_SNAPSHOT_EVERY
+from data.in_memory_persistence import (
+    Journal, journal_path, list_journals, replay_journal, write_snapshot, load_snapshot
+)
 
 # In-memory storage
 projects_db: Dict[str, Project] = {}
-tasks_db: Dict[str, List[Task]] = {}  # key: project name, value: list of tasks
+tasks_db: Dict[str, Dict[str, Task]] = {}  # key: project name, value: tasks by uuid, in insertion order
+
+# Tasks with a deadline, kept sorted by (deadline, uuid) for cross-project due/overdue queries
+deadline_index: List[Tuple[datetime, str]] = []
+task_locations: Dict[str, Tuple[str, Task]] = {}  # key: task uuid, value: (project name, task)
+# key: task uuid, value: the deadline the task is indexed under (the task itself may have been changed since)
+indexed_deadlines: Dict[str, datetime] = {}
+# False while replaying: the deadline index is then rebuilt once instead of per insert
+_maintain_deadline_index = True
+
+# Persistence state, set by open_store()
+_data_dir: Optional[Path] = None
+_journal: Optional[Journal] = None
+_generation = 0
+_ops_since_snapshot = 0
+_snapshot_thread: Optional[threading.Thread] = None
+
+
+def _deadline_of(task: Task) -> Optional[datetime]:
+    """The deadline of a task as a naive UTC datetime, so that every key of the index is comparable."""
+    deadline = task.get_deadline()
+    if isinstance(deadline, str):
+        deadline = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
+    return to_utc_naive(deadline) if deadline is not None else None
+
+
+def _index_task(project_name: str, task: Task) -> None:
+    task_locations[task.get_uuid()] = (project_name, task)
+    deadline = _deadline_of(task)
+    if deadline is not None and _maintain_deadline_index:
+        indexed_deadlines[task.get_uuid()] = deadline
+        bisect.insort(deadline_index, (deadline, task.get_uuid()))
+
+
+def _unindex_task(task: Task) -> None:
+    task_locations.pop(task.get_uuid(), None)
+    # The stored key, not the task's current deadline: the task may have been changed in place
+    deadline = indexed_deadlines.pop(task.get_uuid(), None)
+    if deadline is not None:
+        key = (deadline, task.get_uuid())
+        idx = bisect.bisect_left(deadline_index, key)
+        if idx < len(deadline_index) and deadline_index[idx] == key:
+            del deadline_index[idx]
 
 
 def is_project_name_existing(name: str) -> bool:
@@ -29,7 +88,8 @@ def add_project(project: Project) -> None:
     if is_project_name_existing(project.get_name()):
         raise DuplicateProjectNameError(f"Project with name '{project.get_name()}' already exists.")
     projects_db[project.get_name()] = project
-    tasks_db[project.get_name()] = []
+    tasks_db[project.get_name()] = {}
+    _log('add_project', _project_state(project))
 
 
 def get_project(name: str) -> Optional[Project]:
@@ -68,6 +128,9 @@ def update_project_name(old_name: str, updated_project:Project) -> None:
     
     projects_db[updated_project.get_name()] = updated_project
     tasks_db[updated_project.get_name()] = tasks_db.pop(old_name)
+    for task in tasks_db[updated_project.get_name()].values():
+        task_locations[task.get_uuid()] = (updated_project.get_name(), task)
+    _log('update_project_name', old_name, _project_state(updated_project))
 
 
 def delete_project(name: str) -> None:
@@ -81,7 +144,9 @@ def delete_project(name: str) -> None:
     if project is None:
         raise ProjectNotFoundError(f"Project with name '{name}' not found.")
 
-    tasks_db.pop(name, None)
+    for task in tasks_db.pop(name, {}).values():
+        _unindex_task(task)
+    _log('delete_project', name)
 
 
 def add_task(project_name: str, task: Task) -> None:
@@ -93,7 +158,9 @@ def add_task(project_name: str, task: Task) -> None:
     """
     if project_name not in tasks_db:
         raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
-    tasks_db[project_name].append(task)
+    tasks_db[project_name][task.get_uuid()] = task
+    _index_task(project_name, task)
+    _log('add_task', project_name, _task_state(task))
 
 
 def get_tasks(project_name: str) -> List[Task]:
@@ -104,7 +171,7 @@ def get_tasks(project_name: str) -> List[Task]:
     """
     if project_name not in tasks_db:
         raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
-    return tasks_db.get(project_name, [])
+    return list(tasks_db[project_name].values())
 
 
 def get_task_by_uuid(project_name: str, task_uuid: str) -> Task:
@@ -116,9 +183,9 @@ def get_task_by_uuid(project_name: str, task_uuid: str) -> Task:
     """
     if project_name not in tasks_db:
         raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
-    for task in tasks_db[project_name]:
-        if task.get_uuid() == task_uuid:
-            return task
+    task = tasks_db[project_name].get(task_uuid)
+    if task is not None:
+        return task
     raise TaskNotFoundError(f"Task with uuid '{task_uuid}' not found in project '{project_name}'.")
 
 
@@ -132,10 +199,14 @@ def update_task_by_uuid(project_name: str, task_uuid: str, updated_task: Task) -
     """
     if project_name not in tasks_db:
         raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
-    for idx, task in enumerate(tasks_db[project_name]):
-        if task.get_uuid() == task_uuid:
-            tasks_db[project_name][idx] = updated_task
-            return
+    task = tasks_db[project_name].get(task_uuid)
+    if task is not None:
+        _unindex_task(task)
+        # Assigning to an existing key keeps the task's position
+        tasks_db[project_name][task_uuid] = updated_task
+        _index_task(project_name, updated_task)
+        _log('update_task', project_name, task_uuid, _task_state(updated_task))
+        return
     raise TaskNotFoundError(f"Task with uuid '{task_uuid}' not found in project '{project_name}'.")
 
 
@@ -149,8 +220,212 @@ def delete_task_by_uuid(project_name: str, task_uuid: str) -> None:
     if project_name not in tasks_db:
         raise ProjectNotFoundError(f"Project with name '{project_name}' not found.")
 
-    original_length = len(tasks_db[project_name])
-    tasks_db[project_name] = [t for t in tasks_db[project_name] if t.get_uuid() != task_uuid]
-
-    if len(tasks_db[project_name]) == original_length:
+    task = tasks_db[project_name].pop(task_uuid, None)
+    if task is None:
         raise TaskNotFoundError(f"Task with uuid '{task_uuid}' not found in project '{project_name}'.")
+    _unindex_task(task)
+    _log('delete_task', project_name, task_uuid)
+
+
+def get_tasks_due(start: Optional[datetime], end: Optional[datetime], statuses: Optional[Sequence[str]] = None,
+                  after: Optional[Tuple[datetime, str]] = None, limit: int = 100) -> List[Tuple[str, Task]]:
+    """
+    Retrieve tasks across all projects whose deadline falls in [start, end), ordered by (deadline, uuid).
+    :param start: Inclusive lower deadline bound, or None for no bound.
+    :param end: Exclusive upper deadline bound, or None for no bound.
+    :param statuses: Statuses to include, or None for every status except done.
+    :param after: (deadline, uuid) of the last task of the previous page.
+    :param limit: Maximum number of tasks to return.
+    :return: (project name, task) pairs.
+    """
+    start = to_utc_naive(start) if start is not None else None
+    end = to_utc_naive(end) if end is not None else None
+    if after is not None:
+        after = (to_utc_naive(after[0]), after[1])
+        idx = bisect.bisect_right(deadline_index, after)
+    elif start is not None:
+        idx = bisect.bisect_left(deadline_index, (start, ''))
+    else:
+        idx = 0
+
+    results = []
+    while idx < len(deadline_index) and len(results) < limit:
+        deadline, task_uuid = deadline_index[idx]
+        idx += 1
+        if start is not None and deadline < start:
+            continue
+        if end is not None and deadline >= end:
+            break
+        project_name, task = task_locations[task_uuid]
+        task_status = task.get_status()
+        if (statuses is None and task_status != Status.DONE) or (statuses is not None and task_status in statuses):
+            results.append((project_name, task))
+    return results
+
+
+# --- Persistence ---
+
+def _project_state(project: Project) -> tuple:
+    return project.name, project.description, project.id, project.created_at, project.updated_at
+
+
+def _task_state(task: Task) -> tuple:
+    return (task.get_uuid(), task.title, task.description, task.status, task.deadline, task.id, task.project_id,
+            task.created_at, task.updated_at, task.version)
+
+
+def _task_from_state(state: tuple) -> Task:
+    uuid, title, description, status, deadline, id, project_id, created_at, updated_at, version = state
+    return Task(title, description, status, deadline, id, project_id, created_at, updated_at, uuid, version)
+
+
+def _log(*record) -> None:
+    """Journal a mutation when persistence is enabled, and snapshot every IN_MEMORY_SNAPSHOT_EVERY records (0: never)."""
+    global _ops_since_snapshot
+    if _journal is None:
+        return
+    _journal.append(record)
+    _ops_since_snapshot += 1
+    if IN_MEMORY_SNAPSHOT_EVERY and _ops_since_snapshot >= IN_MEMORY_SNAPSHOT_EVERY:
+        snapshot_store()
+
+
+_REPLAY = {
+    'add_project': lambda state: add_project(Project(*state)),
+    'update_project_name': lambda old_name, state: update_project_name(old_name, Project(*state)),
+    'delete_project': delete_project,
+    'add_task': lambda project_name, state: add_task(project_name, _task_from_state(state)),
+    'update_task': lambda project_name, task_uuid, state: update_task_by_uuid(project_name, task_uuid,
+                                                                               _task_from_state(state)),
+    'delete_task': delete_task_by_uuid,
+}
+
+
+def _apply(record: tuple) -> None:
+    _REPLAY[record[0]](*record[1:])
+
+
+def _clear() -> None:
+    projects_db.clear()
+    tasks_db.clear()
+    deadline_index.clear()
+    task_locations.clear()
+    indexed_deadlines.clear()
+
+
+def _rebuild_deadline_index() -> None:
+    indexed_deadlines.clear()
+    for task_uuid, (_, task) in task_locations.items():
+        deadline = _deadline_of(task)
+        if deadline is not None:
+            indexed_deadlines[task_uuid] = deadline
+    deadline_index[:] = sorted((deadline, task_uuid) for task_uuid, deadline in indexed_deadlines.items())
+
+
+def open_store(directory: str = IN_MEMORY_DATA_DIR) -> int:
+    """
+    Load the store from a data directory and journal every following mutation.
+
+    The current content of the store is replaced by the latest snapshot plus the journals written after it.
+
+    :param directory: Data directory, created when missing
+    :return: The number of replayed journal records
+    """
+    global _data_dir, _journal, _generation, _ops_since_snapshot, _maintain_deadline_index
+    if _journal is not None:
+        raise RuntimeError("The in-memory store is already open.")
+    data_dir = Path(directory)
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    _clear()
+    _maintain_deadline_index = False
+    try:
+        snapshot = load_snapshot(data_dir)
+        generation = 0
+        if snapshot is not None:
+            generation, projects, tasks = snapshot
+            for state in projects:
+                projects_db[state[0]] = Project(*state)
+            for project_name, states in tasks.items():
+                project_tasks = tasks_db[project_name] = {}
+                for state in states:
+                    task = project_tasks[state[0]] = _task_from_state(state)
+                    task_locations[task.get_uuid()] = (project_name, task)
+
+        replayed = 0
+        for journal_generation, path in list_journals(data_dir):
+            if journal_generation >= generation:
+                replayed += replay_journal(path, _apply)
+                generation = journal_generation
+    finally:
+        _maintain_deadline_index = True
+    _rebuild_deadline_index()
+
+    _data_dir = data_dir
+    _generation = generation
+    _ops_since_snapshot = replayed
+    _journal = Journal(journal_path(data_dir, generation), IN_MEMORY_FSYNC_INTERVAL_MS / 1000)
+    return replayed
+
+
+def flush_store() -> None:
+    """Block until every journaled mutation is on disk (waits for the next group commit)."""
+    if _journal is not None:
+        _journal.wait_durable()
+
+
+def _write_snapshot(data_dir: Path, generation: int, projects: List[Project],
+                    tasks: Dict[str, List[Task]]) -> None:
+    state = (
+        generation,
+        [_project_state(project) for project in projects],
+        {project_name: [_task_state(task) for task in project_tasks] for project_name, project_tasks in tasks.items()},
+    )
+    write_snapshot(data_dir, state)
+    # The snapshot contains everything journaled before this generation
+    for journal_generation, path in list_journals(data_dir):
+        if journal_generation < generation:
+            path.unlink(missing_ok=True)
+
+
+def snapshot_store(wait: bool = False) -> None:
+    """
+    Snapshot the store and start a new journal generation.
+
+    The store is copied shallowly on the calling thread; serializing and writing the snapshot happens
+    in a background thread. Does nothing while the previous snapshot is still being written.
+
+    :param wait: Block until the snapshot is written
+    """
+    global _journal, _generation, _ops_since_snapshot, _snapshot_thread
+    if _journal is None:
+        raise RuntimeError("The in-memory store is not open.")
+    if _snapshot_thread is not None and _snapshot_thread.is_alive():
+        if wait:
+            _snapshot_thread.join()
+        return
+
+    _generation += 1
+    previous = _journal
+    _journal = Journal(journal_path(_data_dir, _generation), IN_MEMORY_FSYNC_INTERVAL_MS / 1000)
+    previous.close()
+    _ops_since_snapshot = 0
+
+    projects = list(projects_db.values())
+    tasks = {project_name: list(project_tasks.values()) for project_name, project_tasks in tasks_db.items()}
+    _snapshot_thread = threading.Thread(target=_write_snapshot, name="in-memory-snapshot",
+                                        args=(_data_dir, _generation, projects, tasks))
+    _snapshot_thread.start()
+    if wait:
+        _snapshot_thread.join()
+
+
+def close_store() -> None:
+    """Wait for a running snapshot, make the journal durable and stop journaling; the data stays loaded."""
+    global _journal, _snapshot_thread
+    if _snapshot_thread is not None:
+        _snapshot_thread.join()
+        _snapshot_thread = None
+    if _journal is not None:
+        _journal.close()
+        _journal = None
@@ -0,0 +1,205 @@
+"""
+Snapshot + journal persistence for the in-memory store.
+
+Every mutation of the store is appended to a journal file as a length-prefixed, CRC-checked pickle
+frame. Appends only go to the file buffer; a background thread flushes and fsyncs the journal every
+fsync interval, so one fsync covers all operations of that window (group commit). Periodically the
+whole store is written to a snapshot file and the journal is started afresh.
+
+On startup the snapshot is read through a memory map and the journals written after it are replayed.
+A torn frame at the end of the last journal (a crash in the middle of a write) is cut off.
+
+Files in the data directory:
+    snapshot.bin        latest snapshot, replaced atomically
+    journal.<gen>       journals; the snapshot records the first generation not contained in it
+"""
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+SNAPSHOT_NAME = "snapshot.bin"
+SNAPSHOT_MAGIC = b"TODOSNP1"
+JOURNAL_PREFIX = "journal."
+
+# Snapshot: magic, payload length, payload CRC32
+SNAPSHOT_HEADER = struct.Struct("<8sQI")
+# Journal frame: payload length, payload CRC32
+FRAME_HEADER = struct.Struct("<II")
+
+
+def journal_path(directory: Path, generation: int) -> Path:
+    return directory / f"{JOURNAL_PREFIX}{generation:08d}"
+
+
+def list_journals(directory: Path) -> List[Tuple[int, Path]]:
+    """List the journals of a data directory as (generation, path), oldest first."""
+    journals = []
+    for path in directory.glob(f"{JOURNAL_PREFIX}*"):
+        suffix = path.name[len(JOURNAL_PREFIX):]
+        if suffix.isdigit():
+            journals.append((int(suffix), path))
+    return sorted(journals)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Make a rename or file creation in directory durable (not supported on every platform)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    """Append-only operation journal with group-commit fsync."""
+
+    def __init__(self, path: Path, fsync_interval: float):
+        """
+        :param path: Journal file; appended to when it exists
+        :param fsync_interval: Seconds between two group commits
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self._file = open(path, "ab", buffering=1 << 16)
+        self._lock = threading.Lock()
+        self._durable_changed = threading.Condition(self._lock)
+        self._written = 0
+        self._durable = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sync_loop, name=f"journal-fsync-{path.name}", daemon=True)
+        self._thread.start()
+        _fsync_directory(path.parent)
+
+    def append(self, record: tuple) -> int:
+        """
+        Append a record to the journal buffer.
+
+        :param record: Picklable operation record
+        :return: Sequence number of the record, to be passed to wait_durable()
+        """
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        frame = FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            self._file.write(frame)
+            self._written += 1
+            return self._written
+
+    def sync(self) -> None:
+        """Flush and fsync everything appended so far."""
+        with self._lock:
+            if self._durable == self._written:
+                return
+            self._file.flush()
+            target = self._written
+        os.fsync(self._file.fileno())
+        with self._lock:
+            self._durable = max(self._durable, target)
+            self._durable_changed.notify_all()
+
+    def wait_durable(self, sequence: Optional[int] = None) -> None:
+        """Block until a record (by default every appended record) is on disk."""
+        with self._lock:
+            target = self._written if sequence is None else sequence
+            while self._durable < target:
+                self._durable_changed.wait()
+
+    def _sync_loop(self) -> None:
+        while not self._stopped.wait(self.fsync_interval):
+            self.sync()
+
+    def close(self) -> None:
+        """Stop the group-commit thread, sync the pending records and close the file."""
+        self._stopped.set()
+        self._thread.join()
+        self.sync()
+        self._file.close()
+
+
+def replay_journal(path: Path, apply: Callable[[tuple], Any]) -> int:
+    """
+    Apply the records of a journal in order.
+
+    A frame that is incomplete or fails its checksum marks the end of the valid journal; the file is
+    truncated there so that new records are not appended after garbage.
+
+    :param path: Journal file
+    :param apply: Called with every record
+    :return: The number of applied records
+    """
+    size = path.stat().st_size
+    if size == 0:
+        return 0
+    applied = 0
+    with open(path, "r+b") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+            while offset + FRAME_HEADER.size <= size:
+                length, crc = FRAME_HEADER.unpack_from(data, offset)
+                start = offset + FRAME_HEADER.size
+                end = start + length
+                if end > size:
+                    break
+                payload = data[start:end]
+                if zlib.crc32(payload) != crc:
+                    break
+                apply(pickle.loads(payload))
+                applied += 1
+                offset = end
+        if offset < size:
+            f.truncate(offset)
+            f.flush()
+            os.fsync(f.fileno())
+    return applied
+
+
+def write_snapshot(directory: Path, state: Any) -> None:
+    """
+    Write a snapshot atomically: to a temporary file first, then renamed over the previous one.
+
+    :param directory: Data directory
+    :param state: Picklable store state
+    """
+    payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    temporary = directory / (SNAPSHOT_NAME + ".tmp")
+    with open(temporary, "wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(payload), zlib.crc32(payload)))
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, directory / SNAPSHOT_NAME)
+    _fsync_directory(directory)
+
+
+def load_snapshot(directory: Path) -> Optional[Any]:
+    """
+    Read the snapshot of a data directory through a memory map.
+
+    :param directory: Data directory
+    :return: The stored state, or None when there is no snapshot
+    :raises ValueError: If the snapshot is corrupt
+    """
+    path = directory / SNAPSHOT_NAME
+    if not path.is_file():
+        return None
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if len(data) < SNAPSHOT_HEADER.size:
+                raise ValueError(f"Snapshot '{path}' is truncated.")
+            magic, length, crc = SNAPSHOT_HEADER.unpack_from(data, 0)
+            payload = memoryview(data)[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + length]
+            try:
+                if magic != SNAPSHOT_MAGIC or len(payload) != length or zlib.crc32(payload) != crc:
+                    raise ValueError(f"Snapshot '{path}' is corrupt.")
+                return pickle.loads(payload)
+            finally:
+                payload.release()
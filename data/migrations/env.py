@@ -2,7 +2,7 @@ from logging.config import fileConfig
 import sys
 from pathlib import Path
 
-from sqlalchemy import engine_from_config
+from sqlalchemy import engine_from_config, make_url
 from sqlalchemy import pool
 
 from alembic import context
@@ -12,17 +12,36 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Import the Base and models
 from data.database import Base
-from data.env_loader import DATABASE_URL
+from data.env_loader import DATABASE_URL, SHARD_MAP_PATH
+from data.sharding import ShardMap
 # Import all models so they are registered with Base
 from data.models.project_model import ProjectModel
 from data.models.task_model import TaskModel
+from data.models.idempotency_model import IdempotencyKeyModel
+from data.models.job_run_model import JobRunModel
+from data.models.task_archive_model import TaskArchiveModel
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
+# Every shard has the full schema: `alembic -x shard=<name> upgrade head` migrates one shard of
+# the shard map, without it DATABASE_URL is migrated
+shard = context.get_x_argument(as_dictionary=True).get('shard')
+if shard:
+    if not SHARD_MAP_PATH:
+        raise ValueError("-x shard=... needs SHARD_MAP_PATH.")
+    database_url = ShardMap.load(SHARD_MAP_PATH).shards[shard]
+else:
+    database_url = DATABASE_URL
+
+# Migrations run synchronously: swap the application's async driver for its sync counterpart
+SYNC_DRIVERS = {'postgresql+asyncpg': 'postgresql+psycopg2', 'sqlite+aiosqlite': 'sqlite'}
+url = make_url(database_url)
+url = url.set(drivername=SYNC_DRIVERS.get(url.drivername, url.drivername))
+
 # Set the sqlalchemy.url from our environment configuration
-config.set_main_option('sqlalchemy.url', DATABASE_URL)
+config.set_main_option('sqlalchemy.url', url.render_as_string(hide_password=False).replace('%', '%%'))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -59,6 +78,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
     )
 
     with context.begin_transaction():
@@ -79,8 +99,10 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # SQLite cannot ALTER most constraints; batch mode recreates the table instead
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite"
         )
 
         with context.begin_transaction():
@@ -0,0 +1,54 @@
+"""add queued jobs table
+
+Revision ID: 2b6eedf8b015
+Revises: 488103edca68
+Create Date: 2026-10-19 18:02:37.190424
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b6eedf8b015'
+down_revision: Union[str, Sequence[str], None] = '488103edca68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('queued_jobs',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('project_id', sa.BigInteger(), nullable=True),
+    sa.Column('project_name', sa.String(length=255), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(), nullable=False),
+    sa.Column('locked_by', sa.String(length=100), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('progress', sa.BigInteger(), nullable=False),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('output', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_queued_jobs_claimable', 'queued_jobs', ['run_after', 'id'], unique=False,
+                    postgresql_where=sa.text("status = 'queued'"), sqlite_where=sa.text("status = 'queued'"))
+    op.create_index('ix_queued_jobs_running_heartbeat', 'queued_jobs', ['heartbeat_at'], unique=False,
+                    postgresql_where=sa.text("status = 'running'"), sqlite_where=sa.text("status = 'running'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_queued_jobs_running_heartbeat', table_name='queued_jobs')
+    op.drop_index('ix_queued_jobs_claimable', table_name='queued_jobs')
+    op.drop_table('queued_jobs')
@@ -0,0 +1,54 @@
+"""add reminder webhooks and task reminders tables
+
+Revision ID: 488103edca68
+Revises: e491590ca08b
+Create Date: 2026-10-19 17:25:13.418220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '488103edca68'
+down_revision: Union[str, Sequence[str], None] = 'e491590ca08b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reminder_webhooks',
+    sa.Column('project_id', sa.BigInteger(), nullable=False),
+    sa.Column('url', sa.String(length=2083), nullable=False),
+    sa.Column('minutes_before', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+    op.create_table('task_reminders',
+    sa.Column('task_uuid', sa.Uuid(), nullable=False),
+    sa.Column('deadline', sa.DateTime(), nullable=False),
+    sa.Column('project_id', sa.BigInteger(), nullable=False),
+    sa.Column('project_name', sa.String(length=255), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('url', sa.String(length=2083), nullable=False),
+    sa.Column('minutes_before', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('claimed_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('task_uuid', 'deadline')
+    )
+    op.create_index('ix_task_reminders_status_claimed_at', 'task_reminders', ['status', 'claimed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_reminders_status_claimed_at', table_name='task_reminders')
+    op.drop_table('task_reminders')
+    op.drop_table('reminder_webhooks')
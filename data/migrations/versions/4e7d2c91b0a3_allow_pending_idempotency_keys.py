@@ -0,0 +1,34 @@
+"""allow pending idempotency keys
+
+Revision ID: 4e7d2c91b0a3
+Revises: cbf3e3718d74
+Create Date: 2026-10-19 12:05:14.381920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e7d2c91b0a3'
+down_revision: Union[str, Sequence[str], None] = 'cbf3e3718d74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A key is claimed in the transaction of the request; its response is recorded after the commit
+    with op.batch_alter_table('idempotency_keys') as batch_op:
+        batch_op.alter_column('status_code', existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column('response_body', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM idempotency_keys WHERE response_body IS NULL OR status_code IS NULL")
+    with op.batch_alter_table('idempotency_keys') as batch_op:
+        batch_op.alter_column('response_body', existing_type=sa.Text(), nullable=False)
+        batch_op.alter_column('status_code', existing_type=sa.Integer(), nullable=False)
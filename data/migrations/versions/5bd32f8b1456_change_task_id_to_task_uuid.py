@@ -21,14 +21,16 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     """Upgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('tasks', sa.Column('uuid', sa.UUID(), nullable=False))
-    op.drop_column('tasks', 'id')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('uuid', sa.Uuid(), nullable=False))
+        batch_op.drop_column('id')
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     """Downgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('tasks', sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False))
-    op.drop_column('tasks', 'uuid')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False))
+        batch_op.drop_column('uuid')
     # ### end Alembic commands ###
@@ -0,0 +1,29 @@
+"""add project version column
+
+Revision ID: 7276ca8420cb
+Revises: d13a97944afd
+Create Date: 2026-10-19 15:02:11.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7276ca8420cb'
+down_revision: Union[str, Sequence[str], None] = 'd13a97944afd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projects', sa.Column('version', sa.BigInteger(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,33 @@
+"""add project listing indexes
+
+Revision ID: 93b2f8c8802e
+Revises: bce60a628a7c
+Create Date: 2026-10-19 09:02:11.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '93b2f8c8802e'
+down_revision: Union[str, Sequence[str], None] = 'bce60a628a7c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_projects_name_pattern', 'projects', ['name'], unique=False,
+                    postgresql_ops={'name': 'text_pattern_ops'})
+    op.create_index('ix_projects_created_at_id', 'projects', ['created_at', 'id'], unique=False)
+    op.create_index('ix_projects_updated_at_id', 'projects', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_updated_at_id', table_name='projects')
+    op.drop_index('ix_projects_created_at_id', table_name='projects')
+    op.drop_index('ix_projects_name_pattern', table_name='projects')
@@ -0,0 +1,33 @@
+"""add list versions table
+
+Revision ID: 9c41d7e2a6b5
+Revises: 4e7d2c91b0a3
+Create Date: 2026-10-19 20:14:52.608317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41d7e2a6b5'
+down_revision: Union[str, Sequence[str], None] = '4e7d2c91b0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The row is created by the first write
+    op.create_table('list_versions',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('list_versions')
@@ -0,0 +1,38 @@
+"""add server-side timestamp defaults
+
+Revision ID: a267ce456454
+Revises: 93b2f8c8802e
+Create Date: 2026-10-19 09:41:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a267ce456454'
+down_revision: Union[str, Sequence[str], None] = '93b2f8c8802e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('projects', 'tasks'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), existing_nullable=False,
+                                  server_default=sa.func.now())
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), existing_nullable=False,
+                                  server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('tasks', 'projects'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), existing_nullable=False,
+                                  server_default=None)
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), existing_nullable=False,
+                                  server_default=None)
@@ -0,0 +1,45 @@
+"""add tasks archive table
+
+Revision ID: b1928874c474
+Revises: dd6d19aff65a
+Create Date: 2026-10-19 13:05:41.552907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1928874c474'
+down_revision: Union[str, Sequence[str], None] = 'dd6d19aff65a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tasks_archive',
+    sa.Column('uuid', sa.Uuid(), nullable=False),
+    sa.Column('project_id', sa.BigInteger(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('deadline', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('uuid')
+    )
+    op.create_index('ix_tasks_archive_project_id', 'tasks_archive', ['project_id'], unique=False)
+    op.create_index('ix_tasks_done_updated_at', 'tasks', ['updated_at'], unique=False,
+                    postgresql_where=sa.text("status = 'done'"), sqlite_where=sa.text("status = 'done'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_done_updated_at', table_name='tasks')
+    op.drop_index('ix_tasks_archive_project_id', table_name='tasks_archive')
+    op.drop_table('tasks_archive')
@@ -21,14 +21,16 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     """Upgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('tasks', sa.Column('deadline', sa.DateTime(), nullable=True))
-    op.drop_column('tasks', 'due_date')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('deadline', sa.DateTime(), nullable=True))
+        batch_op.drop_column('due_date')
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     """Downgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('tasks', sa.Column('due_date', postgresql.TIMESTAMP(), autoincrement=False, nullable=True))
-    op.drop_column('tasks', 'deadline')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('due_date', postgresql.TIMESTAMP(), autoincrement=False, nullable=True))
+        batch_op.drop_column('deadline')
     # ### end Alembic commands ###
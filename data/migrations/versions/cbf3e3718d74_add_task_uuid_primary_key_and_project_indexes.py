@@ -0,0 +1,70 @@
+"""add task uuid primary key and project indexes
+
+Revision ID: cbf3e3718d74
+Revises: 2b6eedf8b015
+Create Date: 2026-10-19 20:14:52.603117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cbf3e3718d74'
+down_revision: Union[str, Sequence[str], None] = '2b6eedf8b015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Built with CREATE INDEX CONCURRENTLY on PostgreSQL, so writes to tasks go on during the builds
+INDEXES = [
+    # Tasks of a project in creation order: task lists, projects with their tasks, analytics,
+    # chunked deletes and the ON DELETE CASCADE from projects
+    ('ix_tasks_project_id_created_at', ['project_id', 'created_at', 'uuid']),
+    # Tasks of a project with a given status: filtered task preloads and bulk updates in uuid order
+    ('ix_tasks_project_id_status', ['project_id', 'status', 'uuid']),
+]
+# 5bd32f8b1456 dropped the primary key with the id column and never declared uuid as the new one:
+# every lookup by uuid scanned the table
+UUID_INDEX = 'ix_tasks_uuid'
+
+
+def _drop_invalid_index(name: str) -> None:
+    """Drop an index left INVALID by an interrupted concurrent build, so the build can be retried."""
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {'name': name}).first()
+    if invalid:
+        op.drop_index(name, table_name='tasks', postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    context = op.get_context()
+    is_postgresql = context.dialect.name == 'postgresql'
+    # CONCURRENTLY cannot run inside a transaction block
+    with context.autocommit_block():
+        for name, columns, unique in [(UUID_INDEX, ['uuid'], True)] + [(n, c, False) for n, c in INDEXES]:
+            # Offline (--sql) runs cannot query the catalog
+            if is_postgresql and not context.as_sql:
+                _drop_invalid_index(name)
+            op.create_index(name, 'tasks', columns, unique=unique, if_not_exists=True,
+                            postgresql_concurrently=True)
+    if is_postgresql:
+        # Turning the finished unique index into the primary key only takes a short lock
+        # (the index is renamed to tasks_pkey); SQLite cannot add a primary key to a table
+        op.execute(f"ALTER TABLE tasks ADD CONSTRAINT tasks_pkey PRIMARY KEY USING INDEX {UUID_INDEX}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    context = op.get_context()
+    if context.dialect.name == 'postgresql':
+        op.drop_constraint('tasks_pkey', 'tasks', type_='primary')
+    with context.autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='tasks', if_exists=True, postgresql_concurrently=True)
+        if context.dialect.name != 'postgresql':
+            op.drop_index(UUID_INDEX, table_name='tasks', if_exists=True)
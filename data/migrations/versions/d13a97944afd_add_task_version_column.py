@@ -0,0 +1,33 @@
+"""add task version column
+
+Revision ID: d13a97944afd
+Revises: b1928874c474
+Create Date: 2026-10-19 14:21:37.806113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd13a97944afd'
+down_revision: Union[str, Sequence[str], None] = 'b1928874c474'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # With a constant default, PostgreSQL adds the column without rewriting the table
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+    op.add_column('tasks_archive', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks_archive') as batch_op:
+        batch_op.drop_column('version')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,29 @@
+"""add partial index on open task deadlines
+
+Revision ID: dd6d19aff65a
+Revises: f5334ebc5ee9
+Create Date: 2026-10-19 11:52:03.118745
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dd6d19aff65a'
+down_revision: Union[str, Sequence[str], None] = 'f5334ebc5ee9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_deadline_open', 'tasks', ['deadline', 'uuid'], unique=False,
+                    postgresql_where=sa.text("status <> 'done'"), sqlite_where=sa.text("status <> 'done'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_deadline_open', table_name='tasks')
@@ -0,0 +1,48 @@
+"""add recurrence rules table
+
+Revision ID: e491590ca08b
+Revises: 7276ca8420cb
+Create Date: 2026-10-19 16:40:52.902317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e491590ca08b'
+down_revision: Union[str, Sequence[str], None] = '7276ca8420cb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('recurrence_rules',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('project_id', sa.BigInteger(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('frequency', sa.String(length=10), nullable=False),
+    sa.Column('interval', sa.Integer(), nullable=False),
+    sa.Column('weekdays', sa.String(length=30), nullable=True),
+    sa.Column('cron', sa.String(length=100), nullable=True),
+    sa.Column('start_at', sa.DateTime(), nullable=False),
+    sa.Column('until', sa.DateTime(), nullable=True),
+    sa.Column('materialized_until', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_recurrence_rules_project_id', 'recurrence_rules', ['project_id'], unique=False)
+    op.create_index('ix_recurrence_rules_materialized_until', 'recurrence_rules', ['materialized_until'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recurrence_rules_materialized_until', table_name='recurrence_rules')
+    op.drop_index('ix_recurrence_rules_project_id', table_name='recurrence_rules')
+    op.drop_table('recurrence_rules')
@@ -1,3 +1,11 @@
 from data.database import Base
 from .task_model import TaskModel
-from .project_model import ProjectModel
\ No newline at end of file
+from .project_model import ProjectModel
+from .idempotency_model import IdempotencyKeyModel
+from .job_run_model import JobRunModel
+from .task_archive_model import TaskArchiveModel
+from .recurrence_rule_model import RecurrenceRuleModel
+from .reminder_webhook_model import ReminderWebhookModel
+from .task_reminder_model import TaskReminderModel
+from .queued_job_model import QueuedJobModel
+from .list_version_model import ListVersionModel
@@ -0,0 +1,25 @@
+"""
+SQLAlchemy database model for stored idempotent responses.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func, String, Text, DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from data.database import Base
+
+
+class IdempotencyKeyModel(Base):
+    """SQLAlchemy model for the idempotency_keys table."""
+    __tablename__ = "idempotency_keys"
+
+    scope: Mapped[str] = mapped_column(String(512), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # NULL while the key is claimed by a request whose response is not recorded yet
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response_body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKeyModel(scope={self.scope}, key={self.key})>"
@@ -0,0 +1,28 @@
+"""
+SQLAlchemy database model for background job runs.
+"""
+from datetime import datetime
+from sqlalchemy import String, Text, DateTime, Integer, BigInteger, Float, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from data.database import Base
+
+
+class JobRunModel(Base):
+    """SQLAlchemy model for the job_runs table."""
+    __tablename__ = "job_runs"
+    __table_args__ = (
+        Index("ix_job_runs_job_name_started_at", "job_name", "started_at"),
+        Index("ix_job_runs_started_at", "started_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    job_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    duration_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    rows_affected: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<JobRunModel(id={self.id}, job_name={self.job_name}, status={self.status})>"
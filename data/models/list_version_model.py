@@ -0,0 +1,18 @@
+"""
+SQLAlchemy database model for the project list version.
+"""
+from sqlalchemy import Integer, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from data.database import Base
+
+
+class ListVersionModel(Base):
+    """SQLAlchemy model for the list_versions table: a single row per database."""
+    __tablename__ = "list_versions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    # Incremented in the transaction of every project write and every task write; keys the list cache
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<ListVersionModel(version={self.version})>"
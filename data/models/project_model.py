@@ -2,7 +2,7 @@
 SQLAlchemy database model for project.
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, BigInteger
+from sqlalchemy import func, text, Column, String, Text, DateTime, ForeignKey, Integer, BigInteger, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from data.database import Base
 
@@ -10,12 +10,23 @@ from data.database import Base
 class ProjectModel(Base):
     """SQLAlchemy model for Project table."""
     __tablename__ = "projects"
+    __table_args__ = (
+        # text_pattern_ops lets LIKE 'prefix%' use the index regardless of the database collation
+        Index("ix_projects_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+        Index("ix_projects_created_at_id", "created_at", "id"),
+        Index("ix_projects_updated_at_id", "updated_at", "id"),
+    )
+    # Fetch server-generated timestamps with RETURNING instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(), nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(), onupdate=datetime.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Incremented by every write to the project or its tasks; keys the response and analytics caches
+    version: Mapped[int] = mapped_column(BigInteger, server_default=text("1"), default=1, nullable=False)
 
     # Relationship to tasks
     tasks = relationship("TaskModel", back_populates="project", cascade="all, delete-orphan")
@@ -0,0 +1,54 @@
+"""
+SQLAlchemy database model for the persistent queue of background jobs.
+"""
+from datetime import datetime
+from sqlalchemy import func, text, String, Text, DateTime, Integer, BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from data.database import Base
+
+
+class QueuedJobModel(Base):
+    """
+    SQLAlchemy model for the queued_jobs table.
+
+    A job is queued, running, succeeded or failed. Workers claim queued jobs with FOR UPDATE SKIP
+    LOCKED and send heartbeats while they run; a running job without a recent heartbeat is requeued.
+    """
+    __tablename__ = "queued_jobs"
+    __table_args__ = (
+        # Queued jobs in claim order, for the workers
+        Index("ix_queued_jobs_claimable", "run_after", "id",
+              postgresql_where=text("status = 'queued'"), sqlite_where=text("status = 'queued'")),
+        # Running jobs by heartbeat, to find jobs of workers that died
+        Index("ix_queued_jobs_running_heartbeat", "heartbeat_at",
+              postgresql_where=text("status = 'running'"), sqlite_where=text("status = 'running'")),
+    )
+    # Fetch server-generated timestamps with RETURNING instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    # The project is referenced by name and id without a foreign key: a delete job outlives its project
+    project_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    project_name: Mapped[str] = mapped_column(String(255), nullable=True)
+    # JSON arguments of the job
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    run_after: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    locked_by: Mapped[str] = mapped_column(String(100), nullable=True)
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # Rows processed so far; committed with each chunk, so a retried job can resume
+    progress: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # JSON summary of a finished job
+    result: Mapped[str] = mapped_column(Text, nullable=True)
+    # Document produced by the job (project exports), served separately from the status
+    output: Mapped[str] = mapped_column(Text, nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<QueuedJobModel(id={self.id}, kind={self.kind}, status={self.status})>"
@@ -0,0 +1,38 @@
+"""
+SQLAlchemy database model for recurrence rules of recurring tasks.
+"""
+from datetime import datetime
+from sqlalchemy import func, String, Text, DateTime, ForeignKey, Integer, BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from data.database import Base
+
+
+class RecurrenceRuleModel(Base):
+    """SQLAlchemy model for the recurrence_rules table."""
+    __tablename__ = "recurrence_rules"
+    __table_args__ = (
+        Index("ix_recurrence_rules_project_id", "project_id"),
+        # Rules whose materialized occurrences end before the rolling window does, for the scheduler
+        Index("ix_recurrence_rules_materialized_until", "materialized_until"),
+    )
+    # Fetch server-generated timestamps with RETURNING instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    project_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=True)
+    frequency: Mapped[str] = mapped_column(String(10), nullable=False)
+    interval: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    # Comma-separated weekday names of weekly rules, e.g. "mon,thu"
+    weekdays: Mapped[str] = mapped_column(String(30), nullable=True)
+    cron: Mapped[str] = mapped_column(String(100), nullable=True)
+    start_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    until: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # Occurrences up to this time exist as tasks; later ones are only shown as virtual occurrences
+    materialized_until: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<RecurrenceRuleModel(id={self.id}, project_id={self.project_id}, frequency={self.frequency})>"
@@ -0,0 +1,24 @@
+"""
+SQLAlchemy database model for the deadline-reminder webhooks of projects.
+"""
+from datetime import datetime
+from sqlalchemy import func, String, DateTime, ForeignKey, Integer, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from data.database import Base
+
+
+class ReminderWebhookModel(Base):
+    """SQLAlchemy model for the reminder_webhooks table (at most one webhook per project)."""
+    __tablename__ = "reminder_webhooks"
+    # Fetch server-generated timestamps with RETURNING instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+    project_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    url: Mapped[str] = mapped_column(String(2083), nullable=False)
+    # Reminders are sent this many minutes before the deadline of an open task
+    minutes_before: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<ReminderWebhookModel(project_id={self.project_id}, minutes_before={self.minutes_before})>"
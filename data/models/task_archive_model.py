@@ -0,0 +1,29 @@
+"""
+SQLAlchemy database model for archived tasks.
+"""
+from datetime import datetime
+from sqlalchemy import func, text, String, Text, DateTime, ForeignKey, Uuid, BigInteger, Integer, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from data.database import Base
+
+
+class TaskArchiveModel(Base):
+    """SQLAlchemy model for the tasks_archive table (done tasks moved out of the active tasks table)."""
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        Index("ix_tasks_archive_project_id", "project_id"),
+    )
+
+    uuid: Mapped[str] = mapped_column(Uuid, primary_key=True)
+    project_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=True)
+    status: Mapped[str] = mapped_column(String(50), nullable=False)
+    deadline: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, server_default=text("1"), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<TaskArchiveModel(uuid={self.uuid}, title={self.title})>"
@@ -2,7 +2,7 @@
 SQLAlchemy database model for tasks.
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, UUID, BigInteger
+from sqlalchemy import func, text, Column, String, Text, DateTime, ForeignKey, Uuid, BigInteger, Integer, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from data.database import Base
 import uuid
@@ -12,15 +12,31 @@ import uuid
 class TaskModel(Base):
     """SQLAlchemy model for Task table."""
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Open tasks by deadline, for the cross-project due/overdue query and the autoclose scan
+        Index("ix_tasks_deadline_open", "deadline", "uuid",
+              postgresql_where=text("status <> 'done'"), sqlite_where=text("status <> 'done'")),
+        # Done tasks by age, for the archival job
+        Index("ix_tasks_done_updated_at", "updated_at",
+              postgresql_where=text("status = 'done'"), sqlite_where=text("status = 'done'")),
+        # Tasks of a project in creation order, and with a given status (tools/check_query_plans.py
+        # checks that the repository queries use them)
+        Index("ix_tasks_project_id_created_at", "project_id", "created_at", "uuid"),
+        Index("ix_tasks_project_id_status", "project_id", "status", "uuid"),
+    )
+    # Fetch server-generated timestamps with RETURNING instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
-    uuid: Mapped[str] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    uuid: Mapped[str] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     project_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=True)
     status: Mapped[str] = mapped_column(String(50), default="todo", nullable=False)
     deadline: Mapped[datetime] = mapped_column(DateTime, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(), nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(), onupdate=datetime.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Incremented by every update; updates can be made conditional on it (optimistic concurrency)
+    version: Mapped[int] = mapped_column(Integer, server_default=text("1"), default=1, nullable=False)
 
     # Relationship to project
     project = relationship("ProjectModel", back_populates="tasks")
@@ -0,0 +1,39 @@
+"""
+SQLAlchemy database model for claimed deadline reminders.
+"""
+from datetime import datetime
+from sqlalchemy import String, Text, DateTime, Integer, BigInteger, Uuid, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from data.database import Base
+
+
+class TaskReminderModel(Base):
+    """
+    SQLAlchemy model for the task_reminders table.
+
+    A row is inserted when a reminder is claimed for delivery; its key (task, deadline) makes the claim
+    unique, and a task whose deadline moves gets a new reminder. The webhook URL and the payload
+    fields are copied at claim time, so a stale claim can be retried without other tables.
+    """
+    __tablename__ = "task_reminders"
+    __table_args__ = (
+        # Claims of crashed dispatchers, by claim time
+        Index("ix_task_reminders_status_claimed_at", "status", "claimed_at"),
+    )
+
+    task_uuid: Mapped[str] = mapped_column(Uuid, primary_key=True)
+    deadline: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    project_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    project_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    url: Mapped[str] = mapped_column(String(2083), nullable=False)
+    minutes_before: Mapped[int] = mapped_column(Integer, nullable=False)
+    # claimed, sent or failed
+    status: Mapped[str] = mapped_column(String(10), nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    claimed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    sent_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<TaskReminderModel(task_uuid={self.task_uuid}, deadline={self.deadline}, status={self.status})>"
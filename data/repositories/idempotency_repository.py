@@ -0,0 +1,64 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, func
+from data.database import dialect_insert
+from data.models import IdempotencyKeyModel
+from data.repositories.base import BaseRepository
+
+
+class IdempotencyRepository(BaseRepository[IdempotencyKeyModel]):
+    def __init__(self, db: AsyncSession):
+        """Initialize the idempotency repository.
+        :param db: The async database session.
+        """
+        super().__init__(db, IdempotencyKeyModel)
+
+    async def get_response(self, scope: str, key: str) -> Optional[IdempotencyKeyModel]:
+        """Get the stored, unexpired response for an idempotency key asynchronously."""
+        result = await self.db.execute(
+            select(IdempotencyKeyModel).where(
+                IdempotencyKeyModel.scope == scope,
+                IdempotencyKeyModel.key == key,
+                IdempotencyKeyModel.expires_at > datetime.now()
+            )
+        )
+        return result.scalars().first()
+
+    async def claim_key(self, scope: str, key: str, request_hash: str, expires_at: datetime) -> bool:
+        """Record an idempotency key, without a response yet, in the caller's transaction asynchronously.
+        An expired record of the key is replaced. A concurrent claim of the same key waits on the primary
+        key until the other transaction ends.
+        :return: False if an unexpired record holds the key.
+        """
+        stmt = dialect_insert(IdempotencyKeyModel).values(
+            scope=scope, key=key, request_hash=request_hash, status_code=None, response_body=None,
+            expires_at=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKeyModel.scope, IdempotencyKeyModel.key],
+            set_={'request_hash': stmt.excluded.request_hash, 'status_code': None, 'response_body': None,
+                  'created_at': func.now(), 'expires_at': stmt.excluded.expires_at},
+            where=IdempotencyKeyModel.expires_at <= datetime.now()
+        )
+        result = await self.db.execute(stmt)
+        return result.rowcount > 0
+
+    async def complete_response(self, scope: str, key: str, status_code: int, response_body: str,
+                                expires_at: datetime) -> None:
+        """Record the response of a claimed idempotency key asynchronously (the caller commits)."""
+        await self.db.execute(
+            update(IdempotencyKeyModel)
+            .where(IdempotencyKeyModel.scope == scope, IdempotencyKeyModel.key == key)
+            .values(status_code=status_code, response_body=response_body, expires_at=expires_at)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def delete_expired(self) -> int:
+        """Delete expired idempotency keys asynchronously.
+        :return: The number of deleted keys.
+        """
+        result = await self.db.execute(
+            delete(IdempotencyKeyModel).where(IdempotencyKeyModel.expires_at <= datetime.now())
+        )
+        return result.rowcount
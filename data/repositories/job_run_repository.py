@@ -0,0 +1,36 @@
+from typing import Optional, List
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from data.models import JobRunModel
+from data.repositories.base import BaseRepository
+
+
+class JobRunRepository(BaseRepository[JobRunModel]):
+    def __init__(self, db: AsyncSession):
+        """Initialize the job run repository.
+        :param db: The async database session.
+        """
+        super().__init__(db, JobRunModel)
+
+    async def record_run(self, job_name: str, status: str, started_at: datetime, finished_at: datetime,
+                         duration_ms: float, rows_affected: int, error: Optional[str] = None) -> JobRunModel:
+        """Record a finished job run asynchronously."""
+        job_run = JobRunModel(
+            job_name=job_name,
+            status=status,
+            started_at=started_at,
+            finished_at=finished_at,
+            duration_ms=duration_ms,
+            rows_affected=rows_affected,
+            error=error
+        )
+        return await self.add(job_run)
+
+    async def get_recent_runs(self, limit: int, job_name: Optional[str] = None) -> List[JobRunModel]:
+        """Get the most recent job runs asynchronously, newest first."""
+        query = select(JobRunModel)
+        if job_name is not None:
+            query = query.where(JobRunModel.job_name == job_name)
+        result = await self.db.execute(query.order_by(JobRunModel.started_at.desc()).limit(limit))
+        return result.scalars().all()
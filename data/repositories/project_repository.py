@@ -1,7 +1,9 @@
-from typing import Optional, List
+from typing import Optional, List, Any, Tuple, Sequence, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from data.models import ProjectModel
+from sqlalchemy import select, func, tuple_, update, delete
+from sqlalchemy.exc import IntegrityError
+from data.database import dialect_insert
+from data.models import ProjectModel, ListVersionModel
 from data.repositories.base import BaseRepository
 from core.exceptions import ProjectNotFoundError, DuplicateProjectNameError
 
@@ -25,25 +27,47 @@ class ProjectRepository(BaseRepository[ProjectModel]):
         return count > 0
 
     async def create_project(self, name: str, description: str = "") -> ProjectModel:
-        """Create a new project asynchronously."""
-        if await self.exists_by_name(name):
+        """Create a new project asynchronously.
+        Runs as a single INSERT ... ON CONFLICT DO NOTHING RETURNING, so the name check and
+        the write cannot race; no returned row means the name is already taken.
+        """
+        stmt = (
+            dialect_insert(ProjectModel)
+            .values(name=name, description=description)
+            .on_conflict_do_nothing(index_elements=[ProjectModel.name])
+            .returning(ProjectModel)
+        )
+        result = await self.db.execute(stmt)
+        project = result.scalars().first()
+        if project is None:
             raise DuplicateProjectNameError(f"Project with name '{name}' already exists.")
-
-        project = ProjectModel(name=name, description=description)
-        return await self.add(project)
+        await self.bump_list_version()
+        return project
 
     async def update_project(self, old_name: str, new_name: str, new_description: str) -> ProjectModel:
-        """Update project details asynchronously."""
-        project = await self.get_by_name(old_name)
-        if not project:
-            raise ProjectNotFoundError(f"Project with name '{old_name}' not found.")
-
-        if new_name != old_name and await self.exists_by_name(new_name):
+        """Update project details asynchronously.
+        Runs as a single UPDATE ... RETURNING; a unique violation means the new name is taken
+        and no returned row means the project does not exist. The UPDATE runs in a savepoint, so a
+        violation only undoes it and the caller's transaction stays usable.
+        """
+        stmt = (
+            update(ProjectModel)
+            .where(ProjectModel.name == old_name)
+            .values(name=new_name, description=new_description, updated_at=func.now(),
+                    version=ProjectModel.version + 1)
+            .returning(ProjectModel)
+            .execution_options(populate_existing=True)
+        )
+        try:
+            async with self.db.begin_nested():
+                result = await self.db.execute(stmt)
+        except IntegrityError:
             raise DuplicateProjectNameError(f"Project with name '{new_name}' already exists.")
-
-        setattr(project, 'name', new_name)
-        setattr(project, 'description', new_description)
-        return await self.update(project)
+        project = result.scalars().first()
+        if project is None:
+            raise ProjectNotFoundError(f"Project with name '{old_name}' not found.")
+        await self.bump_list_version()
+        return project
 
     async def delete_project(self, name: str) -> None:
         """Delete project by name asynchronously."""
@@ -51,7 +75,102 @@ class ProjectRepository(BaseRepository[ProjectModel]):
         if not project:
             raise ProjectNotFoundError(f"Project with name '{name}' not found.")
         await self.delete(project)
+        await self.bump_list_version()
+
+    async def delete_project_by_id(self, project_id: int) -> bool:
+        """Delete a project and, through ON DELETE CASCADE, everything that is left of it asynchronously.
+        :return: True if the project existed.
+        """
+        result = await self.db.execute(
+            delete(ProjectModel).where(ProjectModel.id == project_id).execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            return False
+        await self.bump_list_version()
+        return True
 
     async def get_all_projects(self) -> List[ProjectModel]:
         """Get all projects asynchronously."""
-        return await self.get_all()
\ No newline at end of file
+        return await self.get_all()
+
+    async def get_versions_by_names(self, names: Optional[Sequence[str]] = None) -> Dict[str, Tuple[int, int]]:
+        """Get the id and version of projects by name asynchronously.
+        :param names: Project names; None for all projects.
+        :return: (id, version) by name of the projects that exist.
+        """
+        query = select(ProjectModel.name, ProjectModel.id, ProjectModel.version)
+        if names is not None:
+            query = query.where(ProjectModel.name.in_(names))
+        result = await self.db.execute(query)
+        return {name: (project_id, version) for name, project_id, version in result.all()}
+
+    async def get_version(self, name: str) -> Optional[Tuple[int, int]]:
+        """Get the id and version of a project asynchronously, or None if there is no such project."""
+        result = await self.db.execute(
+            select(ProjectModel.id, ProjectModel.version).where(ProjectModel.name == name)
+        )
+        row = result.first()
+        return tuple(row) if row is not None else None
+
+    async def get_list_version(self) -> int:
+        """Get the list version, which increases whenever any project or task is written, created or deleted.
+        :return: The version; 0 before the first write.
+        """
+        version = await self.db.scalar(select(ListVersionModel.version).where(ListVersionModel.id == 1))
+        return version or 0
+
+    async def bump_list_version(self) -> None:
+        """Increment the list version asynchronously (the caller commits).
+        Every write transaction updates the one row, so it is done last: the row stays locked until the commit.
+        """
+        stmt = dialect_insert(ListVersionModel).values(id=1, version=1)
+        await self.db.execute(
+            stmt.on_conflict_do_update(index_elements=[ListVersionModel.id],
+                                       set_={"version": ListVersionModel.version + 1})
+        )
+
+    async def bump_versions(self, project_ids: Sequence[int]) -> None:
+        """Increment the version of projects asynchronously (the caller commits).
+        Called at the end of a write transaction, since it locks the project rows until the commit.
+        :param project_ids: The projects whose tasks were written.
+        """
+        if not project_ids:
+            return
+        await self.db.execute(
+            update(ProjectModel)
+            .where(ProjectModel.id.in_(sorted(set(project_ids))))
+            # Tasks changed, not the project itself: keep updated_at (the column has an onupdate default)
+            .values(version=ProjectModel.version + 1, updated_at=ProjectModel.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await self.bump_list_version()
+
+    async def get_projects_page(self, limit: Optional[int], sort: str = "name", descending: bool = False,
+                                after: Optional[Tuple[Any, int]] = None,
+                                name_prefix: Optional[str] = None) -> List[ProjectModel]:
+        """Get one keyset-paginated page of projects asynchronously.
+        :param limit: Maximum number of projects to return; None for all of them.
+        :param sort: Sort column, one of name, created_at or updated_at.
+        :param descending: Sort in descending order.
+        :param after: (sort value, id) of the last project of the previous page.
+        :param name_prefix: Only return projects whose name starts with this prefix.
+        :return: List of projects ordered by (sort, id).
+        """
+        sort_column = getattr(ProjectModel, sort)
+        query = select(ProjectModel)
+
+        if name_prefix:
+            escaped = name_prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.where(ProjectModel.name.like(escaped + '%', escape='\\'))
+
+        if after is not None:
+            key = tuple_(sort_column, ProjectModel.id)
+            query = query.where(key < tuple_(*after) if descending else key > tuple_(*after))
+
+        if descending:
+            query = query.order_by(sort_column.desc(), ProjectModel.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), ProjectModel.id.asc())
+
+        result = await self.db.execute(query.limit(limit))
+        return result.scalars().all()
\ No newline at end of file
@@ -0,0 +1,145 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete
+from sqlalchemy.orm import defer
+from data.models import QueuedJobModel
+from data.repositories.base import BaseRepository
+
+
+class QueuedJobRepository(BaseRepository[QueuedJobModel]):
+    def __init__(self, db: AsyncSession):
+        """Initialize the queued job repository.
+        :param db: The async database session.
+        """
+        super().__init__(db, QueuedJobModel)
+
+    async def enqueue(self, kind: str, project_id: Optional[int], project_name: Optional[str], payload: str,
+                      max_attempts: int) -> QueuedJobModel:
+        """Queue a job to run as soon as a worker is free asynchronously (the caller commits)."""
+        job = QueuedJobModel(
+            kind=kind,
+            project_id=project_id,
+            project_name=project_name,
+            payload=payload,
+            status='queued',
+            attempts=0,
+            max_attempts=max_attempts,
+            run_after=datetime.now(),
+            progress=0
+        )
+        return await self.add(job)
+
+    async def get_job(self, job_id: int, with_output: bool = False) -> Optional[QueuedJobModel]:
+        """Get a job by id asynchronously; the output document is only loaded when asked for."""
+        query = select(QueuedJobModel).where(QueuedJobModel.id == job_id)
+        if not with_output:
+            query = query.options(defer(QueuedJobModel.output, raiseload=True))
+        result = await self.db.execute(query.execution_options(populate_existing=True))
+        return result.scalars().first()
+
+    async def claim_next(self, worker_id: str, now: datetime) -> Optional[QueuedJobModel]:
+        """Claim the oldest runnable job asynchronously (the caller commits).
+        Rows locked by other workers are skipped, so concurrent workers claim different jobs without
+        waiting; the UPDATE re-checks the status, which also makes the claim safe on SQLite.
+        :return: The claimed job, or None if no job is runnable.
+        """
+        # Matches the partial index ix_queued_jobs_claimable
+        candidate = await self.db.execute(
+            select(QueuedJobModel.id)
+            .where(QueuedJobModel.status == 'queued', QueuedJobModel.run_after <= now)
+            .order_by(QueuedJobModel.run_after, QueuedJobModel.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job_id = candidate.scalar_one_or_none()
+        if job_id is None:
+            return None
+        result = await self.db.execute(
+            update(QueuedJobModel)
+            .where(QueuedJobModel.id == job_id, QueuedJobModel.status == 'queued')
+            .values(status='running', locked_by=worker_id, heartbeat_at=now, attempts=QueuedJobModel.attempts + 1,
+                    started_at=now, error=None)
+            .returning(QueuedJobModel)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        return result.scalars().first()
+
+    async def heartbeat(self, job_id: int, worker_id: str, now: datetime) -> bool:
+        """Record that a worker is still running a job asynchronously (the caller commits).
+        :return: False if the job is no longer held by the worker (it was requeued as stale).
+        """
+        result = await self.db.execute(
+            update(QueuedJobModel)
+            .where(QueuedJobModel.id == job_id, QueuedJobModel.locked_by == worker_id,
+                   QueuedJobModel.status == 'running')
+            .values(heartbeat_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
+
+    async def set_progress(self, job_id: int, worker_id: str, progress: int) -> bool:
+        """Record the rows processed so far asynchronously, in the transaction of the processed chunk.
+        :return: False if the job is no longer held by the worker: the chunk must not be committed.
+        """
+        result = await self.db.execute(
+            update(QueuedJobModel)
+            .where(QueuedJobModel.id == job_id, QueuedJobModel.locked_by == worker_id,
+                   QueuedJobModel.status == 'running')
+            .values(progress=progress)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
+
+    async def finish(self, job_id: int, worker_id: str, status: str, now: datetime, result: Optional[str] = None,
+                     output: Optional[str] = None, error: Optional[str] = None) -> bool:
+        """Mark a job held by a worker as succeeded or failed asynchronously (the caller commits).
+        :return: False if the job is no longer held by the worker.
+        """
+        updated = await self.db.execute(
+            update(QueuedJobModel)
+            .where(QueuedJobModel.id == job_id, QueuedJobModel.locked_by == worker_id,
+                   QueuedJobModel.status == 'running')
+            .values(status=status, finished_at=now, heartbeat_at=now, result=result, output=output, error=error)
+            .execution_options(synchronize_session=False)
+        )
+        return updated.rowcount > 0
+
+    async def retry_later(self, job_id: int, worker_id: str, run_after: datetime, error: str) -> bool:
+        """Put a failed attempt of a job back into the queue asynchronously (the caller commits)."""
+        updated = await self.db.execute(
+            update(QueuedJobModel)
+            .where(QueuedJobModel.id == job_id, QueuedJobModel.locked_by == worker_id,
+                   QueuedJobModel.status == 'running')
+            .values(status='queued', run_after=run_after, locked_by=None, error=error)
+            .execution_options(synchronize_session=False)
+        )
+        return updated.rowcount > 0
+
+    async def requeue_stale(self, heartbeat_before: datetime, now: datetime) -> int:
+        """Release running jobs whose worker stopped sending heartbeats asynchronously (the caller commits).
+        Jobs with attempts left are queued again; the others fail.
+        :return: The number of released jobs.
+        """
+        stale = [QueuedJobModel.status == 'running', QueuedJobModel.heartbeat_at < heartbeat_before]
+        failed = await self.db.execute(
+            update(QueuedJobModel)
+            .where(*stale, QueuedJobModel.attempts >= QueuedJobModel.max_attempts)
+            .values(status='failed', finished_at=now, locked_by=None, error="Worker stopped sending heartbeats.")
+            .execution_options(synchronize_session=False)
+        )
+        requeued = await self.db.execute(
+            update(QueuedJobModel)
+            .where(*stale)
+            .values(status='queued', run_after=now, locked_by=None, error="Worker stopped sending heartbeats.")
+            .execution_options(synchronize_session=False)
+        )
+        return failed.rowcount + requeued.rowcount
+
+    async def purge_finished(self, finished_before: datetime) -> int:
+        """Delete succeeded and failed jobs that finished before a time asynchronously (the caller commits)."""
+        result = await self.db.execute(
+            delete(QueuedJobModel)
+            .where(QueuedJobModel.status.in_(('succeeded', 'failed')), QueuedJobModel.finished_at < finished_before)
+        )
+        return result.rowcount
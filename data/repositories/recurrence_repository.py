@@ -0,0 +1,74 @@
+from typing import Optional, List
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, or_
+from data.models import RecurrenceRuleModel
+from data.repositories.base import BaseRepository
+
+
+class RecurrenceRuleRepository(BaseRepository[RecurrenceRuleModel]):
+    def __init__(self, db: AsyncSession):
+        """Initialize the recurrence rule repository.
+        :param db: The async database session.
+        """
+        super().__init__(db, RecurrenceRuleModel)
+
+    async def create_rule(self, project_id: int, title: str, description: str, frequency: str, interval: int,
+                          weekdays: Optional[str], cron: Optional[str], start_at: datetime,
+                          until: Optional[datetime]) -> RecurrenceRuleModel:
+        """Create a new recurrence rule asynchronously (nothing is materialized yet)."""
+        rule = RecurrenceRuleModel(
+            project_id=project_id,
+            title=title,
+            description=description,
+            frequency=frequency,
+            interval=interval,
+            weekdays=weekdays,
+            cron=cron,
+            start_at=start_at,
+            until=until
+        )
+        return await self.add(rule)
+
+    async def get_rules_by_project(self, project_id: int) -> List[RecurrenceRuleModel]:
+        """Get the recurrence rules of a project asynchronously, oldest first."""
+        result = await self.db.execute(
+            select(RecurrenceRuleModel)
+            .where(RecurrenceRuleModel.project_id == project_id)
+            .order_by(RecurrenceRuleModel.id)
+        )
+        return result.scalars().all()
+
+    async def delete_rule(self, project_id: int, rule_id: int) -> bool:
+        """Delete a rule of a project asynchronously.
+        :return: True if the rule existed.
+        """
+        result = await self.db.execute(
+            delete(RecurrenceRuleModel)
+            .where(RecurrenceRuleModel.id == rule_id, RecurrenceRuleModel.project_id == project_id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
+
+    async def get_rules_to_materialize(self, horizon: datetime, now: datetime, after_id: int,
+                                       limit: int) -> List[RecurrenceRuleModel]:
+        """Lock one chunk of rules whose materialized occurrences end before the horizon (the caller commits).
+        Rows locked by a concurrent run are skipped, so two schedulers never materialize the same rule.
+        :param horizon: End of the rolling window.
+        :param now: Rules that ended before this time are skipped.
+        :param after_id: Keyset position: only rules with a larger id are returned.
+        :param limit: Maximum number of rules.
+        :return: The rules, by id.
+        """
+        result = await self.db.execute(
+            select(RecurrenceRuleModel)
+            .where(
+                RecurrenceRuleModel.id > after_id,
+                or_(RecurrenceRuleModel.materialized_until.is_(None), RecurrenceRuleModel.materialized_until < horizon),
+                or_(RecurrenceRuleModel.until.is_(None), RecurrenceRuleModel.until > now),
+            )
+            .order_by(RecurrenceRuleModel.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return result.scalars().all()
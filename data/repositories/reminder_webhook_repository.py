@@ -0,0 +1,43 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+from data.database import dialect_insert
+from data.models import ReminderWebhookModel
+from data.repositories.base import BaseRepository
+
+
+class ReminderWebhookRepository(BaseRepository[ReminderWebhookModel]):
+    def __init__(self, db: AsyncSession):
+        """Initialize the reminder webhook repository.
+        :param db: The async database session.
+        """
+        super().__init__(db, ReminderWebhookModel)
+
+    async def get_by_project(self, project_id: int) -> Optional[ReminderWebhookModel]:
+        """Get the reminder webhook of a project asynchronously."""
+        result = await self.db.execute(select(ReminderWebhookModel).where(ReminderWebhookModel.project_id == project_id))
+        return result.scalars().first()
+
+    async def set_webhook(self, project_id: int, url: str, minutes_before: int) -> ReminderWebhookModel:
+        """Create or replace the reminder webhook of a project with one INSERT ... ON CONFLICT asynchronously."""
+        stmt = dialect_insert(ReminderWebhookModel).values(project_id=project_id, url=url,
+                                                           minutes_before=minutes_before)
+        result = await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ReminderWebhookModel.project_id],
+                set_={'url': stmt.excluded.url, 'minutes_before': stmt.excluded.minutes_before,
+                      'updated_at': func.now()}
+            )
+            .returning(ReminderWebhookModel)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    async def delete_webhook(self, project_id: int) -> bool:
+        """Delete the reminder webhook of a project asynchronously.
+        :return: True if the project had a webhook.
+        """
+        result = await self.db.execute(
+            delete(ReminderWebhookModel).where(ReminderWebhookModel.project_id == project_id)
+        )
+        return result.rowcount > 0
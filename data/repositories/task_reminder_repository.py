@@ -0,0 +1,113 @@
+import calendar
+from typing import List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, exists, tuple_
+from data.database import dialect_insert
+from data.models import TaskModel, ProjectModel, ReminderWebhookModel, TaskReminderModel
+from data.repositories.base import BaseRepository
+from data.repositories.task_repository import TaskRepository
+
+# Columns of a claimed reminder, in the order of the rows returned by the claim methods
+REMINDER_COLUMNS = ('task_uuid', 'deadline', 'project_id', 'project_name', 'title', 'url', 'minutes_before',
+                    'attempts')
+
+
+class TaskReminderRepository(BaseRepository[TaskReminderModel]):
+    def __init__(self, db: AsyncSession):
+        """Initialize the task reminder repository.
+        :param db: The async database session.
+        """
+        super().__init__(db, TaskReminderModel)
+
+    async def claim_due_reminders(self, now: datetime, max_minutes_before: int, limit: int) -> List[Tuple]:
+        """Claim the reminders that are due and not claimed yet asynchronously (the caller commits).
+        Open tasks are found with a range scan of the open-deadline index over (now, now + max_minutes_before],
+        then filtered by the lead time of their project's webhook. The claims are inserted with
+        ON CONFLICT DO NOTHING, so concurrent runs claim disjoint sets.
+        :param now: Current time; tasks whose deadline passed get no reminder.
+        :param max_minutes_before: Largest lead time a webhook may have.
+        :param limit: Maximum number of reminders to claim.
+        :return: Rows in REMINDER_COLUMNS order.
+        """
+        epoch_now = calendar.timegm(now.timetuple())
+        candidates = await self.db.execute(
+            select(TaskModel.uuid, TaskModel.deadline, TaskModel.project_id, ProjectModel.name, TaskModel.title,
+                   ReminderWebhookModel.url, ReminderWebhookModel.minutes_before)
+            .join(ReminderWebhookModel, ReminderWebhookModel.project_id == TaskModel.project_id)
+            .join(ProjectModel, ProjectModel.id == TaskModel.project_id)
+            .where(
+                # Matches the predicate of the partial index ix_tasks_deadline_open
+                TaskModel.status != "done",
+                TaskModel.deadline > now,
+                TaskModel.deadline <= now + timedelta(minutes=max_minutes_before),
+                TaskRepository._epoch_seconds(TaskModel.deadline) - ReminderWebhookModel.minutes_before * 60
+                <= epoch_now,
+                ~exists().where(TaskReminderModel.task_uuid == TaskModel.uuid,
+                                TaskReminderModel.deadline == TaskModel.deadline),
+            )
+            .order_by(TaskModel.deadline)
+            .limit(limit)
+        )
+        rows = candidates.all()
+        if not rows:
+            return []
+        result = await self.db.execute(
+            dialect_insert(TaskReminderModel)
+            .values([
+                dict(zip(REMINDER_COLUMNS, row), status='claimed', attempts=0, claimed_at=now) for row in rows
+            ])
+            .on_conflict_do_nothing(index_elements=[TaskReminderModel.task_uuid, TaskReminderModel.deadline])
+            .returning(*[getattr(TaskReminderModel, name) for name in REMINDER_COLUMNS])
+        )
+        return result.all()
+
+    async def reclaim_stale_reminders(self, now: datetime, claimed_before: datetime, limit: int) -> List[Tuple]:
+        """Take over claims of dispatchers that stopped before recording a result asynchronously (the caller commits).
+        :param now: Current time; reminders whose deadline passed are left alone.
+        :param claimed_before: Claims older than this are considered abandoned.
+        :param limit: Maximum number of reminders to take over.
+        :return: Rows in REMINDER_COLUMNS order.
+        """
+        stale = (
+            select(TaskReminderModel.task_uuid, TaskReminderModel.deadline)
+            .where(TaskReminderModel.status == 'claimed', TaskReminderModel.claimed_at < claimed_before,
+                   TaskReminderModel.deadline > now)
+            .limit(limit)
+        )
+        result = await self.db.execute(
+            update(TaskReminderModel)
+            # Re-checked in the UPDATE, so a concurrent run cannot take over the same claim
+            .where(tuple_(TaskReminderModel.task_uuid, TaskReminderModel.deadline).in_(stale),
+                   TaskReminderModel.status == 'claimed', TaskReminderModel.claimed_at < claimed_before)
+            .values(claimed_at=now)
+            .returning(*[getattr(TaskReminderModel, name) for name in REMINDER_COLUMNS])
+            .execution_options(synchronize_session=False)
+        )
+        return result.all()
+
+    async def record_results(self, keys: Sequence[Tuple], status: str, attempts: int,
+                             finished_at: datetime, error: Optional[str] = None) -> None:
+        """Record the outcome of one delivered (or abandoned) batch of reminders asynchronously (the caller commits).
+        :param keys: (task_uuid, deadline) of the reminders.
+        :param status: sent or failed.
+        :param attempts: Number of delivery attempts made for the batch.
+        """
+        await self.db.execute(
+            update(TaskReminderModel)
+            .where(tuple_(TaskReminderModel.task_uuid, TaskReminderModel.deadline).in_(list(keys)))
+            .values(status=status, attempts=TaskReminderModel.attempts + attempts, last_error=error,
+                    sent_at=finished_at if status == 'sent' else None)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def purge_reminders(self, deadline_before: datetime) -> int:
+        """Delete the reminders of deadlines before a time asynchronously (the caller commits).
+        Once a deadline has passed its claim no longer prevents a duplicate reminder.
+        :return: The number of deleted reminders.
+        """
+        result = await self.db.execute(
+            delete(TaskReminderModel).where(TaskReminderModel.deadline < deadline_before)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
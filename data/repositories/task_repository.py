@@ -1,9 +1,12 @@
-from typing import Optional, List
+from typing import Optional, List, Sequence, Any, Tuple, AsyncIterator
+from uuid import UUID
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from data.models import TaskModel
+from sqlalchemy import select, tuple_, func, insert, delete, update, union_all, cast, literal, BigInteger
+from data.database import IS_SQLITE
+from data.models import TaskModel, ProjectModel, TaskArchiveModel
 from data.repositories.base import BaseRepository
+from data.repositories.project_repository import ProjectRepository
 from core.exceptions import TaskNotFoundError, ProjectNotFoundError
 
 
@@ -14,19 +17,218 @@ class TaskRepository(BaseRepository[TaskModel]):
         """
         super().__init__(db, TaskModel)
 
-    async def get_by_uuid(self, uuid: str) -> Optional[TaskModel]:
-        """Get task by UUID asynchronously."""
+    @staticmethod
+    def _columns(fields: Sequence[str], model=TaskModel) -> List[Any]:
+        """Build the column list for a sparse fieldset.
+        uuid and project_id are always selected since callers need them to scope results.
+        :param fields: The requested task field names.
+        :param model: TaskModel, or TaskArchiveModel to read archived tasks.
+        :return: The model columns to select.
+        """
+        names = ['uuid', 'project_id'] + [f for f in fields if f not in ('uuid', 'project_id')]
+        return [getattr(model, name) for name in names]
+
+    async def get_by_uuid(self, uuid: str, fields: Optional[Sequence[str]] = None,
+                          include_archived: bool = False) -> Optional[TaskModel]:
+        """Get task by UUID asynchronously.
+        When fields is given only those columns are loaded and a row is returned instead of a model.
+        With include_archived the tasks_archive table is searched when the task is not active.
+        """
+        models = (TaskModel, TaskArchiveModel) if include_archived else (TaskModel,)
         try:
-            result = await self.db.execute(select(TaskModel).where(TaskModel.uuid == uuid))
-            return result.scalars().first()
+            # Bind a UUID object: the portable Uuid type does not accept strings on backends without a native type
+            uuid = UUID(str(uuid))
+            for model in models:
+                if fields:
+                    result = await self.db.execute(select(*self._columns(fields, model)).where(model.uuid == uuid))
+                    task = result.first()
+                else:
+                    result = await self.db.execute(select(model).where(model.uuid == uuid))
+                    task = result.scalars().first()
+                if task is not None:
+                    return task
+            return None
         except Exception:
             # If the UUID is invalid (malformed), return None as if not found
             return None
 
-    async def get_tasks_by_project(self, project_id: int) -> List[TaskModel]:
-        """Get all tasks for a project asynchronously."""
-        result = await self.db.execute(select(TaskModel).where(TaskModel.project_id == project_id))
-        return result.scalars().all()
+    async def get_tasks_by_project(self, project_id: int, fields: Optional[Sequence[str]] = None,
+                                   include_archived: bool = False) -> List[TaskModel]:
+        """Get all tasks for a project asynchronously, ordered by (created_at, uuid).
+        When fields is given only those columns are loaded and rows are returned instead of models.
+        With include_archived the project's archived tasks follow the active ones, in the same order.
+        """
+        if fields:
+            if not include_archived:
+                result = await self.db.execute(
+                    select(*self._columns(fields)).where(TaskModel.project_id == project_id)
+                    .order_by(TaskModel.created_at, TaskModel.uuid)
+                )
+                return result.all()
+            # The sort columns are only selected by the union, so that the rows keep the requested fields
+            parts = [
+                select(*self._columns(fields, model), literal(archived).label('sort_archived'),
+                       model.created_at.label('sort_created_at'))
+                .where(model.project_id == project_id)
+                for archived, model in enumerate((TaskModel, TaskArchiveModel))
+            ]
+            tasks = union_all(*parts).subquery()
+            result = await self.db.execute(
+                select(*[tasks.c[column.key] for column in self._columns(fields)])
+                .order_by(tasks.c.sort_archived, tasks.c.sort_created_at, tasks.c.uuid)
+            )
+            return result.all()
+        result = await self.db.execute(
+            select(TaskModel).where(TaskModel.project_id == project_id).order_by(TaskModel.created_at, TaskModel.uuid)
+        )
+        tasks = list(result.scalars().all())
+        if include_archived:
+            result = await self.db.execute(
+                select(TaskArchiveModel).where(TaskArchiveModel.project_id == project_id)
+                .order_by(TaskArchiveModel.created_at, TaskArchiveModel.uuid)
+            )
+            tasks.extend(result.scalars().all())
+        return tasks
+
+    async def get_task_rows_by_uuids(self, project_name: str, uuids: Sequence[UUID],
+                                     fields: Sequence[str]) -> List[Any]:
+        """Get the tasks of a project with the given UUIDs in one query asynchronously.
+        The project is matched by name in the same query, so no separate project lookup is needed.
+        :param project_name: Name of the project the tasks must belong to.
+        :param uuids: UUIDs of the tasks.
+        :param fields: Task columns to select, in order.
+        :return: Rows of the tasks that exist in the project, in no particular order.
+        """
+        result = await self.db.execute(
+            select(*[getattr(TaskModel, name) for name in fields])
+            .join(ProjectModel, TaskModel.project_id == ProjectModel.id)
+            .where(ProjectModel.name == project_name, TaskModel.uuid.in_(uuids))
+        )
+        return result.all()
+
+    async def get_task_rows_for_projects(self, project_ids: Sequence[int], fields: Sequence[str],
+                                         per_project_limit: Optional[int] = None,
+                                         statuses: Optional[Sequence[str]] = None) -> List[Any]:
+        """Get the tasks of several projects in one query asynchronously.
+        :param project_ids: IDs of the projects.
+        :param fields: Task columns to select, in order (uuid and project_id must come first).
+        :param per_project_limit: Maximum number of tasks per project (oldest first), or None for all.
+        :param statuses: Only include tasks with these statuses, or None for all.
+        :return: Rows ordered by project, then creation time.
+        """
+        if not project_ids:
+            return []
+        columns = [getattr(TaskModel, name) for name in fields]
+        conditions = [TaskModel.project_id.in_(project_ids)]
+        if statuses:
+            conditions.append(TaskModel.status.in_(statuses))
+
+        if per_project_limit is None:
+            query = select(*columns).where(*conditions).order_by(
+                TaskModel.project_id, TaskModel.created_at, TaskModel.uuid
+            )
+        else:
+            row_number = func.row_number().over(
+                partition_by=TaskModel.project_id, order_by=(TaskModel.created_at, TaskModel.uuid)
+            ).label("row_number")
+            ranked = select(*columns, row_number).where(*conditions).subquery()
+            query = (
+                select(*[ranked.c[name] for name in fields])
+                .where(ranked.c.row_number <= per_project_limit)
+                .order_by(ranked.c.project_id, ranked.c.row_number)
+            )
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def get_tasks_due(self, start: Optional[datetime], end: Optional[datetime],
+                            statuses: Optional[Sequence[str]], limit: int,
+                            after: Optional[Tuple[datetime, Any]] = None) -> List[Tuple[TaskModel, str]]:
+        """Get tasks across all projects whose deadline falls in [start, end) asynchronously.
+        :param start: Inclusive lower deadline bound, or None for no bound.
+        :param end: Exclusive upper deadline bound, or None for no bound.
+        :param statuses: Statuses to include, or None for every status except done.
+        :param limit: Maximum number of tasks to return.
+        :param after: (deadline, uuid) of the last task of the previous page.
+        :return: (task, project name) pairs ordered by (deadline, uuid).
+        """
+        query = (
+            select(TaskModel, ProjectModel.name)
+            .join(ProjectModel, TaskModel.project_id == ProjectModel.id)
+            .where(TaskModel.deadline.is_not(None))
+        )
+        if statuses is None or "done" not in statuses:
+            # Matches the predicate of the partial index ix_tasks_deadline_open
+            query = query.where(TaskModel.status != "done")
+        if statuses is not None:
+            query = query.where(TaskModel.status.in_(statuses))
+        if start is not None:
+            query = query.where(TaskModel.deadline >= start)
+        if end is not None:
+            query = query.where(TaskModel.deadline < end)
+        if after is not None:
+            query = query.where(tuple_(TaskModel.deadline, TaskModel.uuid) > tuple_(*after))
+        query = query.order_by(TaskModel.deadline, TaskModel.uuid).limit(limit)
+        result = await self.db.execute(query)
+        return result.all()
+
+    @staticmethod
+    def _epoch_seconds(column) -> Any:
+        """Seconds since 1970-01-01 of a naive timestamp column, computed by the database."""
+        if IS_SQLITE:
+            return cast(func.strftime('%s', column), BigInteger)
+        return cast(func.extract('epoch', column), BigInteger)
+
+    async def stream_analytics_columns(self, project_ids: Sequence[int],
+                                       partition_size: int) -> AsyncIterator[Sequence[Any]]:
+        """Stream (project_id, status, deadline, created_at, updated_at) of active and archived tasks.
+        Timestamps are returned as integer epoch seconds, which are far cheaper to convert into
+        arrays than datetime objects. Rows are fetched in partitions through a server-side cursor,
+        so the full result is never buffered as row objects.
+        :param project_ids: The projects whose tasks are read.
+        :param partition_size: Rows per partition.
+        :return: An async iterator over partitions of rows.
+        """
+        query = union_all(*[
+            select(model.project_id, model.status, self._epoch_seconds(model.deadline),
+                   self._epoch_seconds(model.created_at), self._epoch_seconds(model.updated_at))
+            .where(model.project_id.in_(project_ids))
+            for model in (TaskModel, TaskArchiveModel)
+        ])
+        result = await self.db.stream(query.execution_options(yield_per=partition_size))
+        async for partition in result.partitions():
+            yield partition
+
+    async def archive_done_tasks(self, older_than: datetime, limit: int) -> int:
+        """Move one chunk of done tasks into tasks_archive asynchronously (the caller commits).
+        Rows locked by concurrent transactions are skipped and picked up by a later chunk.
+        :param older_than: Only tasks last updated before this time are archived.
+        :param limit: Maximum number of tasks to move.
+        :return: The number of archived tasks.
+        """
+        # Matches the predicate of the partial index ix_tasks_done_updated_at
+        chunk = await self.db.execute(
+            select(TaskModel.uuid, TaskModel.project_id)
+            .where(TaskModel.status == "done", TaskModel.updated_at < older_than)
+            .order_by(TaskModel.updated_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = chunk.all()
+        if not rows:
+            return 0
+        uuids = [uuid for uuid, _ in rows]
+        names = ['uuid', 'project_id', 'title', 'description', 'status', 'deadline', 'created_at', 'updated_at',
+                 'version']
+        await self.db.execute(
+            insert(TaskArchiveModel).from_select(
+                names, select(*[getattr(TaskModel, name) for name in names]).where(TaskModel.uuid.in_(uuids))
+            )
+        )
+        await self.db.execute(
+            delete(TaskModel).where(TaskModel.uuid.in_(uuids)).execution_options(synchronize_session=False)
+        )
+        await ProjectRepository(self.db).bump_versions([project_id for _, project_id in rows])
+        return len(uuids)
 
     async def create_task(self, project_id: int, title: str, description: str = "",
                    status: str = "todo", deadline: Optional[datetime] = None) -> TaskModel:
@@ -40,18 +242,84 @@ class TaskRepository(BaseRepository[TaskModel]):
         )
         return await self.add(task)
 
-    async def update_task(self, uuid: str, title: str, description: str,
-                   status: str, deadline: Optional[datetime]) -> TaskModel:
-        """Update task details asynchronously."""
-        task = await self.get_by_uuid(uuid)
-        if not task:
-            raise TaskNotFoundError(f"Task with uuid '{uuid}' not found.")
+    async def create_tasks_bulk(self, rows: Sequence[dict]) -> None:
+        """Insert many tasks with one executemany INSERT asynchronously (the caller commits).
+        :param rows: Column values of the tasks; every row must have the same keys.
+        """
+        if rows:
+            await self.db.execute(insert(TaskModel), list(rows))
 
-        setattr(task, 'title', title)
-        setattr(task, 'description', description)
-        setattr(task, 'status', status)
-        setattr(task, 'deadline', deadline)
-        return await self.update(task)
+    async def delete_project_tasks_chunk(self, project_id: int, limit: int) -> int:
+        """Delete up to limit tasks of a project, active ones first, then archived ones, asynchronously.
+        The caller commits, so a large project is deleted in short transactions.
+        :return: The number of deleted tasks; 0 when the project has no tasks left.
+        """
+        for model in (TaskModel, TaskArchiveModel):
+            chunk = select(model.uuid).where(model.project_id == project_id).limit(limit)
+            result = await self.db.execute(
+                delete(model).where(model.uuid.in_(chunk)).execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                return result.rowcount
+        return 0
+
+    async def update_project_tasks_chunk(self, project_id: int, statuses: Optional[Sequence[str]], changes: dict,
+                                         after_uuid: Optional[UUID], limit: int) -> List[UUID]:
+        """Apply the same changes to the next chunk of a project's tasks in uuid order asynchronously.
+        The caller commits; the version of every changed task is incremented.
+        :param statuses: Only tasks with one of these statuses (None for all tasks).
+        :param after_uuid: Keyset position: only tasks with a larger uuid (None to start).
+        :return: The uuids of the changed tasks, in order; empty when no task is left.
+        """
+        query = select(TaskModel.uuid).where(TaskModel.project_id == project_id)
+        if statuses is not None:
+            query = query.where(TaskModel.status.in_(statuses))
+        if after_uuid is not None:
+            query = query.where(TaskModel.uuid > after_uuid)
+        result = await self.db.execute(query.order_by(TaskModel.uuid).limit(limit))
+        uuids = list(result.scalars().all())
+        if uuids:
+            await self.db.execute(
+                update(TaskModel)
+                .where(TaskModel.uuid.in_(uuids))
+                .values(**changes, version=TaskModel.version + 1, updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        return uuids
+
+    async def update_task_fields(self, project_name: str, uuid: str, changes: dict,
+                                 expected_version: Optional[int] = None) -> Optional[TaskModel]:
+        """Apply a partial update to a task in one conditional UPDATE ... RETURNING asynchronously.
+        Only the changed columns are written, and the version is incremented.
+        :param project_name: Name of the project the task must belong to.
+        :param uuid: UUID of the task.
+        :param changes: New values by column name.
+        :param expected_version: Only update when the task still has this version (None: any version).
+        :return: The updated task, or None when no task matched (missing, or another version).
+        """
+        conditions = [
+            TaskModel.uuid == UUID(str(uuid)),
+            TaskModel.project_id == select(ProjectModel.id).where(ProjectModel.name == project_name).scalar_subquery(),
+        ]
+        if expected_version is not None:
+            conditions.append(TaskModel.version == expected_version)
+        result = await self.db.execute(
+            update(TaskModel)
+            .where(*conditions)
+            .values(**changes, version=TaskModel.version + 1, updated_at=func.now())
+            .returning(TaskModel)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        return result.scalars().first()
+
+    async def get_task_version(self, project_name: str, uuid: str) -> Optional[int]:
+        """Get the current version of a task of a project asynchronously, or None if there is no such task."""
+        result = await self.db.execute(
+            select(TaskModel.version)
+            .join(ProjectModel, TaskModel.project_id == ProjectModel.id)
+            .where(ProjectModel.name == project_name, TaskModel.uuid == UUID(str(uuid)))
+        )
+        return result.scalar_one_or_none()
 
     async def delete_task(self, uuid: str) -> None:
         """Delete task by UUID asynchronously."""
@@ -0,0 +1,125 @@
+"""
+Shard map: which database holds a project.
+
+Sharding is enabled by pointing SHARD_MAP_PATH at a JSON file:
+
+    {
+        "shards": {"a": "postgresql+asyncpg://...", "b": "postgresql+asyncpg://..."},
+        "projects": {"big-customer": "b"},
+        "moving": ["other-project"]
+    }
+
+Every shard is a complete database with the full schema. A project lives on the shard pinned
+for it in "projects", or else on the shard chosen by rendezvous hashing of its name: adding a
+shard only moves the projects that hash to the new shard, about 1/N of them. Projects listed in
+"moving" are being copied by tools/move_project_shard.py and cannot be used until the move is
+done.
+
+The file is re-read when it changes, checked at most every SHARD_MAP_RELOAD_SECONDS, so a move
+takes effect in every running process without a restart.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional
+
+from core.exceptions import ProjectMovingError
+from data.env_loader import SHARD_MAP_RELOAD_SECONDS
+
+
+def _weight(shard: str, project_name: str) -> int:
+    digest = hashlib.blake2b(f"{shard}\x00{project_name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class ShardMap:
+    """Shard URLs, pinned projects and projects being moved, read from a JSON file."""
+
+    def __init__(self, shards: Dict[str, str], projects: Optional[Dict[str, str]] = None,
+                 moving: Iterable[str] = (), path: Optional[str] = None):
+        """
+        :param shards: Database URL by shard name
+        :param projects: Shard by project name, for projects that do not live on their hashed shard
+        :param moving: Names of projects that are being moved
+        :param path: File the map was read from, re-read when it changes
+        """
+        if not shards:
+            raise ValueError("A shard map needs at least one shard.")
+        projects = dict(projects or {})
+        unknown = sorted(set(projects.values()) - set(shards))
+        if unknown:
+            raise ValueError(f"Projects are pinned to unknown shard(s): {', '.join(unknown)}.")
+        self.shards = dict(shards)
+        self.projects = projects
+        self.moving = set(moving)
+        self.path = path
+        self._mtime = os.stat(path).st_mtime_ns if path else None
+        self._checked_at = time.monotonic()
+
+    @classmethod
+    def load(cls, path: str) -> 'ShardMap':
+        """Read a shard map from a JSON file."""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('shards', {}), data.get('projects', {}), data.get('moving', []), path)
+
+    def save(self) -> None:
+        """Write the map back to its file atomically, so readers never see a partial file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.shard-map-', suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'shards': self.shards, 'projects': self.projects, 'moving': sorted(self.moving)}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def refresh(self, force: bool = False) -> None:
+        """Re-read the file if it changed; checked at most every SHARD_MAP_RELOAD_SECONDS unless forced."""
+        if self.path is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._checked_at < SHARD_MAP_RELOAD_SECONDS:
+            return
+        self._checked_at = now
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+        loaded = ShardMap.load(self.path)
+        self.shards, self.projects, self.moving, self._mtime = loaded.shards, loaded.projects, loaded.moving, mtime
+
+    def shard_names(self) -> List[str]:
+        """Names of all shards, sorted."""
+        self.refresh()
+        return sorted(self.shards)
+
+    def hashed_shard(self, project_name: str) -> str:
+        """The shard a project lives on unless it is pinned elsewhere."""
+        return max(sorted(self.shards), key=lambda shard: _weight(shard, project_name))
+
+    def placement(self, project_name: str) -> str:
+        """The shard that holds a project, including a project that is being moved (its source)."""
+        self.refresh()
+        return self.projects.get(project_name) or self.hashed_shard(project_name)
+
+    def shard_for(self, project_name: str) -> str:
+        """
+        The shard requests for a project are routed to.
+
+        :raises ProjectMovingError: If the project is being moved to another shard
+        """
+        shard = self.placement(project_name)
+        if project_name in self.moving:
+            raise ProjectMovingError(f"Project '{project_name}' is being moved to another shard; retry shortly.")
+        return shard
+
+    def pin(self, project_name: str, shard: str) -> None:
+        """Place a project on a shard; the pin is dropped when the shard is the hashed one."""
+        if shard not in self.shards:
+            raise ValueError(f"Unknown shard '{shard}'.")
+        if shard == self.hashed_shard(project_name):
+            self.projects.pop(project_name, None)
+        else:
+            self.projects[project_name] = shard
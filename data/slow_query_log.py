@@ -0,0 +1,141 @@
+"""
+Opt-in slow-query recorder for the SQLAlchemy engines.
+
+Statements slower than a threshold are kept in a bounded ring buffer together with their redacted
+parameters, duration and the route that issued them. Optionally the plan of slow SELECTs is captured
+in the background with EXPLAIN (ANALYZE, BUFFERS) on a separate connection. ANALYZE executes the
+statement, so locking reads (FOR UPDATE/SHARE) and WITH statements, which may modify data, only get a
+plain EXPLAIN.
+"""
+import asyncio
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from data.env_loader import SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_EXPLAIN
+
+# ASGI scope of the request being served, set by RequestContextMiddleware
+current_request_scope: ContextVar[Optional[dict]] = ContextVar('current_request_scope', default=None)
+
+MAX_PENDING_EXPLAINS = 2
+
+# Statements that EXPLAIN ANALYZE must not run: row locks and (possibly data-modifying) CTEs
+_NOT_ANALYZED = re.compile(r"^\s*WITH\b|\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """
+    Replace parameter values by their type names so that no user data is kept.
+    :param parameters: Driver-level parameters (sequence, mapping, or list of them for executemany).
+    :return: The redacted parameters.
+    """
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return {"executemany": len(parameters), "first": redact_parameters(parameters[0])}
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return None
+
+
+def _current_route() -> Optional[str]:
+    scope = current_request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope.get('method')} {getattr(route, 'path', None) or scope.get('path')}"
+
+
+class SlowQueryRecorder:
+    """Records slow statements of one or more engines into a ring buffer."""
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, max_entries: int = SLOW_QUERY_LOG_SIZE,
+                 capture_explain: bool = SLOW_QUERY_EXPLAIN):
+        self.threshold = threshold_ms / 1000
+        self.capture_explain = capture_explain
+        self.entries: deque = deque(maxlen=max_entries)
+        # Installed engines by their sync engine, on which the plans of their statements are captured
+        self.engines: Dict[Engine, AsyncEngine] = {}
+        self._pending_explains = 0
+
+    def install(self, engine: AsyncEngine) -> None:
+        """Attach the recorder to an engine; installing it twice on the same engine is a no-op."""
+        if engine.sync_engine in self.engines:
+            return
+        self.engines[engine.sync_engine] = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", self._handle_error)
+
+    def get_entries(self) -> List[dict]:
+        """Return the recorded statements, slowest first."""
+        return sorted(self.entries, key=lambda entry: entry["duration_ms"], reverse=True)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append((context, time.perf_counter()))
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        _, started = conn.info["query_start_time"].pop()
+        elapsed = time.perf_counter() - started
+        if elapsed < self.threshold or statement.lstrip().upper().startswith("EXPLAIN"):
+            return
+
+        entry = {
+            "statement": statement,
+            "parameters": redact_parameters(parameters),
+            "duration_ms": round(elapsed * 1000, 3),
+            "route": _current_route(),
+            "recorded_at": datetime.now(),
+            "explain": None,
+        }
+        self.entries.append(entry)
+
+        if (self.capture_explain and not executemany and self._pending_explains < MAX_PENDING_EXPLAINS
+                and statement.lstrip().upper().startswith(("SELECT", "WITH"))):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._pending_explains += 1
+            loop.create_task(self._explain(self.engines[conn.engine], entry, statement, parameters,
+                                           conn.dialect.name))
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute: drop its start time so that later
+        # statements are not paired with it (errors while fetching come after the pop and match nothing)
+        conn = exception_context.connection
+        starts = conn.info.get("query_start_time") if conn is not None else None
+        if starts and starts[-1][0] is exception_context.execution_context:
+            starts.pop()
+
+    async def _explain(self, engine: AsyncEngine, entry: dict, statement: str, parameters: Any,
+                       dialect: str) -> None:
+        """Capture the plan of a slow statement on another connection of its engine; the transaction is rolled back."""
+        if dialect != "postgresql":
+            prefix = "EXPLAIN QUERY PLAN "
+        elif _NOT_ANALYZED.search(statement):
+            prefix = "EXPLAIN "
+        else:
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(prefix + statement, parameters)
+                entry["explain"] = "\n".join(" ".join(str(col) for col in row) for row in result.all())
+                await conn.rollback()
+        except Exception as e:
+            entry["explain"] = f"EXPLAIN failed: {e}"
+        finally:
+            self._pending_explains -= 1
+
+
+slow_query_recorder = SlowQueryRecorder()
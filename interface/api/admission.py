@@ -0,0 +1,200 @@
+"""
+Admission control and load shedding in front of the database connection pool.
+
+Requests are split into a read class (GET/HEAD/OPTIONS) and a write class (everything else). Each class
+has its own concurrency limit and a bounded wait queue; when the queue is full, or a request waits
+longer than the queue timeout, it is rejected right away with 503 and Retry-After instead of piling up
+on the pool. An optional per-client token bucket rejects clients above their rate with 429.
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from data.env_loader import (
+    ADMISSION_READ_CONCURRENCY,
+    ADMISSION_WRITE_CONCURRENCY,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ADMISSION_RETRY_AFTER_SECONDS,
+    RATE_LIMIT_PER_SECOND,
+    RATE_LIMIT_BURST,
+)
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Debug endpoints stay reachable when the API is saturated, so the metrics can still be read
+EXEMPT_PATH_PREFIXES = ("/api/v1/debug/",)
+MAX_TRACKED_CLIENTS = 10000
+
+
+class RouteClassLimiter:
+    """Concurrency limit with a bounded wait queue for one route class."""
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.total_wait_seconds = 0.0
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a slot.
+
+        :return: True when admitted, False when the request must be shed
+        """
+        if not self._semaphore.locked():
+            # A slot is free: take it without queueing
+            await self._semaphore.acquire()
+        else:
+            if self.waiting >= self.queue_size:
+                self.rejected_queue_full += 1
+                return False
+
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                return False
+            finally:
+                self.waiting -= 1
+                self.total_wait_seconds += time.monotonic() - started
+
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_wait_ms": round(1000 * self.total_wait_seconds / max(self.admitted + self.rejected_timeout, 1), 3),
+        }
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets; the least recently seen clients are forgotten first."""
+
+    def __init__(self, rate: float, burst: int, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self.rejected = 0
+
+    def allow(self, client: str) -> bool:
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [float(self.burst), now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] < 1:
+            self.rejected += 1
+            return False
+        bucket[0] -= 1
+        return True
+
+    def stats(self) -> dict:
+        return {"rate_per_second": self.rate, "burst": self.burst, "tracked_clients": len(self._buckets),
+                "rejected": self.rejected}
+
+
+class AdmissionController:
+    """Holds the per-route-class limiters and the optional per-client rate limiter."""
+
+    def __init__(self, read_concurrency: int = ADMISSION_READ_CONCURRENCY,
+                 write_concurrency: int = ADMISSION_WRITE_CONCURRENCY,
+                 queue_size: int = ADMISSION_QUEUE_SIZE,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS,
+                 retry_after: int = ADMISSION_RETRY_AFTER_SECONDS,
+                 rate_per_second: float = RATE_LIMIT_PER_SECOND,
+                 burst: int = RATE_LIMIT_BURST):
+        self.limiters: Dict[str, RouteClassLimiter] = {
+            "read": RouteClassLimiter("read", read_concurrency, queue_size, queue_timeout),
+            "write": RouteClassLimiter("write", write_concurrency, queue_size, queue_timeout),
+        }
+        self.retry_after = retry_after
+        self.rate_limiter: Optional[TokenBucketLimiter] = (
+            TokenBucketLimiter(rate_per_second, burst) if rate_per_second > 0 else None
+        )
+
+    def limiter_for(self, method: str) -> RouteClassLimiter:
+        return self.limiters["read" if method in READ_METHODS else "write"]
+
+    def stats(self) -> dict:
+        return {
+            "route_classes": {name: limiter.stats() for name, limiter in self.limiters.items()},
+            "rate_limit": self.rate_limiter.stats() if self.rate_limiter else None,
+        }
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware applying an AdmissionController to HTTP requests."""
+
+    def __init__(self, app, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def _reject(self, send, status_code: int, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.controller.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        rate_limiter = self.controller.rate_limiter
+        if rate_limiter is not None:
+            client = scope.get("client")
+            if not rate_limiter.allow(client[0] if client else "unknown"):
+                await self._reject(send, 429, "Rate limit exceeded.")
+                return
+
+        limiter = self.controller.limiter_for(scope["method"])
+        if not await limiter.acquire():
+            await self._reject(send, 503, "Server is overloaded, retry later.")
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
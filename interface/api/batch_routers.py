@@ -0,0 +1,144 @@
+"""
+POST /batch: several API operations in one request, one session and one transaction.
+
+Every operation is dispatched in-process to the route of the API router that serves it on its own,
+with the same validation, status codes and bodies. The operations share one session
+(data.database.batch_session) on a connection whose transaction is committed once, after the last
+operation: commits made by the services only release a savepoint. Each operation also runs in a
+savepoint of its own, so a failed operation (status 400 or above) leaves no partial writes behind.
+An atomic batch stops at the first failure and rolls everything back; otherwise the remaining
+operations run and the successful ones are committed.
+
+Operations see the writes of the operations before them, so the response cache is bypassed inside a
+batch. Batches are not available with a shard map, since their operations could span databases.
+"""
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Request, status
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from data.database import AsyncSessionLocal, IS_SQLITE, SHARDING_ENABLED, batch_session, engine
+from interface.api.routers import router as api_router
+from interface.api.controller_schemas.requests.batch_request_schema import BatchRequest, BatchOperation
+from interface.api.controller_schemas.responses.batch_response_schema import BatchResponse, BatchOperationResult
+
+batch_router = APIRouter()
+
+# Response headers that describe the encoding of the body rather than the result
+_SKIPPED_HEADERS = ("content-length", "content-type")
+# Request headers of the batch passed on to every operation, so that URLs built by routes name the same host
+_INHERITED_HEADERS = (b"host", b"forwarded")
+
+
+def _result(status_code: int, headers: dict, body: bytes) -> BatchOperationResult:
+    if not body:
+        content = None
+    elif headers.get("content-type", "").startswith("application/json"):
+        content = json.loads(body)
+    else:
+        content = body.decode()
+    return BatchOperationResult(
+        status=status_code,
+        headers={name: value for name, value in headers.items() if name not in _SKIPPED_HEADERS},
+        body=content
+    )
+
+
+async def _dispatch(request: Request, operation: BatchOperation) -> BatchOperationResult:
+    """Run one operation through the API router in-process and capture its response."""
+    path, _, query = operation.path.partition("?")
+    body = b"" if operation.body is None else json.dumps(operation.body).encode()
+    headers = [(name, value) for name, value in request.scope["headers"]
+               if name in _INHERITED_HEADERS or name.startswith(b"x-forwarded-")]
+    headers += [(name.encode("latin-1"), value.encode("latin-1")) for name, value in operation.headers.items()]
+    headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    # The scope of the batch request keeps the app, its router (for url_for) and its exception handlers
+    scope = {**request.scope, "method": operation.method, "path": path, "raw_path": path.encode(),
+             "query_string": query.encode(), "headers": headers}
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Never report a disconnect, so streamed responses run to the end
+        await asyncio.Event().wait()
+
+    response_status = status.HTTP_500_INTERNAL_SERVER_ERROR
+    response_headers = {}
+    chunks = []
+
+    async def send(message):
+        nonlocal response_status, response_headers
+        if message["type"] == "http.response.start":
+            response_status = message["status"]
+            response_headers = {name.decode("latin-1"): value.decode("latin-1")
+                                for name, value in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await api_router(scope, receive, send)
+    except StarletteHTTPException as e:
+        # Raised by the router itself (no such path or method); route errors are answered by their handlers
+        return BatchOperationResult(status=e.status_code, headers=dict(e.headers or {}), body={"detail": e.detail})
+    return _result(response_status, response_headers, b"".join(chunks))
+
+
+@batch_router.post("/batch", response_model=BatchResponse)
+async def run_batch(batch: BatchRequest, request: Request):
+    """
+    Run several operations in one transaction.
+
+    Args:
+        batch (BatchRequest): The operations, in order, and whether the batch is atomic.
+        request (Request): The batch request, whose scope the operations inherit.
+
+    Returns:
+        BatchResponse: Whether the batch was committed, and the status, headers and body of every
+        operation. Operations after a failure in an atomic batch are reported with status 424.
+
+    Raises:
+        HTTPException: 501 when sharding is enabled.
+    """
+    if SHARDING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                            detail="Batches are not available when projects are sharded.")
+    results = []
+    failed = False
+    async with engine.connect() as conn:
+        await conn.begin()
+        if IS_SQLITE:
+            # The sqlite3 driver does not begin a transaction before a SAVEPOINT, whose release would then commit
+            await conn.exec_driver_sql("BEGIN")
+        db = AsyncSessionLocal(bind=conn, join_transaction_mode="create_savepoint")
+        token = batch_session.set(db)
+        try:
+            for operation in batch.operations:
+                savepoint = await conn.begin_nested()
+                result = await _dispatch(request, operation)
+                results.append(result)
+                # The session's own savepoint, if one is open, is nested in the operation's
+                if result.status >= status.HTTP_400_BAD_REQUEST:
+                    failed = True
+                    await db.rollback()
+                    await savepoint.rollback()
+                    if batch.atomic:
+                        break
+                else:
+                    await db.commit()
+                    await savepoint.commit()
+        finally:
+            batch_session.reset(token)
+            await db.close()
+        committed = not (failed and batch.atomic)
+        if committed:
+            await conn.commit()
+        else:
+            await conn.rollback()
+    skipped = BatchOperationResult(status=status.HTTP_424_FAILED_DEPENDENCY,
+                                   body={"detail": "Not run: an earlier operation of the atomic batch failed."})
+    results += [skipped] * (len(batch.operations) - len(results))
+    return BatchResponse(committed=committed, results=results)
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Literal, Optional
+from data.env_loader import BATCH_MAX_OPERATIONS
+
+# Headers an operation may carry; Idempotency-Key is not among them since a batch can be rolled back
+BATCH_OPERATION_HEADERS = ("if-match",)
+
+class BatchOperation(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str = Field(description="Path below /api/v1 with an optional query string, e.g. /projects/demo/tasks/")
+    body: Optional[Any] = None
+    headers: Dict[str, str] = Field(default_factory=dict)
+
+    @field_validator('path')
+    @classmethod
+    def validate_path(cls, v: str) -> str:
+        if not v.startswith(('/projects', '/tasks/')):
+            raise ValueError("Only /projects and /tasks/ endpoints can be used in a batch.")
+        return v
+
+    @field_validator('headers')
+    @classmethod
+    def validate_headers(cls, v: Dict[str, str]) -> Dict[str, str]:
+        unsupported = sorted(name for name in v if name.lower() not in BATCH_OPERATION_HEADERS)
+        if unsupported:
+            raise ValueError(f"Unsupported operation header(s): {', '.join(unsupported)}.")
+        return {name.lower(): value for name, value in v.items()}
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(min_length=1, max_length=BATCH_MAX_OPERATIONS)
+    atomic: bool = Field(True, description="Roll back every operation when one fails (status 400 or above).")
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+from datetime import datetime
+from data.env_loader import JOB_QUEUE_IMPORT_MAX_TASKS
+from interface.api.controller_schemas.requests.task_request_schema import TaskCreateRequest
+
+class TaskImportRequest(BaseModel):
+    tasks: List[TaskCreateRequest] = Field(min_length=1, max_length=JOB_QUEUE_IMPORT_MAX_TASKS)
+
+class TaskBulkUpdateRequest(BaseModel):
+    statuses: Optional[List[str]] = Field(None, description="Only change tasks with these statuses (default: all).")
+    # Only the fields present in the request are changed; "deadline": null removes the deadlines
+    status: Optional[str] = None
+    deadline: Optional[Union[datetime, str]] = None
+
+    def changes(self) -> dict:
+        return {field: getattr(self, field) for field in ('status', 'deadline') if field in self.model_fields_set}
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+class RecurrenceRuleCreateRequest(BaseModel):
+    title: str
+    description: Optional[str] = None
+    frequency: str = Field(description="daily, weekly or cron.")
+    interval: int = Field(1, ge=1, description="Every interval days (daily) or weeks (weekly).")
+    weekdays: Optional[List[str]] = Field(None, description="Weekdays of a weekly rule (mon..sun); default: the weekday of start_at.")
+    cron: Optional[str] = Field(None, description="Five-field cron expression of a cron rule, e.g. '0 9 * * 1-5'.")
+    start_at: Optional[datetime] = Field(None, description="First possible occurrence (default: now).")
+    until: Optional[datetime] = Field(None, description="Last possible occurrence (default: no end).")
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field, AnyHttpUrl
+from data.env_loader import REMINDER_MAX_MINUTES_BEFORE
+
+class ReminderWebhookRequest(BaseModel):
+    url: AnyHttpUrl = Field(description="URL the reminders are POSTed to, in batches.")
+    minutes_before: int = Field(ge=1, le=REMINDER_MAX_MINUTES_BEFORE,
+                                description="Minutes before the deadline of an open task its reminder is sent.")
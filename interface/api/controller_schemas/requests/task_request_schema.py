@@ -1,6 +1,8 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional, Union
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional, Union
 from datetime import datetime
+from uuid import UUID
+from data.env_loader import TASK_BATCH_GET_MAX
 from core.validators.task_validators import (
     validate_task_title, 
     validate_task_description, 
@@ -73,3 +75,7 @@ class TaskUpdateRequest(BaseModel):
         if v is not None:
              validate_task_deadline(v)
         return v
+
+class TaskBatchGetRequest(BaseModel):
+    # Parsed as UUIDs, so malformed values are rejected with 422 before any query runs
+    uuids: List[UUID] = Field(min_length=1, max_length=TASK_BATCH_GET_MAX)
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime, date
+
+class DailyCompletions(BaseModel):
+    date: date
+    completed: int
+
+class LeadTimeStats(BaseModel):
+    count: int
+    mean: Optional[float] = None
+    percentiles: Dict[str, float]
+
+class ProjectOverdueStats(BaseModel):
+    project_name: str
+    total_tasks: int
+    open_tasks: int
+    overdue_tasks: int
+    overdue_ratio: float
+
+class TaskAnalyticsResponse(BaseModel):
+    generated_at: datetime
+    days: int
+    completed_total: int
+    completed_per_day: List[DailyCompletions]
+    lead_time_hours: LeadTimeStats
+    projects: List[ProjectOverdueStats]
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+class BatchOperationResult(BaseModel):
+    status: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+class BatchResponse(BaseModel):
+    # False when an atomic batch was rolled back; the results then show what would have happened
+    committed: bool
+    results: List[BatchOperationResult]
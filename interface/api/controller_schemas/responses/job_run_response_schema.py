@@ -0,0 +1,15 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import datetime
+
+class JobRunResponse(BaseModel):
+    id: int
+    job_name: str
+    status: str
+    started_at: datetime
+    finished_at: datetime
+    duration_ms: float
+    rows_affected: int
+    error: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
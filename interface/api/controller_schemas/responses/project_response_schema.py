@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
+from interface.api.controller_schemas.responses.task_response_schema import TaskResponse
 
 class ProjectResponse(BaseModel):
     id: int
@@ -8,5 +9,9 @@ class ProjectResponse(BaseModel):
     description: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+class ProjectWithTasksResponse(ProjectResponse):
+    tasks: List[TaskResponse]
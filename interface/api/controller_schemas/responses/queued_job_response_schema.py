@@ -0,0 +1,29 @@
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import Optional
+from datetime import datetime
+import json
+
+class QueuedJobResponse(BaseModel):
+    id: int
+    kind: str
+    project_name: Optional[str] = None
+    status: str
+    attempts: int
+    max_attempts: int
+    progress: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('result', mode='before')
+    @classmethod
+    def parse_result(cls, v):
+        # Stored as a JSON string
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
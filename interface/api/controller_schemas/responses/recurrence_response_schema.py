@@ -0,0 +1,28 @@
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import List, Optional
+from datetime import datetime
+
+class RecurrenceRuleResponse(BaseModel):
+    id: int
+    project_id: int
+    title: str
+    description: Optional[str] = None
+    frequency: str
+    interval: int
+    weekdays: Optional[List[str]] = None
+    cron: Optional[str] = None
+    start_at: datetime
+    until: Optional[datetime] = None
+    materialized_until: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('weekdays', mode='before')
+    @classmethod
+    def split_weekdays(cls, v):
+        # Stored as a comma-separated string
+        if isinstance(v, str):
+            return v.split(',')
+        return v
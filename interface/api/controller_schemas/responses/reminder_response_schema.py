@@ -0,0 +1,11 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+
+class ReminderWebhookResponse(BaseModel):
+    project_id: int
+    url: str
+    minutes_before: int
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
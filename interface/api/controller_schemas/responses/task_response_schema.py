@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict, UUID4
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from uuid import UUID
 
 class TaskResponse(BaseModel):
     uuid: UUID4
@@ -11,5 +12,13 @@ class TaskResponse(BaseModel):
     deadline: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+class DueTaskResponse(TaskResponse):
+    project_name: str
+
+class TaskBatchGetResponse(BaseModel):
+    tasks: List[TaskResponse]
+    missing: List[UUID]
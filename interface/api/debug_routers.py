@@ -0,0 +1,126 @@
+import io
+import pstats
+import secrets
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from data.env_loader import DEBUG_TOKEN
+from data.slow_query_log import slow_query_recorder
+from interface.api.admission import admission_controller
+from interface.api.profiling import list_profiles, profile_path
+from interface.api.response_cache import response_cache
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)):
+    """
+    Guard for debug endpoints.
+
+    Raises:
+        HTTPException: 404 when no DEBUG_TOKEN is configured, 403 when the X-Debug-Token header does not match.
+    """
+    if not DEBUG_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_debug_token is None or not secrets.compare_digest(x_debug_token, DEBUG_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid debug token")
+
+
+debug_router = APIRouter(prefix="/debug", dependencies=[Depends(require_debug_token)])
+
+
+@debug_router.get("/admission")
+async def read_admission_metrics():
+    """
+    Retrieve admission control metrics.
+    
+    Returns:
+        dict: Per route class concurrency, queue depth and rejection counters, and rate limiter counters.
+    """
+    return admission_controller.stats()
+
+
+@debug_router.get("/slow-queries")
+async def read_slow_queries():
+    """
+    Retrieve the recorded slow queries, slowest first.
+    
+    Returns:
+        dict: Threshold, capacity and entries (statement, redacted parameters, duration, route, plan).
+    """
+    return {
+        "threshold_ms": slow_query_recorder.threshold * 1000,
+        "capacity": slow_query_recorder.entries.maxlen,
+        "entries": slow_query_recorder.get_entries(),
+    }
+
+
+@debug_router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries():
+    """
+    Clear the slow-query log.
+    
+    Returns:
+        Response: 204 No Content.
+    """
+    slow_query_recorder.clear()
+
+
+@debug_router.get("/response-cache")
+async def read_response_cache_metrics():
+    """
+    Retrieve response cache metrics.
+    
+    Returns:
+        dict: Entries, bytes used against the memory budget, evictions, and hits, misses and hit rate
+        overall and per endpoint.
+    """
+    return response_cache.stats()
+
+
+@debug_router.delete("/response-cache", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_response_cache():
+    """
+    Drop all cached responses.
+    
+    Returns:
+        Response: 204 No Content.
+    """
+    response_cache.clear()
+
+
+@debug_router.get("/profiles")
+async def read_profiles():
+    """
+    List the stored request profiles, newest first.
+    
+    Returns:
+        List[dict]: Profile ids and sizes.
+    """
+    return list_profiles()
+
+
+@debug_router.get("/profiles/{profile_id}")
+async def read_profile(profile_id: str, format: Literal["pstats", "text"] = Query("pstats"), limit: int = Query(50, ge=1)):
+    """
+    Download a stored request profile.
+    
+    Args:
+        profile_id (str): The id from the X-Profile-Id response header.
+        format (str): "pstats" for the raw stats file (load with pstats or snakeviz), "text" for a summary.
+        limit (int): Number of functions listed in the text summary.
+        
+    Returns:
+        Response: The pstats file, or the functions sorted by cumulative time as text.
+        
+    Raises:
+        HTTPException: If the profile does not exist.
+    """
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if format == "pstats":
+        return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+    output = io.StringIO()
+    pstats.Stats(str(path), stream=output).sort_stats("cumulative").print_stats(limit)
+    return PlainTextResponse(output.getvalue())
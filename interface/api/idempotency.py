@@ -0,0 +1,219 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+The first successful response for a key is kept in a bounded LRU/TTL cache (and optionally in the
+idempotency_keys table, so that retries landing on another worker are answered too). A retry with
+the same key replays the stored response instead of executing the request again, and concurrent
+duplicates wait for the in-flight request.
+
+With the table, the handler claims the key in the transaction that creates the resource, so the key
+is taken if and only if the resource was created. A duplicate on another worker waits for that
+transaction on the primary key, then replays the response or gets 409 while it is not recorded yet.
+With a shard map the key is claimed on the shard of the project, so it is found there by the claim.
+The response is recorded after the commit; if that fails, the client still gets it, and retries get
+409 instead of creating the resource again.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple, Type
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from data.database import AsyncSessionLocal, SHARDING_ENABLED
+from data.env_loader import IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_DB_ENABLED
+from data.repositories.idempotency_repository import IdempotencyRepository
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    body: str
+    expires_at: float
+
+
+# Passed to handlers: claims the key in the handler's session, before its write
+Claim = Callable[[AsyncSession], Awaitable[None]]
+
+
+class _KeyTaken(Exception):
+    """Raised by a claim when the key is already held; entry is the recorded response, if any."""
+
+    def __init__(self, entry: Optional[StoredResponse]):
+        super().__init__()
+        self.entry = entry
+
+
+def _unrecorded_conflict() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT,
+                         detail="A request with this Idempotency-Key was already processed; "
+                                "its response is not available yet.")
+
+
+class IdempotencyCache:
+    """Bounded LRU/TTL store of responses keyed by (scope, Idempotency-Key)."""
+
+    def __init__(self, max_entries: int = IDEMPOTENCY_CACHE_SIZE, ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS,
+                 use_database: bool = IDEMPOTENCY_DB_ENABLED):
+        """
+        :param max_entries: Maximum number of responses kept in memory
+        :param ttl_seconds: How long a stored response can be replayed
+        :param use_database: Also persist responses in the idempotency_keys table
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.use_database = use_database
+        self._entries: "OrderedDict[Tuple[str, str], StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], Tuple[str, asyncio.Future]] = {}
+
+    def _get(self, cache_key: Tuple[str, str]) -> Optional[StoredResponse]:
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[cache_key]
+            return None
+        self._entries.move_to_end(cache_key)
+        return entry
+
+    def _put(self, cache_key: Tuple[str, str], entry: StoredResponse) -> None:
+        self._entries[cache_key] = entry
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(self, cache_key: Tuple[str, str]) -> Optional[StoredResponse]:
+        """Look the key up in memory, then in the database when enabled."""
+        entry = self._get(cache_key)
+        # With shards, keys are held by the shard of the project, which only the handler's claim reaches
+        if entry is not None or not self.use_database or SHARDING_ENABLED:
+            return entry
+        async with AsyncSessionLocal() as db:
+            stored = await IdempotencyRepository(db).get_response(*cache_key)
+        if stored is None:
+            return None
+        if stored.response_body is None:
+            raise _unrecorded_conflict()
+        entry = self._from_record(stored)
+        self._put(cache_key, entry)
+        return entry
+
+    @staticmethod
+    def _from_record(stored) -> StoredResponse:
+        remaining = (stored.expires_at - datetime.now()).total_seconds()
+        return StoredResponse(stored.request_hash, stored.status_code, stored.response_body,
+                              time.monotonic() + remaining)
+
+    def _claim(self, cache_key: Tuple[str, str], request_hash: str, claimed: list) -> Claim:
+        """Build the claim of a key for a handler; the engine of a successful claim is appended to claimed."""
+        async def claim(db: AsyncSession) -> None:
+            if not self.use_database:
+                return
+            repo = IdempotencyRepository(db)
+            expires_at = datetime.now() + timedelta(seconds=self.ttl_seconds)
+            if await repo.claim_key(*cache_key, request_hash, expires_at):
+                claimed.append(db.bind)
+                return
+            stored = await repo.get_response(*cache_key)
+            entry = self._from_record(stored) if stored is not None and stored.response_body is not None else None
+            await db.rollback()
+            raise _KeyTaken(entry)
+        return claim
+
+    async def _record(self, bind, cache_key: Tuple[str, str], entry: StoredResponse) -> None:
+        """Record the response of a claimed key in the database that holds the claim."""
+        async with AsyncSession(bind=bind, expire_on_commit=False) as db:
+            await IdempotencyRepository(db).complete_response(
+                *cache_key, entry.status_code, entry.body, datetime.now() + timedelta(seconds=self.ttl_seconds)
+            )
+            await db.commit()
+
+    @staticmethod
+    def _replay(entry: StoredResponse, request_hash: str) -> Response:
+        if entry.request_hash != request_hash:
+            raise HTTPException(status_code=422,
+                                detail="Idempotency-Key was already used with a different request.")
+        return Response(content=entry.body, status_code=entry.status_code, media_type="application/json",
+                        headers={REPLAYED_HEADER: "true"})
+
+    async def run(self, scope: str, key: str, request_body: str, handler: Callable[[Claim], Awaitable[object]],
+                  response_model: Type[BaseModel], status_code: int) -> Response:
+        """
+        Execute handler at most once per (scope, key) and replay its response afterwards.
+
+        :param scope: Method and path of the request, e.g. "POST /projects/"
+        :param key: The Idempotency-Key header value
+        :param request_body: Canonical request body, used to detect key reuse with another request
+        :param handler: Coroutine function performing the request; it must await the claim it is called with
+            on its session before writing, so that the key is committed together with the resource
+        :param response_model: Schema used to serialize the handler result
+        :param status_code: Status code of a successful response
+        :return: The original or the replayed response
+        """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters.")
+        cache_key = (scope, key)
+        request_hash = hashlib.sha256(request_body.encode()).hexdigest()
+
+        while True:
+            # A duplicate of a request in flight on this worker waits for it, even though its claim
+            # may already be visible in the database without a response
+            in_flight = self._in_flight.get(cache_key)
+            if in_flight is not None:
+                in_flight_hash, future = in_flight
+                if in_flight_hash != request_hash:
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                        detail="A request with this Idempotency-Key is already in progress.")
+                # Wait for the first request; if it failed nothing was stored and this one runs itself
+                await asyncio.shield(future)
+                continue
+
+            try:
+                entry = await self._load(cache_key)
+            except HTTPException:
+                # The claim was read while a request of this worker was in flight; it may have finished since
+                if cache_key in self._in_flight or self._get(cache_key) is not None:
+                    continue
+                raise
+            if entry is not None:
+                return self._replay(entry, request_hash)
+            # The lookup may have waited for the database while a duplicate started here
+            if cache_key not in self._in_flight:
+                break
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[cache_key] = (request_hash, future)
+        claimed = []
+        try:
+            try:
+                result = await handler(self._claim(cache_key, request_hash, claimed))
+            except _KeyTaken as e:
+                # Another worker created the resource for this key
+                if e.entry is None:
+                    raise _unrecorded_conflict()
+                self._put(cache_key, e.entry)
+                return self._replay(e.entry, request_hash)
+            body = response_model.model_validate(result).model_dump_json()
+            entry = StoredResponse(request_hash, status_code, body, time.monotonic() + self.ttl_seconds)
+            self._put(cache_key, entry)
+            if claimed:
+                try:
+                    await self._record(claimed[0], cache_key, entry)
+                except Exception:
+                    # The resource is committed with the key: answer the request; retries get 409
+                    pass
+            return Response(content=body, status_code=status_code, media_type="application/json")
+        finally:
+            del self._in_flight[cache_key]
+            future.set_result(None)
+
+
+idempotency_cache = IdempotencyCache()
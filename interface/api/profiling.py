@@ -0,0 +1,99 @@
+"""
+On-demand per-request CPU profiling.
+
+Only installed when PROFILING_ENABLED is set, so there is no overhead otherwise. A request carrying
+both the X-Profile header and a valid X-Debug-Token runs under cProfile; the stats are written to
+PROFILE_OUTPUT_DIR and the response gets an X-Profile-Id header to download them from
+/api/v1/debug/profiles/{profile_id}.
+
+cProfile measures the whole event loop thread, so coroutines of concurrent requests that run while
+the profiled request is awaiting show up in its profile as well. Only one request is profiled at a time.
+"""
+import cProfile
+import secrets
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from data.env_loader import DEBUG_TOKEN, PROFILE_OUTPUT_DIR, PROFILE_MAX_STORED
+
+PROFILE_HEADER = b"x-profile"
+DEBUG_TOKEN_HEADER = b"x-debug-token"
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """
+    Get the stats file of a stored profile.
+    :param profile_id: The id returned in the X-Profile-Id header.
+    :return: The path of the pstats file, or None if no such profile is stored.
+    """
+    try:
+        uuid.UUID(profile_id)
+    except ValueError:
+        return None
+    path = Path(PROFILE_OUTPUT_DIR) / f"{profile_id}.pstats"
+    return path if path.is_file() else None
+
+
+def list_profiles() -> List[dict]:
+    """List the stored profiles, newest first."""
+    directory = Path(PROFILE_OUTPUT_DIR)
+    if not directory.is_dir():
+        return []
+    files = sorted(directory.glob("*.pstats"), key=lambda f: f.stat().st_mtime, reverse=True)
+    return [{"profile_id": f.stem, "size_bytes": f.stat().st_size} for f in files]
+
+
+class ProfilingMiddleware:
+    """ASGI middleware running cProfile around requests that ask for it."""
+
+    def __init__(self, app):
+        self.app = app
+        self._active = False
+
+    @staticmethod
+    def _wants_profile(scope) -> bool:
+        headers = dict(scope["headers"])
+        if PROFILE_HEADER not in headers or not DEBUG_TOKEN:
+            return False
+        token = headers.get(DEBUG_TOKEN_HEADER, b"").decode("latin-1")
+        return secrets.compare_digest(token, DEBUG_TOKEN)
+
+    @staticmethod
+    def _save(profiler: cProfile.Profile, profile_id: str) -> None:
+        directory = Path(PROFILE_OUTPUT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(directory / f"{profile_id}.pstats")
+        stored = sorted(directory.glob("*.pstats"), key=lambda f: f.stat().st_mtime)
+        for old in stored[:-PROFILE_MAX_STORED]:
+            old.unlink(missing_ok=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if self._active:
+            async def send_busy(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-status", b"busy")]
+                await send(message)
+            await self.app(scope, receive, send_busy)
+            return
+
+        profile_id = str(uuid.uuid4())
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        self._active = True
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            self._active = False
+            self._save(profiler, profile_id)
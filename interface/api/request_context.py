@@ -0,0 +1,18 @@
+from data.slow_query_log import current_request_scope
+
+
+class RequestContextMiddleware:
+    """ASGI middleware exposing the current request scope to the data layer (e.g. the slow-query log)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request_scope.reset(token)
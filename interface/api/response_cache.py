@@ -0,0 +1,112 @@
+"""
+Server-side cache of encoded JSON list responses.
+
+GET /projects/{project_name}/tasks/ and GET /projects/ keep the final response bytes in a bounded
+LRU. Keys contain the version of the data they were built from (the project version, which every
+task and project write increments, or a marker over all projects for the project list), so entries
+are never invalidated explicitly: a write makes the old key unreachable and the entry ages out.
+Versions are read from the database, so the cache stays correct with several workers.
+
+The cache is bounded by the total size of the stored bodies; responses larger than the per-entry
+limit are not stored.
+"""
+from collections import Counter, OrderedDict
+from typing import Dict, Hashable, NamedTuple, Optional
+
+from data.env_loader import RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_MAX_ENTRY_BYTES
+
+CACHE_HEADER = "X-Cache"
+# Rough per-entry cost of the key, the headers and the bookkeeping, in bytes
+ENTRY_OVERHEAD = 256
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: Dict[str, str]
+
+
+class ResponseCache:
+    """LRU of encoded responses bounded by a memory budget, with hit-rate counters per scope."""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+                 max_entry_bytes: int = RESPONSE_CACHE_MAX_ENTRY_BYTES, enabled: bool = RESPONSE_CACHE_ENABLED):
+        """
+        :param max_bytes: Memory budget of all entries
+        :param max_entry_bytes: Larger responses are not cached
+        :param enabled: When False, get() always misses and put() stores nothing
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._hits: Counter = Counter()
+        self._misses: Counter = Counter()
+        self._evictions = 0
+        self._too_large = 0
+
+    @staticmethod
+    def _size(entry: CachedResponse) -> int:
+        return len(entry.body) + ENTRY_OVERHEAD
+
+    def get(self, scope: str, key: Hashable) -> Optional[CachedResponse]:
+        """
+        Look a response up.
+
+        :param scope: Endpoint the key belongs to, used for the per-scope counters
+        :param key: Versions and query parameters the response depends on
+        :return: The cached response, or None on a miss
+        """
+        entry = self._entries.get((scope, key))
+        if entry is None:
+            self._misses[scope] += 1
+            return None
+        self._entries.move_to_end((scope, key))
+        self._hits[scope] += 1
+        return entry
+
+    def put(self, scope: str, key: Hashable, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        """Store a response, evicting the least recently used entries beyond the memory budget."""
+        if not self.enabled:
+            return
+        entry = CachedResponse(body, dict(headers or {}))
+        size = self._size(entry)
+        if size > self.max_entry_bytes:
+            self._too_large += 1
+            return
+        previous = self._entries.pop((scope, key), None)
+        if previous is not None:
+            self._bytes -= self._size(previous)
+        self._entries[(scope, key)] = entry
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= self._size(evicted)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (the counters are kept)."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        """Size, budget and hit-rate counters, overall and per scope."""
+        def rates(hits: int, misses: int) -> dict:
+            lookups = hits + misses
+            return {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0}
+
+        scopes = sorted(set(self._hits) | set(self._misses))
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_entry_bytes": self.max_entry_bytes,
+            "evictions": self._evictions,
+            "not_stored_too_large": self._too_large,
+            **rates(sum(self._hits.values()), sum(self._misses.values())),
+            "scopes": {scope: rates(self._hits[scope], self._misses[scope]) for scope in scopes},
+        }
+
+
+response_cache = ResponseCache()
@@ -1,64 +1,272 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query, Header, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional, Literal, Hashable, AsyncIterator, Dict
+from datetime import datetime
+import json
 
-from data.database import get_db
+from data.database import (get_db, get_project_db, project_session, shard_sessionmakers, batch_session,
+                           SHARDING_ENABLED)
+from data.env_loader import PROJECT_PAGE_DEFAULT_LIMIT, PROJECT_PAGE_MAX_LIMIT, TASK_PAGE_DEFAULT_LIMIT, TASK_PAGE_MAX_LIMIT
+from data.env_loader import ANALYTICS_MAX_DAYS, RECURRENCE_UPCOMING_MAX_DAYS
+from interface.api.idempotency import idempotency_cache, Claim
+from interface.api.response_cache import response_cache, CachedResponse, CACHE_HEADER
 from interface.api.controller_schemas.requests.project_request_schema import ProjectCreateRequest, ProjectUpdateRequest
-from interface.api.controller_schemas.responses.project_response_schema import ProjectResponse
-from interface.api.controller_schemas.requests.task_request_schema import TaskCreateRequest, TaskUpdateRequest
-from interface.api.controller_schemas.responses.task_response_schema import TaskResponse
+from interface.api.controller_schemas.responses.project_response_schema import ProjectResponse, ProjectWithTasksResponse
+from interface.api.controller_schemas.requests.task_request_schema import (
+    TaskCreateRequest, TaskUpdateRequest, TaskBatchGetRequest
+)
+from interface.api.controller_schemas.responses.task_response_schema import (
+    TaskResponse, DueTaskResponse, TaskBatchGetResponse
+)
+from interface.api.controller_schemas.responses.job_run_response_schema import JobRunResponse
+from interface.api.controller_schemas.responses.analytics_response_schema import TaskAnalyticsResponse
+from interface.api.controller_schemas.requests.recurrence_request_schema import RecurrenceRuleCreateRequest
+from interface.api.controller_schemas.responses.recurrence_response_schema import RecurrenceRuleResponse
+from interface.api.controller_schemas.requests.reminder_request_schema import ReminderWebhookRequest
+from interface.api.controller_schemas.responses.reminder_response_schema import ReminderWebhookResponse
+from interface.api.controller_schemas.requests.queued_job_request_schema import TaskImportRequest, TaskBulkUpdateRequest
+from interface.api.controller_schemas.responses.queued_job_response_schema import QueuedJobResponse
 
-from core.services import project_services, task_services
-from core.models import Project
+from core.services import (project_services, task_services, job_services, analytics_services, recurrence_services,
+                           reminder_services, queue_services, shard_services)
+from core.models import Project, Task
+from core.validators.task_validators import validate_task_fields
 from core.exceptions import (
     ProjectNotFoundError, 
     TaskNotFoundError, 
     MaxProjectsReachedError, 
-    MaxTasksReachedError
+    MaxTasksReachedError,
+    InvalidTaskFieldsError,
+    InvalidTaskStatusError,
+    TaskVersionConflictError,
+    InvalidRecurrenceRuleError,
+    RecurrenceRuleNotFoundError,
+    InvalidTaskTitleSizeError,
+    InvalidTaskDescriptionSizeError,
+    ReminderWebhookNotFoundError,
+    InvalidTaskDeadlineError,
+    QueuedJobNotFoundError,
+    QueuedJobOutputNotReadyError,
+    InvalidCursorError
 )
 
 router = APIRouter()
 
+FIELDS_QUERY_DESCRIPTION = "Comma-separated list of task fields to return (e.g. uuid,title,status,deadline)."
+INCLUDE_ARCHIVED_DESCRIPTION = "Also return done tasks that were moved to the archive."
+INCLUDE_UPCOMING_DESCRIPTION = ("Also return the occurrences of recurrence rules in the next N days that are not tasks yet "
+                                "(virtual tasks with version 0).")
+IDEMPOTENCY_KEY_DESCRIPTION = "Retries with the same key replay the first response instead of creating a duplicate."
+IF_MATCH_DESCRIPTION = "Task version (the ETag of the task) the update is based on; 409 if the task changed since."
+
+
+def _task_etag(task: Task) -> str:
+    return f'"{task.version}"'
+
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Parse an If-Match header holding a task version ETag; None (or *) matches any version."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    value = value.strip('"')
+    if not value.isdigit():
+        raise ValueError("If-Match must be a task version ETag, e.g. \"3\".")
+    return int(value)
+
+
+TASK_LIST_ADAPTER = TypeAdapter(List[TaskResponse])
+PROJECT_LIST_ADAPTER = TypeAdapter(List[ProjectResponse])
+
+
+def _encode_list(adapter: TypeAdapter, items: list) -> bytes:
+    """Encode a list of core objects with a response schema, as FastAPI would for a response_model."""
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+
+def _use_response_cache() -> bool:
+    # Inside a batch the session sees uncommitted writes, which must not be cached or answered from the cache
+    return response_cache.enabled and batch_session.get() is None
+
+
+def _cached_response(cached: CachedResponse) -> Response:
+    return Response(content=cached.body, media_type="application/json",
+                    headers={**cached.headers, CACHE_HEADER: "HIT"})
+
+
+def _cacheable_response(scope: str, key: Optional[Hashable], body: bytes,
+                        headers: Optional[Dict[str, str]] = None) -> Response:
+    """Build a JSON response from encoded bytes and store it in the response cache when a key is given."""
+    headers = dict(headers or {})
+    if key is not None:
+        response_cache.put(scope, key, body, headers)
+        headers[CACHE_HEADER] = "MISS"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _cache_stream(chunks: AsyncIterator[bytes], scope: str, key: Optional[Hashable],
+                        headers: Dict[str, str]) -> AsyncIterator[bytes]:
+    """Pass a streamed body through and cache it once complete, unless it outgrows the entry limit."""
+    parts = [] if key is not None else None
+    size = 0
+    async for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size <= response_cache.max_entry_bytes:
+                parts.append(chunk)
+            else:
+                parts = None
+        yield chunk
+    if parts is not None:
+        response_cache.put(scope, key, b"".join(parts), headers)
+
+
+def _accepted(request: Request, response: Response, job):
+    """Point the Location header of a 202 response at the status of the queued job."""
+    response.headers["Location"] = str(request.url_for("read_queued_job", project_name=job.project_name, job_id=job.id))
+    return job
+
+
+def _sparse_task(task: Task, fields: List[str]) -> dict:
+    """Serialize only the requested fields of a task."""
+    return jsonable_encoder({field: getattr(task, field) for field in fields})
+
+
+async def _stream_projects_with_tasks(projects: List[Project], project_tasks: List[List[Task]]):
+    """Encode projects with their tasks (in the order of projects) as a JSON array, one project at a time."""
+    yield b"["
+    for i, (project, tasks) in enumerate(zip(projects, project_tasks)):
+        if i:
+            yield b","
+        item = ProjectWithTasksResponse(
+            **ProjectResponse.model_validate(project).model_dump(),
+            tasks=[TaskResponse.model_validate(task) for task in tasks]
+        )
+        yield item.model_dump_json().encode()
+    yield b"]"
+
 # --- Projects ---
 
-@router.get("/projects/", response_model=List[ProjectResponse])
-async def read_projects(db: AsyncSession = Depends(get_db)):
+@router.get("/projects/", response_model=List[ProjectResponse],
+            responses={200: {"model": List[ProjectWithTasksResponse],
+                             "description": "Projects, each with a tasks list when include=tasks."}})
+async def read_projects(limit: Optional[int] = Query(None, ge=1, le=PROJECT_PAGE_MAX_LIMIT,
+                                                    description="Page size; without limit and cursor all projects "
+                                                                "are returned in one response."),
+                        sort: Literal["name", "created_at", "updated_at"] = Query("name"),
+                        order: Literal["asc", "desc"] = Query("asc"),
+                        cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page."),
+                        prefix: Optional[str] = Query(None, description="Only return projects whose name starts with this prefix."),
+                        include: Optional[Literal["tasks"]] = Query(None, description="Embed each project's tasks."),
+                        tasks_limit: Optional[int] = Query(None, ge=1, description="Maximum number of embedded tasks per project."),
+                        tasks_status: Optional[List[str]] = Query(None, description="Only embed tasks with these statuses."),
+                        db: AsyncSession = Depends(get_db)):
     """
-    Retrieve a list of all projects.
+    Retrieve one page of projects, or all of them when neither limit nor cursor is given.
+    
+    Args:
+        limit (Optional[int]): Maximum number of projects to return (PROJECT_PAGE_DEFAULT_LIMIT with a cursor).
+        sort (str): Sort field (name, created_at or updated_at).
+        order (str): Sort order (asc or desc).
+        cursor (Optional[str]): Keyset cursor of the page to fetch.
+        prefix (Optional[str]): Project name prefix filter.
+        include (Optional[str]): "tasks" to embed the tasks of every returned project, loaded with one query.
+        tasks_limit (Optional[int]): Maximum number of embedded tasks per project (oldest first).
+        tasks_status (Optional[List[str]]): Status filter for embedded tasks.
+        db (AsyncSession): Database session.
     
     Returns:
-        List[ProjectResponse]: A list of all projects.
+        List[ProjectResponse]: A page of projects. The X-Next-Cursor header is set when more pages follow.
+        The encoded page is cached until any project or task is written.
+        
+    Raises:
+        HTTPException: If the cursor or a task status is invalid.
     """
-    projects = await project_services.get_project_list(db)
-    return projects
+    if limit is None and cursor is not None:
+        limit = PROJECT_PAGE_DEFAULT_LIMIT
+    cache_key = None
+    try:
+        if _use_response_cache():
+            # Read the version before the data: a concurrent write can only store newer data under an older key
+            if SHARDING_ENABLED:
+                list_version = await shard_services.get_project_list_version_across_shards(shard_sessionmakers())
+            else:
+                list_version = await project_services.get_project_list_version(db)
+            cache_key = (list_version, limit, sort, order, cursor, prefix, include, tasks_limit,
+                         tuple(tasks_status or ()))
+            cached = response_cache.get("projects", cache_key)
+            if cached is not None:
+                return _cached_response(cached)
+        if SHARDING_ENABLED:
+            # Every shard is queried in parallel and the pages are merged
+            shard_projects, next_cursor = await shard_services.get_project_page_across_shards(
+                shard_sessionmakers(), limit, sort, order == "desc", cursor, prefix
+            )
+            projects = [project for _, project in shard_projects]
+            if include == "tasks":
+                project_tasks = await shard_services.get_tasks_for_projects_across_shards(
+                    shard_sessionmakers(), shard_projects, tasks_limit, tasks_status
+                )
+        else:
+            projects, next_cursor = await project_services.get_project_page(
+                db, limit, sort, order == "desc", cursor, prefix
+            )
+            if include == "tasks":
+                tasks_by_project = await project_services.get_tasks_for_projects(db, projects, tasks_limit, tasks_status)
+                project_tasks = [tasks_by_project[project.id] for project in projects]
+    except (InvalidTaskStatusError, InvalidCursorError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if include == "tasks":
+        body = _cache_stream(_stream_projects_with_tasks(projects, project_tasks), "projects", cache_key, headers)
+        if cache_key is not None:
+            headers = {**headers, CACHE_HEADER: "MISS"}
+        return StreamingResponse(body, media_type="application/json", headers=headers)
+    return _cacheable_response("projects", cache_key, _encode_list(PROJECT_LIST_ADAPTER, projects), headers)
 
 @router.post("/projects/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
-async def create_project(project_req: ProjectCreateRequest, db: AsyncSession = Depends(get_db)):
+async def create_project(project_req: ProjectCreateRequest,
+                         idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key",
+                                                                 description=IDEMPOTENCY_KEY_DESCRIPTION)):
     """
     Create a new project.
     
     Args:
         project_req (ProjectCreateRequest): The project creation data.
-        db (AsyncSession): Database session.
+        idempotency_key (Optional[str]): Idempotency-Key header for safe retries.
         
     Returns:
-        ProjectResponse: The created project.
+        ProjectResponse: The created project, stored on the shard of its name.
         
     Raises:
         HTTPException: If project limit reached or validation fails.
     """
-    try:
-        created_project = await project_services.create_project(db, project_req.name, project_req.description or "")
-        return created_project
-    except MaxProjectsReachedError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except ValueError as e: # For validation errors
-         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    async def handle(claim: Optional[Claim] = None):
+        # ProjectMovingError from project_session is answered with 503 by the handler in main.py
+        async with project_session(project_req.name) as db:
+            if claim is not None:
+                await claim(db)
+            try:
+                return await project_services.create_project(db, project_req.name, project_req.description or "")
+            except MaxProjectsReachedError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            except ValueError as e: # For validation errors
+                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            except Exception as e:
+                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if idempotency_key is None:
+        return await handle()
+    return await idempotency_cache.run("POST /projects/", idempotency_key, project_req.model_dump_json(),
+                                       handle, ProjectResponse, status.HTTP_201_CREATED)
 
 @router.get("/projects/{project_name}", response_model=ProjectResponse)
-async def read_project(project_name: str, db: AsyncSession = Depends(get_db)):
+async def read_project(project_name: str, db: AsyncSession = Depends(get_project_db)):
     """
     Retrieve a specific project by name.
     
@@ -81,7 +289,7 @@ async def read_project(project_name: str, db: AsyncSession = Depends(get_db)):
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.patch("/projects/{project_name}", response_model=ProjectResponse)
-async def update_project(project_name: str, project_update: ProjectUpdateRequest, db: AsyncSession = Depends(get_db)):
+async def update_project(project_name: str, project_update: ProjectUpdateRequest, db: AsyncSession = Depends(get_project_db)):
     """
     Update a project's details.
     
@@ -104,7 +312,7 @@ async def update_project(project_name: str, project_update: ProjectUpdateRequest
         # Determine new values (keep old if not provided)
         new_description = project_update.description if project_update.description is not None else existing_project.description
        
-        # Logic for rename is more complex as it changes URL resource, but let's support it via service
+        # The name is not updatable: it is the URL of the project and, with a shard map, picks its shard
         updated_project_model = Project(name=project_name, description=new_description)
         
         updated_project = await project_services.update_project(db, project_name, updated_project_model)
@@ -117,7 +325,7 @@ async def update_project(project_name: str, project_update: ProjectUpdateRequest
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.delete("/projects/{project_name}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_project(project_name: str, db: AsyncSession = Depends(get_db)):
+async def delete_project(project_name: str, db: AsyncSession = Depends(get_project_db)):
     """
     Delete a project by name.
     
@@ -147,38 +355,72 @@ async def delete_project(project_name: str, db: AsyncSession = Depends(get_db)):
 # --- Tasks ---
 
 @router.get("/projects/{project_name}/tasks/", response_model=List[TaskResponse])
-async def read_tasks(project_name: str, db: AsyncSession = Depends(get_db)):
+async def read_tasks(project_name: str, fields: Optional[str] = Query(None, description=FIELDS_QUERY_DESCRIPTION),
+                     include_archived: bool = Query(False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+                     include_upcoming: Optional[int] = Query(None, ge=1, le=RECURRENCE_UPCOMING_MAX_DAYS,
+                                                             description=INCLUDE_UPCOMING_DESCRIPTION),
+                     db: AsyncSession = Depends(get_project_db)):
     """
     Retrieve all tasks for a given project.
     
     Args:
         project_name (str): The name of the project.
+        fields (Optional[str]): Sparse fieldset; only these columns are loaded and returned.
+        include_archived (bool): Also return archived tasks (read-only).
+        include_upcoming (Optional[int]): Append the virtual occurrences of recurrence rules in the next N days.
         db (AsyncSession): Database session.
         
     Returns:
-        List[TaskResponse]: A list of tasks in the project.
+        List[TaskResponse]: A list of tasks in the project. The encoded list is cached until the
+        project version changes.
         
     Raises:
-        HTTPException: If project not found.
+        HTTPException: If project not found or fields are invalid.
     """
     try:
+        field_list = validate_task_fields(fields) if fields is not None else None
+        cache_key = None
+        if _use_response_cache():
+            # Read the version before the tasks: a concurrent write can only store newer data under an older key
+            project_id, version = await project_services.get_project_version(db, project_name)
+            # Project ids are only unique per shard: the name tells projects on different shards apart
+            cache_key = (project_name, project_id, version, tuple(field_list or ()), include_archived)
+            if include_upcoming is not None:
+                # Virtual occurrences move with the clock; they are served from the cache for up to a minute
+                cache_key += (include_upcoming, datetime.now().replace(second=0, microsecond=0))
+            cached = response_cache.get("tasks", cache_key)
+            if cached is not None:
+                return _cached_response(cached)
         # Construct a temporary project object to pass to the service
         project = Project(name=project_name) 
-        tasks = await task_services.get_project_tasks(db, project)
-        return tasks
+        tasks = await task_services.get_project_tasks(db, project, field_list, include_archived)
+        if include_upcoming is not None:
+            tasks += await recurrence_services.get_upcoming_occurrences(db, project_name, include_upcoming)
+        if field_list:
+            sparse = [_sparse_task(task, field_list) for task in tasks]
+            body = json.dumps(sparse, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+        else:
+            body = _encode_list(TASK_LIST_ADAPTER, tasks)
+        return _cacheable_response("tasks", cache_key, body)
+    except InvalidTaskFieldsError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except ProjectNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.post("/projects/{project_name}/tasks/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-async def create_task(project_name: str, task_req: TaskCreateRequest, db: AsyncSession = Depends(get_db)):
+async def create_task(project_name: str, task_req: TaskCreateRequest,
+                      idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key",
+                                                              description=IDEMPOTENCY_KEY_DESCRIPTION),
+                      db: AsyncSession = Depends(get_project_db)):
     """
     Create a new task in a project.
     
     Args:
         project_name (str): The name of the project.
         task_req (TaskCreateRequest): The task creation data.
+        idempotency_key (Optional[str]): Idempotency-Key header for safe retries.
         db (AsyncSession): Database session.
         
     Returns:
@@ -187,93 +429,126 @@ async def create_task(project_name: str, task_req: TaskCreateRequest, db: AsyncS
     Raises:
         HTTPException: If task limit reached, project not found, or validation fails.
     """
-    try:
-        project = Project(name=project_name)
+    async def handle(claim: Optional[Claim] = None):
+        try:
+            if claim is not None:
+                await claim(db)
+            project = Project(name=project_name)
+            
+            created_task = await task_services.add_task_to_project(
+                db, 
+                project, 
+                task_req.title, 
+                task_req.description or "", 
+                task_req.status or "todo", 
+                task_req.deadline
+            )
+            return created_task
+        except MaxTasksReachedError as e:
+             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except ProjectNotFoundError as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        except ValueError as e:
+             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) 
+
+    if idempotency_key is None:
+        return await handle()
+    return await idempotency_cache.run(f"POST /projects/{project_name}/tasks/", idempotency_key,
+                                       task_req.model_dump_json(), handle, TaskResponse, status.HTTP_201_CREATED)
+
+@router.post("/projects/{project_name}/tasks/batch-get", response_model=TaskBatchGetResponse)
+async def read_tasks_batch(project_name: str, batch_req: TaskBatchGetRequest, db: AsyncSession = Depends(get_project_db)):
+    """
+    Retrieve several tasks of a project by UUID with a single query.
+    
+    Args:
+        project_name (str): The name of the project.
+        batch_req (TaskBatchGetRequest): The UUIDs of the tasks (malformed UUIDs are rejected with 422).
+        db (AsyncSession): Database session.
         
-        created_task = await task_services.add_task_to_project(
-            db, 
-            project, 
-            task_req.title, 
-            task_req.description or "", 
-            task_req.status or "todo", 
-            task_req.deadline
-        )
-        return created_task
-    except MaxTasksReachedError as e:
-         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    Returns:
+        TaskBatchGetResponse: The found tasks in request order, and the UUIDs not found in the project.
+        
+    Raises:
+        HTTPException: If project not found.
+    """
+    try:
+        tasks, missing = await task_services.get_tasks_by_uuids_in_project(db, project_name, batch_req.uuids)
     except ProjectNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-    except ValueError as e:
-         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) 
+    return TaskBatchGetResponse(tasks=[TaskResponse.model_validate(task) for task in tasks], missing=missing)
 
 @router.get("/projects/{project_name}/tasks/{task_uuid}", response_model=TaskResponse)
-async def read_task(project_name: str, task_uuid: str, db: AsyncSession = Depends(get_db)):
+async def read_task(project_name: str, task_uuid: str, response: Response,
+                    fields: Optional[str] = Query(None, description=FIELDS_QUERY_DESCRIPTION),
+                    include_archived: bool = Query(False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+                    db: AsyncSession = Depends(get_project_db)):
     """
     Retrieve a specific task by UUID within a project.
     
     Args:
         project_name (str): The name of the project.
         task_uuid (str): The UUID of the task.
+        fields (Optional[str]): Sparse fieldset; only these columns are loaded and returned.
+        include_archived (bool): Also look the task up in the archive.
         db (AsyncSession): Database session.
         
     Returns:
-        TaskResponse: The task details.
+        TaskResponse: The task details, with its version in the ETag header.
         
     Raises:
-        HTTPException: If task or project not found.
+        HTTPException: If task or project not found, or fields are invalid.
     """
     try:
-        task = await task_services.get_task_by_uuid_in_project(db, project_name, task_uuid)
+        field_list = validate_task_fields(fields) if fields is not None else None
+        task = await task_services.get_task_by_uuid_in_project(db, project_name, task_uuid, field_list,
+                                                               include_archived)
         if not task:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+        if field_list:
+            return JSONResponse(content=_sparse_task(task, field_list))
+        response.headers["ETag"] = _task_etag(task)
         return task
+    except InvalidTaskFieldsError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except ProjectNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.patch("/projects/{project_name}/tasks/{task_uuid}", response_model=TaskResponse)
-async def update_task(project_name: str, task_uuid: str, task_update: TaskUpdateRequest, db: AsyncSession = Depends(get_db)):
+async def update_task(project_name: str, task_uuid: str, task_update: TaskUpdateRequest, response: Response,
+                      if_match: Optional[str] = Header(None, alias="If-Match", description=IF_MATCH_DESCRIPTION),
+                      db: AsyncSession = Depends(get_project_db)):
     """
     Update a task's details.
     
+    Only the given fields are written, with a single conditional UPDATE. With an If-Match header the
+    update only applies when the task still has that version.
+    
     Args:
         project_name (str): The name of the project.
         task_uuid (str): The UUID of the task.
         task_update (TaskUpdateRequest): The new task data.
+        if_match (Optional[str]): Expected task version (ETag).
         db (AsyncSession): Database session.
         
     Returns:
-        TaskResponse: The updated task.
+        TaskResponse: The updated task, with its new version in the ETag header.
         
     Raises:
-        HTTPException: If task/project not found or validation fails.
+        HTTPException: If task/project not found, validation fails, or the task version does not match (409).
     """
     try:
-        project = Project(name=project_name)
-        
-        # We need to fetch the current task to handle partial updates if fields are None
-        current_task = await task_services.get_task_by_uuid_in_project(db, project_name, task_uuid)
-        if not current_task:
-             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-             
-        new_title = task_update.title if task_update.title is not None else current_task.title
-        new_desc = task_update.description if task_update.description is not None else current_task.description
-        new_status = task_update.status if task_update.status is not None else current_task.status
-        new_deadline = task_update.deadline if task_update.deadline is not None else current_task.deadline
-
-        updated_task = await task_services.update_task_elements(
-            db, 
-            project, 
-            task_uuid, 
-            new_title, 
-            new_desc, 
-            new_status, 
-            new_deadline
-        )
-        
+        expected_version = _parse_if_match(if_match)
+        changes = {field: value for field, value in task_update.model_dump().items() if value is not None}
+        updated_task = await task_services.update_task_fields(db, project_name, task_uuid, changes, expected_version)
+        response.headers["ETag"] = _task_etag(updated_task)
         return updated_task
 
+    except TaskVersionConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e),
+                            headers={"ETag": f'"{e.current_version}"'})
     except TaskNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ProjectNotFoundError as e:
@@ -282,7 +557,7 @@ async def update_task(project_name: str, task_uuid: str, task_update: TaskUpdate
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.delete("/projects/{project_name}/tasks/{task_uuid}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_task(project_name: str, task_uuid: str, db: AsyncSession = Depends(get_db)):
+async def delete_task(project_name: str, task_uuid: str, db: AsyncSession = Depends(get_project_db)):
     """
     Delete a task from a project.
     
@@ -307,3 +582,385 @@ async def delete_task(project_name: str, task_uuid: str, db: AsyncSession = Depe
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/tasks/due", response_model=List[DueTaskResponse])
+async def read_due_tasks(response: Response,
+                         start: Optional[datetime] = Query(None, description="Inclusive lower deadline bound."),
+                         end: Optional[datetime] = Query(None, description="Exclusive upper deadline bound."),
+                         status_filter: Optional[List[str]] = Query(None, alias="status",
+                                                                    description="Statuses to include (default: todo and doing)."),
+                         limit: int = Query(TASK_PAGE_DEFAULT_LIMIT, ge=1, le=TASK_PAGE_MAX_LIMIT),
+                         cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page."),
+                         db: AsyncSession = Depends(get_db)):
+    """
+    Retrieve tasks across all projects whose deadline falls within a range, ordered by deadline.
+    
+    Args:
+        start (Optional[datetime]): Inclusive lower deadline bound; omit for overdue tasks too.
+        end (Optional[datetime]): Exclusive upper deadline bound.
+        status_filter (Optional[List[str]]): Statuses to include; by default done tasks are excluded.
+        limit (int): Maximum number of tasks to return.
+        cursor (Optional[str]): Keyset cursor of the page to fetch.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        List[DueTaskResponse]: A page of tasks with their project name. The X-Next-Cursor header is set when more pages follow.
+        
+    Raises:
+        HTTPException: If a status or the cursor is invalid.
+    """
+    try:
+        if SHARDING_ENABLED:
+            tasks, next_cursor = await shard_services.get_tasks_due_across_shards(
+                shard_sessionmakers(), start, end, status_filter, limit, cursor
+            )
+        else:
+            tasks, next_cursor = await task_services.get_tasks_due(db, start, end, status_filter, limit, cursor)
+    except (InvalidTaskStatusError, InvalidCursorError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [
+        DueTaskResponse(project_name=project_name, **TaskResponse.model_validate(task).model_dump())
+        for project_name, task in tasks
+    ]
+
+# --- Recurring tasks ---
+
+@router.post("/projects/{project_name}/recurrences", response_model=RecurrenceRuleResponse,
+             status_code=status.HTTP_201_CREATED)
+async def create_recurrence_rule(project_name: str, rule_req: RecurrenceRuleCreateRequest,
+                                 db: AsyncSession = Depends(get_project_db)):
+    """
+    Create a recurrence rule in a project.
+    
+    Only the occurrences in the next RECURRENCE_WINDOW_DAYS days are created as tasks; the scheduler
+    creates later ones as the window moves.
+    
+    Args:
+        project_name (str): The name of the project.
+        rule_req (RecurrenceRuleCreateRequest): Title, description and schedule of the rule.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        RecurrenceRuleResponse: The created rule.
+        
+    Raises:
+        HTTPException: If project not found or the schedule is invalid.
+    """
+    try:
+        return await recurrence_services.create_recurrence_rule(
+            db, project_name, rule_req.title, rule_req.description or "", rule_req.frequency, rule_req.interval,
+            rule_req.weekdays, rule_req.cron, rule_req.start_at, rule_req.until
+        )
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (InvalidRecurrenceRuleError, InvalidTaskTitleSizeError, InvalidTaskDescriptionSizeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/projects/{project_name}/recurrences", response_model=List[RecurrenceRuleResponse])
+async def read_recurrence_rules(project_name: str, db: AsyncSession = Depends(get_project_db)):
+    """
+    Retrieve the recurrence rules of a project.
+    
+    Args:
+        project_name (str): The name of the project.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        List[RecurrenceRuleResponse]: The rules, oldest first.
+        
+    Raises:
+        HTTPException: If project not found.
+    """
+    try:
+        return await recurrence_services.get_recurrence_rules(db, project_name)
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.delete("/projects/{project_name}/recurrences/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_recurrence_rule(project_name: str, rule_id: int, db: AsyncSession = Depends(get_project_db)):
+    """
+    Delete a recurrence rule; the tasks it already created are kept.
+    
+    Args:
+        project_name (str): The name of the project.
+        rule_id (int): The id of the rule.
+        db (AsyncSession): Database session.
+        
+    Raises:
+        HTTPException: If project or rule not found.
+    """
+    try:
+        await recurrence_services.delete_recurrence_rule(db, project_name, rule_id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except (ProjectNotFoundError, RecurrenceRuleNotFoundError) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+# --- Deadline reminders ---
+
+@router.put("/projects/{project_name}/reminder-webhook", response_model=ReminderWebhookResponse)
+async def set_reminder_webhook(project_name: str, webhook_req: ReminderWebhookRequest,
+                               db: AsyncSession = Depends(get_project_db)):
+    """
+    Create or replace the webhook that receives deadline reminders of a project's open tasks.
+    
+    Args:
+        project_name (str): The name of the project.
+        webhook_req (ReminderWebhookRequest): Webhook URL and lead time in minutes.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        ReminderWebhookResponse: The webhook.
+        
+    Raises:
+        HTTPException: If project not found.
+    """
+    try:
+        return await reminder_services.set_reminder_webhook(db, project_name, str(webhook_req.url),
+                                                            webhook_req.minutes_before)
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.get("/projects/{project_name}/reminder-webhook", response_model=ReminderWebhookResponse)
+async def read_reminder_webhook(project_name: str, db: AsyncSession = Depends(get_project_db)):
+    """
+    Retrieve the reminder webhook of a project.
+    
+    Args:
+        project_name (str): The name of the project.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        ReminderWebhookResponse: The webhook.
+        
+    Raises:
+        HTTPException: If project not found or the project has no webhook.
+    """
+    try:
+        return await reminder_services.get_reminder_webhook(db, project_name)
+    except (ProjectNotFoundError, ReminderWebhookNotFoundError) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.delete("/projects/{project_name}/reminder-webhook", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_reminder_webhook(project_name: str, db: AsyncSession = Depends(get_project_db)):
+    """
+    Delete the reminder webhook of a project.
+    
+    Args:
+        project_name (str): The name of the project.
+        db (AsyncSession): Database session.
+        
+    Raises:
+        HTTPException: If project not found or the project has no webhook.
+    """
+    try:
+        await reminder_services.delete_reminder_webhook(db, project_name)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except (ProjectNotFoundError, ReminderWebhookNotFoundError) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+# --- Job queue ---
+
+@router.post("/projects/{project_name}/jobs/delete", response_model=QueuedJobResponse,
+             status_code=status.HTTP_202_ACCEPTED)
+async def queue_project_deletion(project_name: str, request: Request, response: Response,
+                                 db: AsyncSession = Depends(get_project_db)):
+    """
+    Queue the deletion of a project and all its tasks; a worker deletes the tasks in chunks.
+    
+    Args:
+        project_name (str): The name of the project.
+        request (Request): The request, to build the job status URL.
+        response (Response): The response, to set the Location header.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        QueuedJobResponse: The queued job; the Location header points at its status.
+        
+    Raises:
+        HTTPException: If project not found.
+    """
+    try:
+        return _accepted(request, response, await queue_services.enqueue_project_deletion(db, project_name))
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.post("/projects/{project_name}/jobs/export", response_model=QueuedJobResponse,
+             status_code=status.HTTP_202_ACCEPTED)
+async def queue_project_export(project_name: str, request: Request, response: Response,
+                               db: AsyncSession = Depends(get_project_db)):
+    """
+    Queue the export of a project with its active and archived tasks.
+    
+    Args:
+        project_name (str): The name of the project.
+        request (Request): The request, to build the job status URL.
+        response (Response): The response, to set the Location header.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        QueuedJobResponse: The queued job; once it succeeded the export is at /projects/{project_name}/jobs/{job_id}/output.
+        
+    Raises:
+        HTTPException: If project not found.
+    """
+    try:
+        return _accepted(request, response, await queue_services.enqueue_project_export(db, project_name))
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.post("/projects/{project_name}/jobs/import", response_model=QueuedJobResponse,
+             status_code=status.HTTP_202_ACCEPTED)
+async def queue_task_import(project_name: str, import_req: TaskImportRequest, request: Request, response: Response,
+                            db: AsyncSession = Depends(get_project_db)):
+    """
+    Queue the creation of many tasks in a project; a worker inserts them in chunks.
+    
+    Args:
+        project_name (str): The name of the project.
+        import_req (TaskImportRequest): The tasks to create.
+        request (Request): The request, to build the job status URL.
+        response (Response): The response, to set the Location header.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        QueuedJobResponse: The queued job; the Location header points at its status.
+        
+    Raises:
+        HTTPException: If project not found or a task is invalid.
+    """
+    try:
+        tasks = [task.model_dump() for task in import_req.tasks]
+        return _accepted(request, response, await queue_services.enqueue_task_import(db, project_name, tasks))
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (InvalidTaskTitleSizeError, InvalidTaskDescriptionSizeError, InvalidTaskStatusError,
+            InvalidTaskDeadlineError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post("/projects/{project_name}/jobs/bulk-update", response_model=QueuedJobResponse,
+             status_code=status.HTTP_202_ACCEPTED)
+async def queue_task_bulk_update(project_name: str, update_req: TaskBulkUpdateRequest, request: Request,
+                                 response: Response, db: AsyncSession = Depends(get_project_db)):
+    """
+    Queue the same status and/or deadline change for every task of a project with one of the given statuses.
+    
+    Args:
+        project_name (str): The name of the project.
+        update_req (TaskBulkUpdateRequest): The statuses to match and the fields to change.
+        request (Request): The request, to build the job status URL.
+        response (Response): The response, to set the Location header.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        QueuedJobResponse: The queued job; the Location header points at its status.
+        
+    Raises:
+        HTTPException: If project not found or the change is invalid.
+    """
+    try:
+        job = await queue_services.enqueue_task_bulk_update(db, project_name, update_req.statuses,
+                                                            update_req.changes())
+        return _accepted(request, response, job)
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (InvalidTaskStatusError, InvalidTaskDeadlineError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/projects/{project_name}/jobs/{job_id}", response_model=QueuedJobResponse)
+async def read_queued_job(project_name: str, job_id: int, db: AsyncSession = Depends(get_project_db)):
+    """
+    Retrieve the status, progress and result of a queued job.
+    
+    Args:
+        project_name (str): The name of the project the job was queued for.
+        job_id (int): The id of the job.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        QueuedJobResponse: The job; progress counts the rows processed so far.
+        
+    Raises:
+        HTTPException: If the project has no such job.
+    """
+    try:
+        return await queue_services.get_queued_job(db, project_name, job_id)
+    except QueuedJobNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.get("/projects/{project_name}/jobs/{job_id}/output")
+async def read_queued_job_output(project_name: str, job_id: int, db: AsyncSession = Depends(get_project_db)):
+    """
+    Retrieve the document produced by a succeeded job, such as a project export.
+    
+    Args:
+        project_name (str): The name of the project the job was queued for.
+        job_id (int): The id of the job.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        Response: The JSON document, as stored by the job.
+        
+    Raises:
+        HTTPException: If the project has no such job, or it has not succeeded yet.
+    """
+    try:
+        output = await queue_services.get_queued_job_output(db, project_name, job_id)
+        return Response(content=output, media_type="application/json")
+    except QueuedJobNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except QueuedJobOutputNotReadyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+# --- Analytics ---
+
+@router.get("/analytics/tasks", response_model=TaskAnalyticsResponse)
+async def read_task_analytics(project: Optional[List[str]] = Query(None, description="Projects to include (default: all)."),
+                              days: int = Query(30, ge=1, le=ANALYTICS_MAX_DAYS),
+                              db: AsyncSession = Depends(get_db)):
+    """
+    Retrieve task throughput and lead-time analytics.
+    
+    Args:
+        project (Optional[List[str]]): Projects to include; all projects when omitted.
+        days (int): Length of the completion and lead-time window, ending today.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        TaskAnalyticsResponse: Completed tasks per day, created-to-done lead-time percentiles in hours
+        and the overdue ratio of every project.
+        
+    Raises:
+        HTTPException: If one of the projects is not found.
+    """
+    try:
+        if SHARDING_ENABLED:
+            return await analytics_services.get_task_analytics_across_shards(shard_sessionmakers(), project, days)
+        return await analytics_services.get_task_analytics(db, project, days)
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+# --- Jobs ---
+
+@router.get("/jobs/runs", response_model=List[JobRunResponse])
+async def read_job_runs(limit: int = Query(50, ge=1, le=1000), job_name: Optional[str] = Query(None),
+                        db: AsyncSession = Depends(get_db)):
+    """
+    Retrieve the most recent background job runs.
+    
+    Args:
+        limit (int): Maximum number of runs to return.
+        job_name (Optional[str]): Only return runs of this job.
+        db (AsyncSession): Database session.
+        
+    Returns:
+        List[JobRunResponse]: Job runs, newest first.
+    """
+    if SHARDING_ENABLED:
+        return await shard_services.get_recent_job_runs_across_shards(shard_sessionmakers(), limit, job_name)
+    return await job_services.get_recent_job_runs(db, limit, job_name)
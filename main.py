@@ -1,7 +1,17 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from core.exceptions import ProjectMovingError
 from interface.api.routers import router as api_router
-from data.env_loader import PORT
+from interface.api.debug_routers import debug_router
+from interface.api.batch_routers import batch_router
+from interface.api.admission import AdmissionControlMiddleware
+from interface.api.request_context import RequestContextMiddleware
+from interface.api.profiling import ProfilingMiddleware
+from data.database import for_each_engine
+from data.slow_query_log import slow_query_recorder
+from data.env_loader import (PORT, ADMISSION_CONTROL_ENABLED, SLOW_QUERY_LOG_ENABLED, PROFILING_ENABLED,
+                             SHARD_MAP_RELOAD_SECONDS)
 
 app = FastAPI(
     title="TodoList API",
@@ -10,6 +20,25 @@ app = FastAPI(
 )
 
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(debug_router, prefix="/api/v1")
+app.include_router(batch_router, prefix="/api/v1")
+
+if ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
+if SLOW_QUERY_LOG_ENABLED:
+    # Shard engines are created on first use; they get the recorder when they are
+    for_each_engine(slow_query_recorder.install)
+    app.add_middleware(RequestContextMiddleware)
+
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+@app.exception_handler(ProjectMovingError)
+async def project_moving_handler(request: Request, exc: ProjectMovingError):
+    # Raised while resolving the shard of a project; the move finishes within seconds
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": str(exc)},
+                        headers={"Retry-After": str(max(1, round(SHARD_MAP_RELOAD_SECONDS)))})
 
 @app.get("/")
 async def root():
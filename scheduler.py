@@ -2,25 +2,96 @@
 Background scheduler for periodic tasks.
 
 This script runs as a separate process and executes scheduled jobs.
-Default: Runs autoclose_overdue_tasks every 15 minutes.
+Default: Runs autoclose_overdue_tasks every 15 minutes, archive_done_tasks every
+ARCHIVE_INTERVAL_HOURS hours, materialize_recurring_tasks every RECURRENCE_INTERVAL_MINUTES minutes
+and send_deadline_reminders every REMINDER_INTERVAL_SECONDS seconds.
+
+The process also hosts --queue-workers workers of the persistent job queue (default:
+JOB_QUEUE_WORKERS); with --queue-only it runs just the workers, so more of them can be started
+on other hosts. Workers claim jobs with FOR UPDATE SKIP LOCKED, so any number can run side by side.
+
+All jobs run on one asyncio event loop (the database engine's connections are bound to it);
+every run is recorded in the job_runs table. With a shard map (SHARD_MAP_PATH), every job and
+every queue worker runs once per shard, and runs are recorded on the shard they ran on.
 """
+import asyncio
 import schedule
-import time
 import argparse
 from datetime import datetime
-from data.database import SessionLocal
-from core.jobs import autoclose_overdue_tasks
+from typing import Awaitable, Callable, Dict, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from data.database import shard_sessionmakers, dispose_engines
+from data.env_loader import (IDEMPOTENCY_DB_ENABLED, ARCHIVE_INTERVAL_HOURS, RECURRENCE_INTERVAL_MINUTES,
+                             REMINDER_INTERVAL_SECONDS, JOB_QUEUE_WORKERS)
+from core.jobs import (autoclose_overdue_tasks, purge_expired_idempotency_keys, archive_done_tasks,
+                       materialize_recurring_tasks, send_deadline_reminders, run_queue_workers, run_recorded_job,
+                       get_job_logger)
+
+# Runs in progress by (job name, shard)
+_running: Dict[Tuple[str, str], asyncio.Task] = {}
+
+
+def start_job(job_name: str, job: Callable[[AsyncSession], Awaitable[dict]]) -> None:
+    """
+    Start a recorded job run in the background on every shard; a shard is skipped while its previous
+    run is still in progress.
+    """
+    for shard, session_factory in shard_sessionmakers().items():
+        previous = _running.get((job_name, shard))
+        if previous is not None and not previous.done():
+            get_job_logger().warning("Skipping job run, previous run still in progress",
+                                     extra={'fields': {'job': job_name, 'shard': shard}})
+            continue
+        _running[(job_name, shard)] = asyncio.get_running_loop().create_task(
+            run_recorded_job(session_factory, job_name, job)
+        )
+
+
+async def run_scheduler(interval: int, queue_workers: int = 0, queue_only: bool = False) -> None:
+    """Run the scheduled jobs and the job queue workers until cancelled."""
+    stop_workers = asyncio.Event()
+    workers = None
+    if queue_workers > 0:
+        # Jobs are queued on the shard of their project: every shard gets its own workers
+        workers = asyncio.ensure_future(asyncio.gather(*(
+            run_queue_workers(session_factory, queue_workers, stop_workers)
+            for session_factory in shard_sessionmakers().values()
+        )))
+    if queue_only:
+        try:
+            await workers
+        finally:
+            stop_workers.set()
+            await asyncio.gather(workers, return_exceptions=True)
+            await dispose_engines()
+        return
 
+    # Schedule the jobs
+    schedule.every(interval).minutes.do(start_job, 'autoclose_overdue_tasks', autoclose_overdue_tasks)
+    if IDEMPOTENCY_DB_ENABLED:
+        # Keys are claimed on the shard of the project they create or write to
+        schedule.every(1).hours.do(start_job, 'purge_expired_idempotency_keys', purge_expired_idempotency_keys)
+    schedule.every(ARCHIVE_INTERVAL_HOURS).hours.do(start_job, 'archive_done_tasks', archive_done_tasks)
+    schedule.every(RECURRENCE_INTERVAL_MINUTES).minutes.do(start_job, 'materialize_recurring_tasks',
+                                                           materialize_recurring_tasks)
+    schedule.every(REMINDER_INTERVAL_SECONDS).seconds.do(start_job, 'send_deadline_reminders', send_deadline_reminders)
 
-def run_autoclose_job():
-    """Wrapper to run the autoclose job with a database session."""
-    db = SessionLocal()
+    # Run once immediately on startup
+    print("Running initial check...")
+    await asyncio.gather(*(run_recorded_job(session_factory, 'autoclose_overdue_tasks', autoclose_overdue_tasks)
+                           for session_factory in shard_sessionmakers().values()))
+    print()
+
+    # Keep the scheduler running
     try:
-        autoclose_overdue_tasks(db)
-    except Exception as e:
-        print(f"[ERROR] Failed to run autoclose job: {e}")
+        while True:
+            schedule.run_pending()
+            await asyncio.sleep(1)
     finally:
-        db.close()
+        # Workers finish the job they are running; the rest stays queued for the next start
+        stop_workers.set()
+        await asyncio.gather(*_running.values(), *([workers] if workers else []), return_exceptions=True)
+        await dispose_engines()
 
 
 def main():
@@ -32,7 +103,20 @@ def main():
         default=15,
         help='Interval in minutes to run the autoclose job (default: 15)'
     )
+    parser.add_argument(
+        '--queue-workers',
+        type=int,
+        default=JOB_QUEUE_WORKERS,
+        help=f'Number of job queue workers hosted by this process, 0 for none (default: {JOB_QUEUE_WORKERS})'
+    )
+    parser.add_argument(
+        '--queue-only',
+        action='store_true',
+        help='Only run the job queue workers, not the periodic jobs'
+    )
     args = parser.parse_args()
+    if args.queue_only and args.queue_workers < 1:
+        parser.error("--queue-only needs at least one queue worker")
     
     interval = args.interval
     
@@ -41,23 +125,13 @@ def main():
     print("=" * 60)
     print(f"Job: Auto-close overdue tasks")
     print(f"Interval: Every {interval} minute(s)")
+    print(f"Job queue workers: {args.queue_workers}{' (queue only)' if args.queue_only else ''}")
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     print("\nPress Ctrl+C to stop the scheduler\n")
     
-    # Schedule the job
-    schedule.every(interval).minutes.do(run_autoclose_job)
-    
-    # Run once immediately on startup
-    print("Running initial check...")
-    run_autoclose_job()
-    print()
-    
-    # Keep the scheduler running
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+        asyncio.run(run_scheduler(interval, args.queue_workers, args.queue_only))
     except KeyboardInterrupt:
         print("\n\nScheduler stopped by user")
         print("=" * 60)
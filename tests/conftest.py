@@ -0,0 +1,28 @@
+"""Shared fixtures: the tests run against a SQLite database in a temporary directory."""
+import asyncio
+import os
+import tempfile
+
+# Set before the application modules are imported: data.database creates its engine at import time
+_database_dir = tempfile.mkdtemp(prefix="todolist-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_database_dir}/todolist.db"
+os.environ.pop("SHARD_MAP_PATH", None)
+
+import pytest  # noqa: E402
+
+from data.database import Base, engine  # noqa: E402
+import data.models  # noqa: E402,F401  (registers the tables)
+
+
+async def _reset_schema() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def database():
+    """An empty schema in the test database."""
+    asyncio.run(_reset_schema())
+    yield engine
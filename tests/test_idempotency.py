@@ -0,0 +1,59 @@
+"""Concurrent requests with the same Idempotency-Key (interface/api/idempotency.py)."""
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from data.database import AsyncSessionLocal
+from data.models import IdempotencyKeyModel, ProjectModel
+from interface.api.idempotency import idempotency_cache, REPLAYED_HEADER
+from main import app
+
+
+async def _post_concurrently(count: int):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test/api/v1") as client:
+        return await asyncio.gather(*(
+            client.post("/projects/", json={"name": "retried"}, headers={"Idempotency-Key": "same-key"})
+            for _ in range(count)
+        ))
+
+
+async def _count(model) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(model))
+
+
+@pytest.fixture
+def cache(database, monkeypatch):
+    monkeypatch.setattr(idempotency_cache, "_entries", type(idempotency_cache._entries)())
+    return idempotency_cache
+
+
+@pytest.mark.parametrize("use_database", [False, True])
+def test_concurrent_duplicates_wait_for_the_first_request(cache, monkeypatch, use_database):
+    monkeypatch.setattr(cache, "use_database", use_database)
+
+    async def scenario():
+        responses = await _post_concurrently(5)
+        return responses, await _count(ProjectModel), await _count(IdempotencyKeyModel)
+
+    responses, projects, keys = asyncio.run(scenario())
+
+    assert [response.status_code for response in responses] == [201] * 5
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert sum(response.headers.get(REPLAYED_HEADER) == "true" for response in responses) == 4
+    assert projects == 1
+    assert keys == (1 if use_database else 0)
+
+
+def test_duplicate_on_another_worker_replays_the_recorded_response(cache, monkeypatch):
+    monkeypatch.setattr(cache, "use_database", True)
+    first, = asyncio.run(_post_concurrently(1))
+    # Another worker: nothing in its memory, the key is found in the database
+    cache._entries.clear()
+    second, = asyncio.run(_post_concurrently(1))
+
+    assert first.status_code == second.status_code == 201
+    assert second.headers.get(REPLAYED_HEADER) == "true"
+    assert second.json() == first.json()
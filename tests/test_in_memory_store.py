@@ -0,0 +1,104 @@
+"""Recovery of the persistent in-memory store from its snapshot and journals (data/in_memory_db.py)."""
+from datetime import datetime
+
+import pytest
+
+from core.models import Project, Task
+from data import in_memory_db as store
+from data.in_memory_persistence import FRAME_HEADER, SNAPSHOT_NAME, list_journals
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    store._clear()
+    yield tmp_path
+    store.close_store()
+    store._clear()
+
+
+def populate() -> None:
+    store.add_project(Project("home", "chores"))
+    store.add_project(Project("work"))
+    store.add_task("home", Task("laundry", "", "todo", datetime(2030, 1, 2), uuid="t1"))
+    store.add_task("home", Task("dishes", uuid="t2"))
+    store.add_task("work", Task("report", "", "doing", datetime(2030, 1, 1), uuid="t3"))
+    store.update_task_by_uuid("home", "t2", Task("dishes", "after dinner", "done", None, uuid="t2"))
+    store.delete_task_by_uuid("work", "t3")
+
+
+def contents() -> tuple:
+    """The store content, independent of object identity."""
+    return (
+        {name: store._project_state(project) for name, project in store.projects_db.items()},
+        {name: [store._task_state(task) for task in tasks.values()] for name, tasks in store.tasks_db.items()},
+        list(store.deadline_index),
+    )
+
+
+def reopen(directory) -> int:
+    store.close_store()
+    store._clear()
+    return store.open_store(str(directory))
+
+
+def test_journal_replay_restores_the_store(data_dir):
+    store.open_store(str(data_dir))
+    populate()
+    expected = contents()
+
+    assert reopen(data_dir) == 7
+    assert contents() == expected
+
+
+def test_torn_last_frame_is_cut_off(data_dir):
+    store.open_store(str(data_dir))
+    populate()
+    store.close_store()
+    _, journal = list_journals(data_dir)[-1]
+    data = journal.read_bytes()
+    # Offset of the last frame: walk the length prefixes
+    offset = last = 0
+    while offset < len(data):
+        last = offset
+        length, _ = FRAME_HEADER.unpack_from(data, offset)
+        offset += FRAME_HEADER.size + length
+    # A crash in the middle of writing the last record
+    journal.write_bytes(data[:last + FRAME_HEADER.size + 3])
+
+    store._clear()
+    assert store.open_store(str(data_dir)) == 6
+    assert journal.stat().st_size == last
+    assert "t3" in store.tasks_db["work"]
+
+    store.add_task("work", Task("follow-up", uuid="t4"))
+    assert reopen(data_dir) == 7
+    assert list(store.tasks_db["work"]) == ["t3", "t4"]
+
+
+def test_snapshot_plus_journal_tail(data_dir):
+    store.open_store(str(data_dir))
+    populate()
+    store.snapshot_store(wait=True)
+    store.add_task("work", Task("review", "", "todo", datetime(2030, 1, 3), uuid="t5"))
+    store.delete_task_by_uuid("home", "t1")
+    expected = contents()
+
+    assert reopen(data_dir) == 2
+    assert (data_dir / SNAPSHOT_NAME).is_file()
+    assert contents() == expected
+
+
+def test_snapshot_compacts_the_journals(data_dir):
+    store.open_store(str(data_dir))
+    populate()
+    store.snapshot_store(wait=True)
+    store.add_task("work", Task("review", uuid="t5"))
+    store.snapshot_store(wait=True)
+    expected = contents()
+
+    # Journals contained in the snapshot are deleted; only the empty current one is left
+    journals = list_journals(data_dir)
+    assert [generation for generation, _ in journals] == [2]
+    assert journals[0][1].stat().st_size == 0
+    assert reopen(data_dir) == 0
+    assert contents() == expected
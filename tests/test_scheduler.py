@@ -0,0 +1,25 @@
+"""Startup and shutdown of the background scheduler (scheduler.py)."""
+import asyncio
+
+import pytest
+import schedule
+
+from scheduler import run_scheduler
+
+
+async def _start_and_cancel(**kwargs) -> None:
+    task = asyncio.ensure_future(run_scheduler(15, **kwargs))
+    await asyncio.sleep(0.5)
+    if task.done():
+        pytest.fail(f"The scheduler stopped on its own: {task.exception()!r}")
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.parametrize("queue_only", [False, True])
+def test_scheduler_starts_with_queue_workers_and_stops_when_cancelled(database, queue_only):
+    try:
+        asyncio.run(_start_and_cancel(queue_workers=2, queue_only=queue_only))
+    finally:
+        schedule.clear()
@@ -0,0 +1,162 @@
+"""
+Move a project, with everything that belongs to it, to another shard of the shard map.
+
+1. The project is marked as moving in the shard map file: once every process has re-read the map
+   (after --settle seconds, by default twice SHARD_MAP_RELOAD_SECONDS), requests for it get 503
+   with Retry-After and nothing writes to it any more. Projects with queued or running jobs are
+   not moved.
+2. The project row, its active and archived tasks, recurrence rules, reminder webhook and sent
+   reminders are copied to the target shard in one transaction (the project gets a new id there),
+   and the row counts of both copies are compared.
+3. The project is pinned to the target shard and the moving mark is removed: requests are routed
+   to the target. Listings only show the copy on the shard the map places the project on.
+4. After another --settle seconds the source copy is deleted chunk by chunk.
+
+If anything fails before step 3, the moving mark is removed and the project stays where it was
+(a partial copy on the target is rolled back). Finished queued-job records stay on the source and
+expire with JOB_QUEUE_RETENTION_DAYS.
+
+Usage:
+    SHARD_MAP_PATH=shards.json poetry run python -m tools.move_project_shard <project> <target shard>
+    SHARD_MAP_PATH=shards.json poetry run python -m tools.move_project_shard <project> <target shard> --settle 0
+"""
+import argparse
+import asyncio
+import sys
+from typing import Dict
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from data.database import SHARDING_ENABLED, shard_map, shard_sessionmaker, dispose_engines
+from data.env_loader import SHARD_MAP_RELOAD_SECONDS, JOB_QUEUE_CHUNK_SIZE
+from data.models import (ProjectModel, TaskModel, TaskArchiveModel, RecurrenceRuleModel, ReminderWebhookModel,
+                         TaskReminderModel, QueuedJobModel)
+from data.repositories.project_repository import ProjectRepository
+from data.repositories.task_repository import TaskRepository
+
+# Tables whose rows belong to a project through project_id, copied in this order
+PROJECT_TABLES = [TaskModel, TaskArchiveModel, RecurrenceRuleModel, ReminderWebhookModel, TaskReminderModel]
+
+
+async def _count_rows(db: AsyncSession, project_id: int) -> Dict[str, int]:
+    counts = {}
+    for model in PROJECT_TABLES:
+        counts[model.__tablename__] = await db.scalar(
+            select(func.count()).select_from(model).where(model.project_id == project_id)
+        )
+    return counts
+
+
+async def _copy_project(source: AsyncSession, target: AsyncSession, project: ProjectModel) -> int:
+    """Copy a project and its rows to the target session (uncommitted); return its id on the target."""
+    if await ProjectRepository(target).exists_by_name(project.name):
+        raise ValueError(f"Project '{project.name}' already exists on the target shard.")
+    new_id = await target.scalar(
+        insert(ProjectModel).values(
+            name=project.name, description=project.description, created_at=project.created_at,
+            updated_at=project.updated_at, version=project.version
+        ).returning(ProjectModel.id)
+    )
+    for model in PROJECT_TABLES:
+        table = model.__table__
+        # Surrogate keys are only unique per shard: the target assigns new ones
+        columns = [column for column in table.columns if not (column.primary_key and column.autoincrement is True)]
+        result = await source.stream(select(*columns).where(table.c.project_id == project.id))
+        async for rows in result.partitions(JOB_QUEUE_CHUNK_SIZE):
+            await target.execute(insert(table), [
+                {**row._mapping, 'project_id': new_id} for row in rows
+            ])
+    await ProjectRepository(target).bump_list_version()
+    return new_id
+
+
+async def _delete_source(db: AsyncSession, project_id: int) -> None:
+    """Delete a project from the source shard in chunks, committing each one."""
+    tasks = TaskRepository(db)
+    while await tasks.delete_project_tasks_chunk(project_id, JOB_QUEUE_CHUNK_SIZE):
+        await db.commit()
+    # task_reminders has no foreign key; recurrence rules and the webhook go with the project
+    await db.execute(delete(TaskReminderModel).where(TaskReminderModel.project_id == project_id))
+    await ProjectRepository(db).delete_project_by_id(project_id)
+    await db.commit()
+
+
+async def move_project(project_name: str, target_shard: str, settle: float) -> None:
+    """Move a project to a shard; see the module docstring for the steps."""
+    shard_map.refresh(force=True)
+    if target_shard not in shard_map.shards:
+        raise ValueError(f"Unknown shard '{target_shard}'.")
+    if project_name in shard_map.moving:
+        raise ValueError(f"Project '{project_name}' is already being moved.")
+    source_shard = shard_map.placement(project_name)
+    if source_shard == target_shard:
+        raise ValueError(f"Project '{project_name}' is already on shard '{target_shard}'.")
+    source_factory, target_factory = shard_sessionmaker(source_shard), shard_sessionmaker(target_shard)
+
+    print(f"Moving project '{project_name}' from shard '{source_shard}' to '{target_shard}'")
+    shard_map.moving.add(project_name)
+    shard_map.save()
+    try:
+        print(f"Waiting {settle:g}s for every process to stop routing requests to the project...")
+        await asyncio.sleep(settle)
+        async with source_factory() as source, target_factory() as target:
+            project = await ProjectRepository(source).get_by_name(project_name)
+            if project is None:
+                raise ValueError(f"Project '{project_name}' not found on shard '{source_shard}'.")
+            pending = await source.scalar(
+                select(func.count()).select_from(QueuedJobModel).where(
+                    QueuedJobModel.project_id == project.id, QueuedJobModel.status.in_(('queued', 'running'))
+                )
+            )
+            if pending:
+                raise ValueError(f"Project '{project_name}' has {pending} queued or running job(s); retry later.")
+            new_id = await _copy_project(source, target, project)
+            await target.flush()
+            expected, copied = await _count_rows(source, project.id), await _count_rows(target, new_id)
+            if expected != copied:
+                raise RuntimeError(f"Copied row counts {copied} differ from the source {expected}.")
+            await target.commit()
+            source_id = project.id
+        print(f"Copied {sum(copied.values())} rows: " + ", ".join(f"{k}={v}" for k, v in copied.items()))
+    except BaseException:
+        shard_map.moving.discard(project_name)
+        shard_map.save()
+        raise
+
+    shard_map.pin(project_name, target_shard)
+    shard_map.moving.discard(project_name)
+    shard_map.save()
+    print(f"Project routed to shard '{target_shard}'; waiting {settle:g}s before deleting the source copy...")
+    await asyncio.sleep(settle)
+    async with source_factory() as source:
+        await _delete_source(source, source_id)
+    print("Source copy deleted")
+
+
+async def main_async(args) -> None:
+    try:
+        await move_project(args.project, args.target, args.settle)
+    finally:
+        await dispose_engines()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Move a project to another shard')
+    parser.add_argument('project', help='Name of the project')
+    parser.add_argument('target', help='Name of the target shard')
+    parser.add_argument('--settle', type=float, default=2 * SHARD_MAP_RELOAD_SECONDS,
+                        help='Seconds to wait for running processes to re-read the shard map '
+                             f'(default: {2 * SHARD_MAP_RELOAD_SECONDS:g})')
+    args = parser.parse_args()
+    if not SHARDING_ENABLED:
+        parser.error("SHARD_MAP_PATH is not set")
+    try:
+        asyncio.run(main_async(args))
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import base64, json
+from datetime import datetime
+from typing import Any, List
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode keyset pagination values into an opaque, URL-safe cursor.
+    :param values: The sort key values of the last returned row (datetimes are supported).
+    :return: The encoded cursor string.
+    """
+    payload = [{'dt': v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+    :param cursor: The encoded cursor string.
+    :param size: The expected number of values in the cursor.
+    :return: The decoded values, or raise ValueError if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor.")
+
+    if not isinstance(payload, list) or len(payload) != size:
+        raise ValueError("Invalid pagination cursor.")
+
+    values = []
+    for v in payload:
+        if isinstance(v, dict):
+            try:
+                v = datetime.fromisoformat(v['dt'])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Invalid pagination cursor.")
+        values.append(v)
+    return values